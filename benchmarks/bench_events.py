@@ -0,0 +1,248 @@
+"""
+Fire storms of simulated device motion through a LightController
+
+A :class:`.LightController` is loaded from a synthetic happi JSON database
+and every beamline is given subscribers that behave like the ones created by
+:class:`.LightApp`, one per path re-evaluating the impediment and one per
+device re-reading its state. A producer thread then generates ``SUB_STATE``
+events at a fixed rate into a bounded queue while a consumer thread, standing
+in for the EPICS callback thread, dispatches them through
+:meth:`.BeamPath._device_moved`. The report contains the latency between the
+moment an event was generated and all subscribers having finished, the number
+of path evaluations and device reads each event caused and how many
+notifications were queued or dropped because the consumer fell behind.
+
+Example
+-------
+    python benchmarks/bench_events.py --devices 500 --rate 2000 --duration 5
+"""
+############
+# Standard #
+############
+import json
+import math
+import queue
+import random
+import logging
+import argparse
+import tempfile
+import threading
+import statistics
+import os.path
+from time import perf_counter, sleep
+
+###############
+# Third Party #
+###############
+import happi
+
+##########
+# Module #
+##########
+import lightpath
+import lightpath.path
+import lightpath.controller
+from lightpath import BeamPath, LightController
+from lightpath.tests.conftest import Status
+from synthetic import write_database
+
+logger = logging.getLogger('lightpath.benchmarks')
+
+
+class Counter:
+    """
+    Thread-safe tally of calls
+    """
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def wrap(self, func):
+        def wrapped(*args, **kwargs):
+            with self._lock:
+                self.count += 1
+            return func(*args, **kwargs)
+        return wrapped
+
+
+class Subscribers:
+    """
+    Callbacks that mimic the work done by LightApp and LightRow
+    """
+    def __init__(self, controller):
+        self._lock = threading.Lock()
+        self.paths = list(controller.beamlines.values())
+        for path in self.paths:
+            path.subscribe(self.update_path, run=False)
+        self.devices = controller.devices
+        for device in self.devices:
+            device.subscribe(self.update_state, event_type=device.SUB_STATE,
+                             run=False)
+
+    def update_path(self, *args, obj=None, **kwargs):
+        """
+        LightApp.update_path; re-evaluate and light every row
+        """
+        with self._lock:
+            block = obj.impediment
+            z = block.md.z if block else math.inf
+            return [d.md.z <= z for d in obj.path]
+
+    def update_state(self, *args, obj=None, **kwargs):
+        """
+        LightRow.update_state; read the state of the device again
+        """
+        return lightpath.path.find_device_state(obj)
+
+    def clear(self):
+        for path in self.paths:
+            path.clear_sub(self.update_path)
+        for device in self.devices:
+            device.clear_sub(self.update_state)
+
+
+def storm(controller, rate, duration, queue_size=1000, seed=0):
+    """
+    Fire simulated motion events at a fixed rate
+
+    Parameters
+    ----------
+    controller : LightController
+
+    rate : float
+        Events generated per second
+
+    duration : float
+        Seconds to generate events for
+
+    queue_size : int, optional
+        Number of events that can be waiting for dispatch before new ones are
+        dropped
+
+    seed : int, optional
+        Seed for the choice of devices and states
+
+    Returns
+    -------
+    report : dict
+    """
+    rng = random.Random(seed)
+    devices = controller.devices
+    if not devices:
+        raise ValueError("No devices were loaded by the controller")
+    pending = queue.Queue(maxsize=queue_size)
+    latencies = list()
+    stats = {'fired': 0, 'dropped': 0, 'max_queued': 0}
+    done = threading.Event()
+
+    def produce():
+        start = perf_counter()
+        n_events = int(rate * duration)
+        try:
+            for i in range(n_events):
+                # Wait for the scheduled time of this event
+                scheduled = start + i / rate
+                delay = scheduled - perf_counter()
+                if delay > 0:
+                    sleep(delay)
+                device = rng.choice(devices)
+                state = rng.choice((Status.inserted, Status.removed))
+                stats['fired'] += 1
+                try:
+                    pending.put_nowait((scheduled, device, state))
+                except queue.Full:
+                    stats['dropped'] += 1
+                stats['max_queued'] = max(stats['max_queued'],
+                                          pending.qsize())
+        finally:
+            done.set()
+
+    def consume():
+        while not (done.is_set() and pending.empty()):
+            try:
+                scheduled, device, state = pending.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            device.status = state
+            device._run_subs(obj=device, sub_type=device.SUB_STATE)
+            latencies.append(perf_counter() - scheduled)
+
+    # Count evaluations and reads caused by the events
+    evaluations, reads = Counter(), Counter()
+    blocking = BeamPath.blocking_devices
+    find_state = lightpath.path.find_device_state
+    BeamPath.blocking_devices = property(evaluations.wrap(blocking.fget))
+    lightpath.path.find_device_state = reads.wrap(find_state)
+    subscribers = Subscribers(controller)
+    threads = [threading.Thread(target=produce),
+               threading.Thread(target=consume)]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        subscribers.clear()
+        BeamPath.blocking_devices = blocking
+        lightpath.path.find_device_state = find_state
+    # Summarize
+    delivered = len(latencies)
+    report = dict(stats, delivered=delivered, rate=rate, duration=duration,
+                  devices=len(devices), beamlines=len(controller.beamlines))
+    if delivered:
+        latencies.sort()
+        report.update(
+            evaluations_per_event=evaluations.count / delivered,
+            reads_per_event=reads.count / delivered,
+            latency={'p50': percentile(latencies, 50),
+                     'p90': percentile(latencies, 90),
+                     'p99': percentile(latencies, 99),
+                     'max': latencies[-1],
+                     'mean': statistics.mean(latencies)})
+    return report
+
+
+def percentile(ordered, pct):
+    """
+    Nearest-rank percentile of an ordered list
+    """
+    idx = max(0, int(math.ceil(pct / 100. * len(ordered))) - 1)
+    return ordered[idx]
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--devices', type=int, default=200,
+                        help='Number of devices in the synthetic database')
+    parser.add_argument('--beamlines', type=int, default=1,
+                        help='Number of source beamlines')
+    parser.add_argument('--branches', type=int, default=3,
+                        help='Number of branches off each source beamline')
+    parser.add_argument('--rate', type=float, default=1000.,
+                        help='Events generated per second')
+    parser.add_argument('--duration', type=float, default=5.,
+                        help='Seconds to generate events for')
+    parser.add_argument('--queue-size', type=int, default=1000,
+                        help='Maximum number of undelivered events')
+    parser.add_argument('-o', '--output', type=str,
+                        help='Write the report as JSON to this file')
+    args = parser.parse_args(args)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, 'db.json')
+        lightpath.controller.beamlines = write_database(
+                                        db, args.devices,
+                                        n_beamlines=args.beamlines,
+                                        n_branches=args.branches)
+        controller = LightController(happi.Client(path=db))
+        report = storm(controller, args.rate, args.duration,
+                       queue_size=args.queue_size)
+    report['lightpath'] = lightpath.__version__
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,216 @@
+"""
+Measure the evaluation speed of BeamPath along synthetic beamlines
+
+The simulated devices from ``lightpath.tests.conftest`` are arranged into a
+trunk beamline with a number of branching crystals, each one leading to its
+own branch beamline. Every combination of device count and benchmark is timed
+and the results are written as JSON so that they can be compared against the
+output of a previous release with ``--compare``.
+
+Example
+-------
+    python benchmarks/bench_path.py --sizes 10 100 1000 -o bench_path.json
+"""
+############
+# Standard #
+############
+import json
+import time
+import timeit
+import logging
+import argparse
+import platform
+import statistics
+from types import SimpleNamespace
+
+##########
+# Module #
+##########
+import lightpath
+from lightpath import BeamPath, LightController
+from lightpath.tests.conftest import Valve, Stopper, IPIMB, Crystal
+
+logger = logging.getLogger('lightpath.benchmarks')
+
+TRUNK = 'TRUNK'
+DEVICE_TYPES = (Valve, Stopper, IPIMB)
+
+
+def build_paths(n_devices, n_branches=3, spacing=1.0):
+    """
+    Create a synthetic beamline
+
+    Parameters
+    ----------
+    n_devices : int
+        Total number of devices along all of the beamlines
+
+    n_branches : int, optional
+        Number of branching crystals along the trunk
+
+    spacing : float, optional
+        Distance in z between consecutive devices
+
+    Returns
+    -------
+    paths : dict
+        Mapping of beamline name to :class:`.BeamPath`, the trunk is included
+        under ``TRUNK``
+    """
+    n_branches = max(0, min(n_branches, n_devices // 2))
+    branches = ['B{}'.format(i) for i in range(n_branches)]
+    # Half of the remaining devices go on the trunk, the rest are distributed
+    # evenly among the branch lines
+    n_lines = n_devices - n_branches
+    n_trunk = n_lines if not branches else n_lines // 2
+    trunk = [DEVICE_TYPES[i % len(DEVICE_TYPES)](
+                    'trunk_{}'.format(i), z=i * spacing, beamline=TRUNK)
+             for i in range(n_trunk)]
+    paths = {TRUNK: list(trunk)}
+    # Place crystals evenly along the trunk
+    remaining = n_lines - n_trunk
+    for i, line in enumerate(branches):
+        z = (i + 0.5) * n_trunk * spacing / n_branches
+        # Crystals pass beam to all downstream branches when removed
+        crystal = Crystal('crystal_{}'.format(i), z=z, beamline=TRUNK,
+                          states=[[TRUNK] + branches[i + 1:], [line]])
+        paths[TRUNK].append(crystal)
+        count = remaining // n_branches + (i < remaining % n_branches)
+        devices = [DEVICE_TYPES[j % len(DEVICE_TYPES)](
+                        '{}_{}'.format(line.lower(), j),
+                        z=z + (j + 1) * spacing / (count + 1), beamline=line)
+                   for j in range(count)]
+        paths[line] = [d for d in paths[TRUNK] if d.md.z <= z] + devices
+    return dict((line, BeamPath(*devices, name=line))
+                for line, devices in paths.items())
+
+
+def time_call(func, repeat=5):
+    """
+    Time a callable
+
+    Returns
+    -------
+    result : dict
+        Number of calls per measurement along with the best, median and mean
+        duration of a single call in seconds
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    runs = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {'calls': number, 'best': min(runs),
+            'median': statistics.median(runs),
+            'mean': statistics.mean(runs)}
+
+
+def benchmarks(paths):
+    """
+    Callables to time for a set of synthetic paths
+    """
+    # Longest branch includes the most trunk devices
+    path = max(paths.values(), key=lambda p: len(p.devices))
+    middle = path.path[len(path.devices) // 2]
+    first, second = path.split(device=middle)
+    # Controller properties only rely on the loaded beamlines
+    controller = SimpleNamespace(beamlines=paths)
+    return {'path': lambda: path.path,
+            'blocking_devices': lambda: path.blocking_devices,
+            'impediment': lambda: path.impediment,
+            'incident_devices': lambda: path.incident_devices,
+            'split': lambda: path.split(device=middle),
+            'join': lambda: first.join(second),
+            'destinations':
+                lambda: LightController.destinations.fget(controller)}
+
+
+def run(sizes, n_branches=3, repeat=5, insert=0.1):
+    """
+    Run all benchmarks for each size of beamline
+
+    Parameters
+    ----------
+    sizes : iterable
+        Number of devices to place along the synthetic beamlines
+
+    n_branches : int, optional
+        Number of branch beamlines
+
+    repeat : int, optional
+        Number of measurements for each benchmark
+
+    insert : float, optional
+        Fraction of devices inserted before timing, spread along the path so
+        that evaluations have both blocking and passive devices to consider
+
+    Returns
+    -------
+    results : list
+    """
+    results = list()
+    for size in sizes:
+        paths = build_paths(size, n_branches=n_branches)
+        # Insert a fraction of the devices in the downstream half of the
+        # paths so that the evaluation walks most of the beamline
+        devices = sorted(set(d for p in paths.values() for d in p.devices),
+                         key=lambda d: d.md.z)
+        step = int(1 / insert) if insert else 0
+        if step:
+            for device in devices[len(devices) // 2::step]:
+                device.insert()
+        for name, func in benchmarks(paths).items():
+            logger.info("Timing %s with %s devices ...", name, size)
+            result = time_call(func, repeat=repeat)
+            result.update(benchmark=name, devices=size, branches=n_branches)
+            results.append(result)
+            print('{:>18} {:>7} devices: {:12.3f} us'
+                  ''.format(name, size, result['best'] * 1e6))
+    return results
+
+
+def compare(results, baseline):
+    """
+    Print the relative change of each benchmark against a previous run
+    """
+    previous = dict(((r['benchmark'], r['devices']), r)
+                    for r in baseline['results'])
+    for result in results:
+        key = (result['benchmark'], result['devices'])
+        if key not in previous:
+            continue
+        ratio = result['best'] / previous[key]['best']
+        print('{:>18} {:>7} devices: {:6.2f}x {}'
+              ''.format(key[0], key[1], ratio,
+                        'slower' if ratio > 1 else 'faster'))
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[10, 100, 1000, 10000],
+                        help='Number of devices along the synthetic beamlines')
+    parser.add_argument('--branches', type=int, default=3,
+                        help='Number of branch beamlines')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Number of measurements for each benchmark')
+    parser.add_argument('-o', '--output', type=str,
+                        help='Write results as JSON to this file')
+    parser.add_argument('--compare', type=str,
+                        help='JSON results of a previous run to compare to')
+    args = parser.parse_args(args)
+    results = run(args.sizes, n_branches=args.branches, repeat=args.repeat)
+    report = {'lightpath': lightpath.__version__,
+              'python': platform.python_version(),
+              'platform': platform.platform(),
+              'timestamp': time.time(),
+              'results': results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            compare(results, json.load(f))
+    return report
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,233 @@
+"""
+Generate happi databases describing a synthetic large facility
+
+Each source beamline is a trunk of devices with a number of branching
+crystals spread along it. Inserting a crystal sends the beam down its own
+branch beamline, removing it passes the beam further along the trunk. The
+devices are the simulated classes from ``lightpath.tests.conftest`` so the
+database can be loaded by a :class:`.LightController` without any hardware,
+and the matching :data:`lightpath.config.beamlines` dictionary is produced
+alongside it.
+
+Example
+-------
+    python benchmarks/synthetic.py --devices 50000 --beamlines 2 \\
+        --branches 8 -o facility.json --config facility_config.json --profile
+"""
+############
+# Standard #
+############
+import json
+import random
+import logging
+import argparse
+import tracemalloc
+from time import perf_counter
+
+logger = logging.getLogger('lightpath.benchmarks')
+
+DEVICE_MODULE = 'lightpath.tests.conftest'
+DEVICE_TYPES = {'Valve': 4, 'Stopper': 1, 'IPIMB': 2}
+
+
+def container(name, z, beamline, device_class, **kwargs):
+    """
+    Happi JSON entry for one of the simulated test devices
+
+    Parameters
+    ----------
+    name : str
+
+    z : float
+
+    beamline : str
+
+    device_class : str
+        Name of the class in ``lightpath.tests.conftest``
+
+    kwargs :
+        Additional keywords passed to the device on instantiation
+    """
+    kwargs.update(beamline='{{beamline}}', z='{{z}}')
+    return {'_id': name, 'name': name, 'prefix': name, 'active': True,
+            'beamline': beamline, 'z': z, 'args': ['{{name}}'],
+            'kwargs': kwargs, 'type': 'Device',
+            'device_class': '.'.join((DEVICE_MODULE, device_class)),
+            'creation': None, 'last_edit': None, 'macros': None,
+            'parent': None, 'screen': None, 'stand': None, 'system': None}
+
+
+def generate(n_devices, n_beamlines=1, n_branches=3, device_types=None,
+             spacing=1.0, seed=0):
+    """
+    Create a synthetic facility
+
+    Parameters
+    ----------
+    n_devices : int
+        Total number of devices in the facility, including crystals
+
+    n_beamlines : int, optional
+        Number of independent source beamlines
+
+    n_branches : int, optional
+        Number of branch beamlines split off each source beamline
+
+    device_types : dict, optional
+        Relative weights of the simulated device classes to choose from. By
+        default, mostly valves along with some stoppers and passive IPIMBs
+
+    spacing : float, optional
+        Distance in z between consecutive devices on the same beamline
+
+    seed : int, optional
+        Seed for the choice of device types
+
+    Returns
+    -------
+    db, beamlines : tuple
+        Happi database contents keyed by device name, and the configuration
+        for :data:`lightpath.config.beamlines`
+    """
+    rng = random.Random(seed)
+    device_types = device_types or DEVICE_TYPES
+    classes, weights = zip(*device_types.items())
+    db, beamlines = dict(), dict()
+    per_source = n_devices // n_beamlines
+    for source in range(n_beamlines):
+        trunk = 'L{}'.format(source)
+        count = per_source + (source < n_devices % n_beamlines)
+        n_split = min(n_branches, count // 2)
+        # Half of the remaining devices go on the trunk, the rest are
+        # distributed evenly among the branch lines
+        n_lines = count - n_split
+        n_trunk = n_lines if not n_split else n_lines // 2
+        for i in range(n_trunk):
+            name = '{}_{}'.format(trunk, i)
+            db[name] = container(name, i * spacing, trunk,
+                                 rng.choices(classes, weights)[0])
+        beamlines[trunk] = {trunk: {}}
+        # Place crystals evenly along the trunk
+        branches = ['{}_B{}'.format(trunk, i) for i in range(n_split)]
+        remaining = n_lines - n_trunk
+        for i, line in enumerate(branches):
+            z = (i + 0.5) * n_trunk * spacing / n_split
+            name = '{}_crystal_{}'.format(trunk, i)
+            # Crystals pass beam to all downstream branches when removed
+            db[name] = container(name, z, trunk, 'Crystal',
+                                 states=[[trunk] + branches[i + 1:], [line]])
+            n_line = remaining // n_split + (i < remaining % n_split)
+            for j in range(n_line):
+                name = '{}_{}'.format(line, j)
+                db[name] = container(name, z + (j + 1) * spacing, line,
+                                     rng.choices(classes, weights)[0])
+            beamlines[line] = {trunk: {'end': z}}
+    logger.info("Generated %s devices along %s beamlines",
+                len(db), len(beamlines))
+    return db, beamlines
+
+
+def write_database(path, n_devices, config=None, **kwargs):
+    """
+    Write a synthetic facility to a happi JSON database
+
+    Parameters
+    ----------
+    path : str
+        Filename of the database
+
+    n_devices : int
+        Total number of devices in the facility
+
+    config : str, optional
+        Also write the beamline configuration as JSON to this file
+
+    kwargs :
+        Passed to :func:`.generate`
+
+    Returns
+    -------
+    beamlines : dict
+        Configuration for :data:`lightpath.config.beamlines`
+    """
+    db, beamlines = generate(n_devices, **kwargs)
+    with open(path, 'w') as f:
+        json.dump(db, f)
+    if config:
+        with open(config, 'w') as f:
+            json.dump(beamlines, f, indent=2)
+    return beamlines
+
+
+def profile(path, beamlines):
+    """
+    Load a synthetic facility and measure startup, memory and evaluation
+
+    Parameters
+    ----------
+    path : str
+        Filename of the happi database
+
+    beamlines : dict
+        Configuration for :data:`lightpath.config.beamlines`
+
+    Returns
+    -------
+    report : dict
+    """
+    import happi
+    import lightpath.controller
+    from lightpath import LightController
+
+    lightpath.controller.beamlines = beamlines
+    tracemalloc.start()
+    start = perf_counter()
+    controller = LightController(happi.Client(path=path))
+    startup = perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    evaluation = dict()
+    for name, bp in controller.beamlines.items():
+        start = perf_counter()
+        bp.impediment
+        evaluation[name] = perf_counter() - start
+    start = perf_counter()
+    controller.destinations
+    return {'devices': len(controller.devices),
+            'beamlines': len(controller.beamlines),
+            'failed': len(controller.containers),
+            'startup': startup,
+            'peak_memory': memory,
+            'impediment': evaluation,
+            'destinations': perf_counter() - start}
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--devices', type=int, default=1000,
+                        help='Total number of devices in the facility')
+    parser.add_argument('--beamlines', type=int, default=1,
+                        help='Number of source beamlines')
+    parser.add_argument('--branches', type=int, default=3,
+                        help='Number of branches off each source beamline')
+    parser.add_argument('--spacing', type=float, default=1.0,
+                        help='Distance in z between consecutive devices')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Seed for the choice of device types')
+    parser.add_argument('-o', '--output', type=str, required=True,
+                        help='Filename of the happi JSON database')
+    parser.add_argument('--config', type=str,
+                        help='Write the beamline configuration to this file')
+    parser.add_argument('--profile', action='store_true',
+                        help='Load the facility and report timing and memory')
+    args = parser.parse_args(args)
+    beamlines = write_database(args.output, args.devices, config=args.config,
+                               n_beamlines=args.beamlines,
+                               n_branches=args.branches,
+                               spacing=args.spacing, seed=args.seed)
+    if args.profile:
+        print(json.dumps(profile(args.output, beamlines), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,42 @@
+import sys
+import importlib
+
 __all__ = ['device']
 
-from .path  import BeamPath  # noqa
-from .controller import LightController  # noqa
+# Attributes and submodules are imported on first use so that scripts which
+# only need part of the package do not pay for ophyd, happi or prettytable
+_lazy = {'BeamPath': '.path',
+         'LightController': '.controller',
+         'StateCache': '.cache'}
+_submodules = ('cache', 'config', 'controller', 'errors', 'export', 'history',
+               'metrics', 'journal', 'path', 'protocol', 'remote', 'server',
+               'startup', 'state', 'ui')
+
+
+def __getattr__(name):
+    if name == '__version__':
+        from ._version import get_versions
+        value = get_versions()['version']
+    elif name in _lazy:
+        module = importlib.import_module(_lazy[name], __name__)
+        value = getattr(module, name)
+    elif name in _submodules:
+        value = importlib.import_module('.' + name, __name__)
+    else:
+        raise AttributeError("module {!r} has no attribute {!r}"
+                             "".format(__name__, name))
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy) | set(_submodules)
+                  | {'__version__'})
+
 
-from ._version import get_versions
-__version__ = get_versions()['version']
-del get_versions
+# Module level __getattr__ is only available from Python 3.7
+if sys.version_info < (3, 7):
+    from .path import BeamPath  # noqa
+    from .controller import LightController  # noqa
+    from .cache import StateCache  # noqa
+    __version__ = __getattr__('__version__')
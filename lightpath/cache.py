@@ -0,0 +1,409 @@
+"""
+Determining the state of a device can require a round trip to every signal
+involved in its ``inserted`` and ``removed`` properties. The
+:class:`.StateCache` instead keeps the last known :class:`.DeviceState` of each
+device, updated whenever the device runs its ``SUB_STATE`` subscriptions. A
+:class:`.BeamPath` created with a cache answers all of its state queries from
+these monitored values, only falling back to a synchronous read if the cached
+value has grown older than :attr:`.StateCache.max_age`. The path is notified of
+state changes by the cache through :meth:`.StateCache.subscribe`, once the
+new state has been stored
+
+Reads performed by the cache are timed. When given a
+:class:`.QuarantinePolicy`, devices that are persistently slow or fail to
+report their state are temporarily reported as
+:attr:`.DeviceState.Disconnected` without being read, so that a single
+misbehaving IOC does not stall the evaluation of an entire path. A quarantined
+device is reintegrated as soon as it reports a state change or a probe read
+succeeds in a timely manner.
+"""
+import time
+import logging
+
+from .state import DeviceState, find_device_state
+
+logger = logging.getLogger(__name__)
+
+
+class QuarantinePolicy:
+    """
+    Rules for removing misbehaving devices from synchronous reads
+
+    Parameters
+    ----------
+    slow : float, optional
+        Number of seconds after which a read is considered slow
+
+    strikes : int, optional
+        Number of consecutive slow or failed reads before a device is
+        quarantined
+
+    duration : float, optional
+        Number of seconds a device stays quarantined before a probe read is
+        attempted
+    """
+    # States that indicate a failed read
+    failures = (DeviceState.Disconnected, DeviceState.Error)
+
+    def __init__(self, slow=1.0, strikes=3, duration=30.0):
+        self.slow = slow
+        self.strikes = strikes
+        self.duration = duration
+
+    def __repr__(self):
+        return ('<QuarantinePolicy slow={} strikes={} duration={}>'
+                ''.format(self.slow, self.strikes, self.duration))
+
+
+class DeviceHealth:
+    """
+    Read statistics of a single device
+
+    Attributes
+    ----------
+    reads : int
+        Number of synchronous reads
+
+    failures : int
+        Number of reads that left the device disconnected or in error
+
+    slow : int
+        Number of reads that exceeded :attr:`.QuarantinePolicy.slow`
+
+    strikes : int
+        Current number of consecutive slow or failed reads
+
+    latency : float
+        Duration of the most recent read in seconds
+
+    total_latency : float
+        Sum of the duration of all reads in seconds
+
+    quarantined_until : float
+        Value of :func:`time.monotonic` at which the quarantine of the device
+        ends, None if the device is not quarantined
+    """
+    def __init__(self):
+        self.reads = 0
+        self.failures = 0
+        self.slow = 0
+        self.strikes = 0
+        self.latency = 0.
+        self.total_latency = 0.
+        self.quarantined_until = None
+
+    @property
+    def mean_latency(self):
+        """
+        Average duration of a read in seconds
+        """
+        return self.total_latency / self.reads if self.reads else 0.
+
+    @property
+    def failure_rate(self):
+        """
+        Fraction of reads that failed
+        """
+        return self.failures / self.reads if self.reads else 0.
+
+    def as_dict(self):
+        return {'reads': self.reads, 'failures': self.failures,
+                'slow': self.slow, 'strikes': self.strikes,
+                'latency': self.latency, 'mean_latency': self.mean_latency,
+                'failure_rate': self.failure_rate,
+                'quarantined': self.quarantined_until is not None}
+
+
+class StateCache:
+    """
+    Cache of monitored device states
+
+    Parameters
+    ----------
+    max_age : float, optional
+        Number of seconds a cached state is trusted before it is read again
+        synchronously. If left as None, cached states are trusted until the
+        next time the device reports a state change
+
+    policy : :class:`.QuarantinePolicy`, optional
+        Quarantine devices that are persistently slow or failing. By default,
+        devices are always read when their cached state is stale
+
+    Attributes
+    ----------
+    hits : int
+        Number of requests answered from the cache
+
+    misses : int
+        Number of requests that required a synchronous read
+    """
+    def __init__(self, max_age=None, policy=None):
+        self.max_age = max_age
+        self.policy = policy
+        self.hits = 0
+        self.misses = 0
+        self._states = dict()
+        self._watched = set()
+        self._health = dict()
+        self._callbacks = dict()
+
+    def watch(self, device):
+        """
+        Subscribe to the ``SUB_STATE`` events of a device
+
+        Watching the same device multiple times only creates a single
+        subscription
+
+        Parameters
+        ----------
+        device : ophyd.Device
+        """
+        if device in self._watched:
+            return
+        try:
+            device.subscribe(self._state_changed,
+                             event_type=device.SUB_STATE,
+                             run=False)
+        except Exception:
+            logger.error("StateCache is unable to subscribe "
+                         "to device %s", device.name)
+        else:
+            self._watched.add(device)
+
+    def unwatch(self, device):
+        """
+        Remove the subscription to a device and forget its state
+
+        Callbacks added with :meth:`.subscribe` for the device are removed
+
+        Parameters
+        ----------
+        device : ophyd.Device
+        """
+        if device in self._watched:
+            device.clear_sub(self._state_changed)
+            self._watched.discard(device)
+        self._callbacks.pop(device, None)
+        self.invalidate(device)
+
+    def subscribe(self, device, callback):
+        """
+        Run a callback each time a watched device changes state
+
+        The callback is run after the new state has been stored, so that it
+        can be retrieved with :meth:`.state` without another read. This does
+        not depend on the order in which objects subscribed to the device.
+        The device is watched if it was not already
+
+        Parameters
+        ----------
+        device : ophyd.Device
+
+        callback : callable
+            Called with the keywords ``obj`` and ``state``
+        """
+        self.watch(device)
+        callbacks = self._callbacks.setdefault(device, list())
+        if callback not in callbacks:
+            callbacks.append(callback)
+
+    def clear_sub(self, callback, device=None):
+        """
+        Remove a callback added with :meth:`.subscribe`
+
+        Parameters
+        ----------
+        callback : callable
+
+        device : ophyd.Device, optional
+            Only remove the callback from this device. By default, the
+            callback is removed from every device
+        """
+        if device is None:
+            devices = list(self._callbacks)
+        else:
+            devices = [device]
+        for device in devices:
+            callbacks = self._callbacks.get(device, list())
+            if callback in callbacks:
+                callbacks.remove(callback)
+
+    def update(self, device):
+        """
+        Read the state of a device and store it in the cache
+
+        Parameters
+        ----------
+        device : ophyd.Device
+
+        Returns
+        -------
+        state : DeviceState
+        """
+        t0 = time.monotonic()
+        state = find_device_state(device)
+        now = time.monotonic()
+        self._states[device] = (state, now)
+        self._record_read(device, state, now - t0, now)
+        return state
+
+    def health(self, device):
+        """
+        Read statistics of a device
+
+        Parameters
+        ----------
+        device : ophyd.Device
+
+        Returns
+        -------
+        health : :class:`.DeviceHealth`
+        """
+        try:
+            return self._health[device]
+        except KeyError:
+            health = self._health[device] = DeviceHealth()
+            return health
+
+    @property
+    def quarantined(self):
+        """
+        Devices that are currently quarantined
+        """
+        now = time.monotonic()
+        return set(device for device, health in self._health.items()
+                   if health.quarantined_until is not None
+                   and now < health.quarantined_until)
+
+    def _record_read(self, device, state, latency, now):
+        """
+        Update the statistics of a device after a read and apply the policy
+        """
+        health = self.health(device)
+        health.reads += 1
+        health.latency = latency
+        health.total_latency += latency
+        if state in QuarantinePolicy.failures:
+            health.failures += 1
+        if self.policy is None:
+            return
+        slow = latency > self.policy.slow
+        health.slow += slow
+        # Healthy read
+        if not slow and state not in self.policy.failures:
+            health.strikes = 0
+            if health.quarantined_until is not None:
+                logger.info("Reintegrating %s after a healthy read",
+                            device.name)
+                health.quarantined_until = None
+            return
+        health.strikes += 1
+        if health.strikes >= self.policy.strikes:
+            if health.quarantined_until is None:
+                logger.warning("Quarantining %s after %s slow or failed "
+                               "reads, last read took %.3f s", device.name,
+                               health.strikes, latency)
+            health.quarantined_until = now + self.policy.duration
+
+    def set(self, device, state, timestamp=None):
+        """
+        Store a known state for a device without reading it
+
+        Parameters
+        ----------
+        device : ophyd.Device
+
+        state : DeviceState
+
+        timestamp : float, optional
+            Value of :func:`time.monotonic` when the state was observed. By
+            default, the current time is used
+        """
+        if timestamp is None:
+            timestamp = time.monotonic()
+        self._states[device] = (state, timestamp)
+
+    def age(self, device):
+        """
+        Number of seconds since the state of the device was last updated
+
+        Devices that have never been cached are infinitely old
+        """
+        try:
+            return time.monotonic() - self._states[device][1]
+        except KeyError:
+            return float('inf')
+
+    def is_stale(self, device):
+        """
+        Whether the cached state of the device can no longer be trusted
+        """
+        if device not in self._states:
+            return True
+        # Failed reads are retried when a quarantine policy is in place
+        if (self.policy is not None
+                and self._states[device][0] in self.policy.failures):
+            return True
+        if self.max_age is None:
+            return False
+        return self.age(device) > self.max_age
+
+    def state(self, device):
+        """
+        Report the state of a device
+
+        The cached value is returned unless it is stale, in which case the
+        device is read synchronously and the cache is refreshed
+
+        Parameters
+        ----------
+        device : ophyd.Device
+
+        Returns
+        -------
+        state : DeviceState
+        """
+        if self.is_stale(device):
+            # Do not block on devices that have recently misbehaved
+            health = self._health.get(device)
+            if (health and health.quarantined_until is not None
+                    and time.monotonic() < health.quarantined_until):
+                self.hits += 1
+                return DeviceState.Disconnected
+            self.misses += 1
+            return self.update(device)
+        self.hits += 1
+        return self._states[device][0]
+
+    def invalidate(self, device=None):
+        """
+        Forget the cached state of a device, or every device if None is given
+        """
+        if device is None:
+            self._states.clear()
+        else:
+            self._states.pop(device, None)
+
+    def _state_changed(self, *args, obj=None, **kwargs):
+        """
+        Run when a watched device changes state
+        """
+        if obj is None:
+            return
+        state = self.update(obj)
+        for callback in list(self._callbacks.get(obj, list())):
+            try:
+                callback(obj=obj, state=state)
+            except Exception:
+                logger.exception("Error running StateCache callback %r "
+                                 "for %s", callback, obj.name)
+
+    def __contains__(self, device):
+        return device in self._states
+
+    def __len__(self):
+        return len(self._states)
+
+    def __repr__(self):
+        return ('<StateCache devices={} max_age={}>'
+                ''.format(len(self), self.max_age))
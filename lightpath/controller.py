@@ -9,11 +9,11 @@ beampath will include devices in both the FEE and the XRT. The
 where the beam is and what the state of the MPS system is currently.
 """
 import math
+import time
 import logging
 
-from happi.loader import from_container
-
 from .path import BeamPath
+from .cache import StateCache
 from .config import beamlines
 
 logger = logging.getLogger(__name__)
@@ -31,6 +31,13 @@ class LightController:
     containers: list
         List of happi Device objects that were unable to be instantiated
 
+    search_times : dict
+        Seconds spent searching the happi client for each section of
+        beamline, keyed by ``(line, start, end)``
+
+    load_times : dict
+        Seconds spent instantiating each device, keyed by name
+
     Parameters
     ----------
     client : happi.Client
@@ -39,11 +46,26 @@ class LightController:
     endstations: list, optional
         List of experimental endstations to load BeamPath objects for. If left
         as None, all endstations will be loaded
+
+    cache : :class:`.StateCache`, optional
+        Cache of monitored device states shared by all of the loaded
+        :class:`.BeamPath` objects and their displays. A new cache is created
+        by default, so that each state change is only read once. Pass
+        ``False`` to have every path read its devices synchronously
+
+    history : :class:`.StateHistory`, optional
+        Recorded beamline states used to answer queries about past times
     """
-    def __init__(self, client, endstations=None):
+    def __init__(self, client, endstations=None, cache=None, history=None):
         self.client = client
+        if cache is None:
+            cache = StateCache()
+        self.cache = None if cache is False else cache
+        self.history = history
         self.containers = list()
         self.beamlines = dict()
+        self.search_times = dict()
+        self.load_times = dict()
         endstations = endstations or beamlines.keys()
         # Find the requisite beamlines to reach our endstation
         for beamline in endstations:
@@ -62,6 +84,8 @@ class LightController:
         -------
         path: BeamPath
         """
+        from happi.loader import from_container
+
         try:
             path = beamlines[endstation]
             path[endstation] = dict()
@@ -79,8 +103,10 @@ class LightController:
             end = info.get('end', math.inf)
             logger.debug("Searching for devices on line %s between %s and %s",
                          line, start, end)
+            t0 = time.perf_counter()
             containers = self.client.search(beamline=line, active=True,
                                             start=start, end=end)
+            self.search_times[(line, start, end)] = time.perf_counter() - t0
             # Ensure we actually found valid devices
             if not containers:
                 logger.error("No valid beamline devices found for %s", line)
@@ -88,14 +114,17 @@ class LightController:
             # Load all the devices we found
             logger.debug("Found %s devices along %s", len(containers), line)
             for c in containers:
+                t0 = time.perf_counter()
                 try:
                     dev = from_container(c)
                     devices.append(dev)
                 except Exception as exc:
                     logger.exception("Failure loading %s ...", c.name)
                     self.containers.append(c)
+                finally:
+                    self.load_times[c.name] = time.perf_counter() - t0
         # Create the beamline from the loaded devices
-        bp = BeamPath(*devices, name=line)
+        bp = BeamPath(*devices, name=line, cache=self.cache)
         self.beamlines[line] = bp
         # Set as attribute for easy access
         setattr(self, bp.name.replace(' ', '_').lower(), bp)
@@ -133,6 +162,74 @@ class LightController:
 
         return list(set(devices))
 
+    def impediment_at(self, beamline, t):
+        """
+        Impediment of a beamline at a past time
+
+        Parameters
+        ----------
+        beamline : str
+            Name of the beamline
+
+        t : float
+            Wall clock time in seconds since the epoch
+
+        Returns
+        -------
+        device : :class:`.ReplayDevice` or None
+            Stand-in for the impeding device in the state it had at ``t``
+        """
+        return self._history.impediment_at(beamline, t)
+
+    def destinations_at(self, t):
+        """
+        Device destinations of the photon beam at a past time
+        """
+        paths = self._history.at(t).values()
+        return list(set([p.impediment for p in paths
+                         if p.impediment and p.impediment not in p.branches]))
+
+    def incident_devices_at(self, t):
+        """
+        Devices in contact with photons at a past time
+        """
+        devices = list()
+
+        for line in self._history.at(t).values():
+            devices.extend(line.incident_devices)
+
+        return list(set(devices))
+
+    def impediments_between(self, beamline, start, end):
+        """
+        Changes of the impediment of a beamline over an interval
+
+        Parameters
+        ----------
+        beamline : str
+            Name of the beamline
+
+        start : float
+
+        end : float
+
+        Returns
+        -------
+        changes : list
+            Tuples of time and impediment name, None if the beamline was clear
+
+        See Also
+        --------
+        :meth:`.StateHistory.impediments_between`
+        """
+        return self._history.impediments_between(beamline, start, end)
+
+    @property
+    def _history(self):
+        if self.history is None:
+            raise ValueError("LightController was not given a StateHistory")
+        return self.history
+
     def path_to(self, device):
         """
         Create a BeamPath from the source to the requested device
@@ -4,3 +4,7 @@ class CoordinateError(Exception):
 
 class PathError(Exception):
     pass
+
+
+class SequenceError(Exception):
+    pass
@@ -0,0 +1,243 @@
+"""
+Publishing the lightpath on a web page should not require Qt. The
+:class:`.SVGExporter` renders each path of a :class:`.LightController`, or a
+single :class:`.BeamPath`, as a self-contained SVG image listing the ordered
+devices, their states, the impediment and the devices the beam reaches. The
+images are gathered into a single HTML page that needs no external resources.
+
+.. code:: python
+
+    exporter = SVGExporter(controller)
+    exporter.write('/var/www/lightpath')
+
+The exporter is designed to be run repeatedly, for example every second by
+the ``lightpath-daemon --export`` option. The drawing of each device is cached
+and only redrawn when its state or the beam reaching it changes, an image is
+only assembled again if one of its devices was redrawn, and files are only
+written when their contents changed.
+"""
+import os
+import time
+import logging
+from html import escape
+
+logger = logging.getLogger(__name__)
+
+
+class SVGExporter:
+    """
+    Render the state of paths to SVG and HTML
+
+    Parameters
+    ----------
+    source : :class:`.LightController` or :class:`.BeamPath`
+        Every path of :attr:`.LightController.beamlines` is rendered, or the
+        single path given
+
+    minimum_transmission : float, optional
+        Threshold used to evaluate every path. By default, each path is
+        evaluated with its own :attr:`.BeamPath.minimum_transmission`
+
+    Attributes
+    ----------
+    rendered : int
+        Number of device drawings rendered, drawings taken from the cache are
+        not counted
+    """
+    row_height = 24
+    width = 480
+    # Colors used for the state of each device and the beam
+    colors = {'Removed': 'rgb(124,252,0)',
+              'Unknown': 'rgb(255,215,0)',
+              'Disconnected': 'rgb(255,0,255)'}
+    error_color = 'red'
+    lit_color = 'cyan'
+    unlit_color = 'gray'
+
+    def __init__(self, source, minimum_transmission=None):
+        self.source = source
+        self.minimum_transmission = minimum_transmission
+        self.rendered = 0
+        self._fragments = dict()
+        self._images = dict()
+        self._written = dict()
+
+    @property
+    def paths(self):
+        """
+        Paths to render keyed by name
+        """
+        beamlines = getattr(self.source, 'beamlines', None)
+        if beamlines is None:
+            return {self.source.name: self.source}
+        return dict(beamlines)
+
+    def render(self):
+        """
+        Render every path from a single set of device reads
+
+        Returns
+        -------
+        images : dict
+            SVG document of each path keyed by name
+        """
+        readings = dict()
+        images = dict()
+        for name, path in sorted(self.paths.items()):
+            snapshot = path.snapshot(readings=readings)
+            threshold = self.minimum_transmission
+            if threshold is None:
+                threshold = path.minimum_transmission
+            impediment = snapshot.impediment(threshold)
+            images[name] = self.render_path(path, snapshot.states, impediment)
+        return images
+
+    def render_path(self, path, states, impediment):
+        """
+        Render a single path
+
+        Parameters
+        ----------
+        path : :class:`.BeamPath`
+
+        states : mapping
+            :class:`.DeviceState` of each device along the path
+
+        impediment : device or None
+            First device blocking the beam
+
+        Returns
+        -------
+        svg : str
+        """
+        block = impediment.md.z if impediment else float('inf')
+        keys = tuple((device, i, states[device].name, device.md.z <= block,
+                      device is impediment)
+                     for i, device in enumerate(path.path))
+        # Reuse the previous image if none of the drawings changed
+        try:
+            previous, svg = self._images[path.name]
+            if previous == keys:
+                return svg
+        except KeyError:
+            pass
+        rows = [self._fragment(key) for key in keys]
+        height = self.row_height * len(rows)
+        svg = ('<svg xmlns="http://www.w3.org/2000/svg" width="{width}" '
+               'height="{height}" font-family="sans-serif" font-size="12">'
+               '<title>{title}</title>'
+               '<rect width="100%" height="100%" fill="black"/>{rows}</svg>'
+               ''.format(width=self.width, height=height,
+                         title=escape(str(path.name)), rows=''.join(rows)))
+        self._images[path.name] = (keys, svg)
+        return svg
+
+    def html(self, images=None):
+        """
+        Gather the images of every path into an HTML page
+
+        Parameters
+        ----------
+        images : dict, optional
+            Images returned by :meth:`.render`, rendered if not given
+
+        Returns
+        -------
+        html : str
+        """
+        if images is None:
+            images = self.render()
+        sections = ''.join('<section><h2>{}</h2>{}</section>'
+                           ''.format(escape(str(name)), svg)
+                           for name, svg in sorted(images.items()))
+        return ('<!DOCTYPE html><html><head><meta charset="utf-8">'
+                '<title>Lightpath</title></head>'
+                '<body style="background:black;color:white">'
+                '<h1>Lightpath</h1>{}</body></html>'.format(sections))
+
+    def write(self, directory):
+        """
+        Write an SVG file for each path and an ``index.html`` page
+
+        Files are replaced atomically and only if their contents changed
+
+        Parameters
+        ----------
+        directory : str
+
+        Returns
+        -------
+        written : list
+            Paths of the files written
+        """
+        os.makedirs(directory, exist_ok=True)
+        images = self.render()
+        files = dict(('{}.svg'.format(name), svg)
+                     for name, svg in images.items())
+        files['index.html'] = self.html(images)
+        written = list()
+        for filename, contents in files.items():
+            filename = os.path.join(directory, filename)
+            if self._written.get(filename) == contents:
+                continue
+            temporary = filename + '.tmp'
+            with open(temporary, 'w') as f:
+                f.write(contents)
+            os.replace(temporary, filename)
+            self._written[filename] = contents
+            written.append(filename)
+        logger.debug("Wrote %s files to %s", len(written), directory)
+        return written
+
+    def follow(self, directory, interval=1., stop=None):
+        """
+        Write the files every interval until stopped
+
+        Parameters
+        ----------
+        directory : str
+
+        interval : float, optional
+            Seconds between exports
+
+        stop : threading.Event, optional
+            Return once set
+        """
+        while stop is None or not stop.is_set():
+            t0 = time.monotonic()
+            try:
+                self.write(directory)
+            except Exception:
+                logger.exception("Unable to export the lightpath to %s",
+                                 directory)
+            wait = max(interval - (time.monotonic() - t0), 0.)
+            if stop is None:
+                time.sleep(wait)
+            else:
+                stop.wait(wait)
+
+    def _fragment(self, key):
+        """
+        Drawing of a single device, cached by everything it shows
+        """
+        try:
+            return self._fragments[key]
+        except KeyError:
+            pass
+        device, i, state, lit, blocking = key
+        fragment = ('<g transform="translate(0,{y})">'
+                    '<rect x="2" y="2" width="16" height="{h}" fill="{beam}"/>'
+                    '<text x="28" y="16" fill="white"{weight}>{name}</text>'
+                    '<text x="{x}" y="16" fill="{color}" text-anchor="end">'
+                    '{state}</text></g>'
+                    ''.format(y=i * self.row_height, h=self.row_height - 4,
+                              beam=self.lit_color if lit
+                              else self.unlit_color,
+                              weight=' font-weight="bold"' if blocking
+                              else '',
+                              name=escape(device.name), x=self.width - 8,
+                              color=self.colors.get(state, self.error_color),
+                              state=state))
+        self._fragments[key] = fragment
+        self.rendered += 1
+        return fragment
@@ -0,0 +1,346 @@
+"""
+Replaying a :mod:`lightpath.journal` from the start becomes slow once weeks
+of transitions have been recorded. The :class:`.StateHistory` instead ingests
+journals into an indexed SQLite database. Finding the state of every device at
+a given time is then a single indexed lookup per device, after which the
+recorded paths are evaluated with the same :class:`.ReplayDevice` stand-ins
+used by the :class:`.JournalReplay`. Each query is given its own stand-ins,
+so that queries for different times can be made concurrently.
+
+Journals are only ever appended to, and ingesting one again after it has
+grown only adds the transitions that were not already stored.
+
+A history is usually queried through a :class:`.LightController`:
+
+.. code:: python
+
+    history = StateHistory('lightpath.db')
+    history.ingest('lightpath.journal')
+    controller = LightController(client, history=history)
+    controller.impediment_at('MEC', time.time() - 3600)
+"""
+import json
+import sqlite3
+import logging
+import threading
+
+from .state import DeviceState
+from .journal import (read_journal, ReplayDevice, DeviceRecord, PathRecord,
+                      StateRecord, DestinationRecord, ImpedimentRecord,
+                      TransmissionRecord)
+
+logger = logging.getLogger(__name__)
+
+_schema = """
+CREATE TABLE IF NOT EXISTS devices (id INTEGER PRIMARY KEY,
+                                    name TEXT UNIQUE NOT NULL,
+                                    prefix TEXT, z REAL, beamline TEXT,
+                                    transmission REAL, branches TEXT);
+CREATE TABLE IF NOT EXISTS paths (name TEXT PRIMARY KEY, devices TEXT);
+CREATE TABLE IF NOT EXISTS states (time REAL, device INTEGER, state INTEGER);
+CREATE TABLE IF NOT EXISTS destinations (time REAL, device INTEGER,
+                                         destination TEXT);
+CREATE TABLE IF NOT EXISTS impediments (time REAL, path TEXT, device TEXT);
+CREATE TABLE IF NOT EXISTS transmissions (time REAL, device INTEGER,
+                                          transmission REAL);
+CREATE UNIQUE INDEX IF NOT EXISTS states_device_time
+    ON states (device, time, state);
+CREATE UNIQUE INDEX IF NOT EXISTS destinations_device_time
+    ON destinations (device, time, destination);
+CREATE UNIQUE INDEX IF NOT EXISTS impediments_path_time
+    ON impediments (path, time, IFNULL(device, ''));
+CREATE UNIQUE INDEX IF NOT EXISTS transmissions_device_time
+    ON transmissions (device, time, transmission);
+"""
+
+
+class StateHistory:
+    """
+    Indexed on-disk store of recorded beamline states
+
+    Parameters
+    ----------
+    filename : str
+        SQLite database to use, created if it does not exist. ``':memory:'``
+        keeps the history in memory
+
+    Attributes
+    ----------
+    devices : dict
+        :class:`.DeviceRecord` of each recorded device keyed by name
+
+    paths : dict
+        Names of the devices along each recorded path keyed by name
+    """
+    def __init__(self, filename):
+        self.filename = filename
+        self._db = sqlite3.connect(filename, check_same_thread=False)
+        self._db.executescript(_schema)
+        self._lock = threading.RLock()
+        self.devices = dict()
+        self.paths = dict()
+        self._load()
+
+    def ingest(self, journal):
+        """
+        Add the contents of a journal to the history
+
+        Parameters
+        ----------
+        journal : str
+            Filename of a journal written by a :class:`.JournalWriter`
+
+        Transitions that are already stored are skipped, so a journal can be
+        ingested again each time it has grown
+
+        Returns
+        -------
+        count : int
+            Number of state transitions added
+        """
+        states, destinations, impediments = list(), list(), list()
+        transmissions = list()
+        ids = dict()
+        with self._lock, self._db:
+            for record in read_journal(journal):
+                if isinstance(record, StateRecord):
+                    states.append((record.time, ids[record.device.name],
+                                   record.state.value))
+                elif isinstance(record, DestinationRecord):
+                    destinations.append((record.time,
+                                         ids[record.device.name],
+                                         json.dumps(record.destination)))
+                elif isinstance(record, TransmissionRecord):
+                    transmissions.append((record.time,
+                                          ids[record.device.name],
+                                          record.transmission))
+                elif isinstance(record, ImpedimentRecord):
+                    impediments.append((record.time, record.path.name,
+                                        record.device.name
+                                        if record.device else None))
+                elif isinstance(record, DeviceRecord):
+                    ids[record.name] = self._define_device(record)
+                elif isinstance(record, PathRecord):
+                    self._db.execute('INSERT OR REPLACE INTO paths '
+                                     'VALUES (?, ?)',
+                                     (record.name,
+                                      json.dumps([d.name for d in
+                                                  record.devices])))
+            added = self._db.executemany('INSERT OR IGNORE INTO states '
+                                         'VALUES (?, ?, ?)', states).rowcount
+            self._db.executemany('INSERT OR IGNORE INTO destinations '
+                                 'VALUES (?, ?, ?)', destinations)
+            self._db.executemany('INSERT OR IGNORE INTO impediments '
+                                 'VALUES (?, ?, ?)', impediments)
+            self._db.executemany('INSERT OR IGNORE INTO transmissions '
+                                 'VALUES (?, ?, ?)', transmissions)
+        logger.info("Ingested %s new transitions from %s", added, journal)
+        self._load()
+        return added
+
+    @property
+    def range(self):
+        """
+        Time of the first and last recorded transition
+        """
+        with self._lock:
+            return tuple(self._db.execute('SELECT MIN(time), MAX(time) '
+                                          'FROM states').fetchone())
+
+    def states_at(self, t):
+        """
+        State of every recorded device at a given time
+
+        Devices that had not been recorded yet are left out
+
+        Parameters
+        ----------
+        t : float
+            Wall clock time in seconds since the epoch
+
+        Returns
+        -------
+        states : dict
+            :class:`.DeviceState` keyed by device name
+        """
+        with self._lock:
+            rows = self._db.execute(
+                    'SELECT d.name, (SELECT state FROM states '
+                    '                WHERE device = d.id AND time <= ? '
+                    '                ORDER BY time DESC LIMIT 1) '
+                    'FROM devices d', (t,)).fetchall()
+        return dict((name, DeviceState(state)) for name, state in rows
+                    if state is not None)
+
+    def at(self, t):
+        """
+        Evaluate the recorded paths at a given time
+
+        Parameters
+        ----------
+        t : float
+
+        Returns
+        -------
+        paths : dict
+            :class:`.BeamPath` of each recorded path keyed by name. The paths
+            are made of new :class:`.ReplayDevice` objects in their state at
+            ``t``, which are not shared with any other query
+        """
+        from .path import BeamPath
+
+        states = self.states_at(t)
+        with self._lock:
+            rows = self._db.execute(
+                    'SELECT d.name, (SELECT destination FROM destinations '
+                    '                WHERE device = d.id AND time <= ? '
+                    '                ORDER BY time DESC LIMIT 1) '
+                    "FROM devices d WHERE d.branches != '[]'",
+                    (t,)).fetchall()
+            changed = self._db.execute(
+                    'SELECT d.name, (SELECT transmission FROM transmissions '
+                    '                WHERE device = d.id AND time <= ? '
+                    '                ORDER BY time DESC LIMIT 1) '
+                    'FROM devices d', (t,)).fetchall()
+            records, paths = dict(self.devices), dict(self.paths)
+        destinations = dict((name, json.loads(dest))
+                            for name, dest in rows if dest is not None)
+        transmissions = dict((name, trans) for name, trans in changed
+                             if trans is not None)
+        devices = dict()
+        for name, record in records.items():
+            device = ReplayDevice(record)
+            device.state = states.get(name, DeviceState.Unknown)
+            device._destination = destinations.get(name)
+            device.transmission = transmissions.get(name,
+                                                    record.transmission)
+            devices[name] = device
+        return dict((name, BeamPath(*[devices[d] for d in names], name=name))
+                    for name, names in paths.items())
+
+    def impediment_at(self, path, t):
+        """
+        Impediment of a path at a given time
+
+        Parameters
+        ----------
+        path : str
+            Name of the path
+
+        t : float
+
+        Returns
+        -------
+        device : :class:`.ReplayDevice` or None
+        """
+        return self._path(path, t).impediment
+
+    def incident_devices_at(self, path, t):
+        """
+        Devices of a path the beam was incident on at a given time
+        """
+        return self._path(path, t).incident_devices
+
+    def impediments_between(self, path, start, end):
+        """
+        Recorded changes of the impediment of a path over an interval
+
+        The impediment in effect at the start of the interval is included
+
+        Parameters
+        ----------
+        path : str
+            Name of the path
+
+        start : float
+
+        end : float
+
+        Returns
+        -------
+        changes : list
+            Tuples of time and impediment name, None if the path was clear
+        """
+        with self._lock:
+            first = self._db.execute(
+                    'SELECT time, device FROM impediments '
+                    'WHERE path = ? AND time <= ? '
+                    'ORDER BY time DESC LIMIT 1', (path, start)).fetchall()
+            rows = self._db.execute(
+                    'SELECT time, device FROM impediments '
+                    'WHERE path = ? AND time > ? AND time <= ? '
+                    'ORDER BY time', (path, start, end)).fetchall()
+        return [tuple(row) for row in first + rows]
+
+    def transitions_between(self, start, end, device=None):
+        """
+        Recorded state transitions over an interval
+
+        Parameters
+        ----------
+        start : float
+
+        end : float
+
+        device : str, optional
+            Only report transitions of a single device
+
+        Returns
+        -------
+        transitions : list
+            Tuples of time, device name and :class:`.DeviceState`
+        """
+        query = ('SELECT s.time, d.name, s.state FROM states s '
+                 'JOIN devices d ON s.device = d.id '
+                 'WHERE s.time >= ? AND s.time <= ?')
+        args = [start, end]
+        if device:
+            query += ' AND d.name = ?'
+            args.append(device)
+        with self._lock:
+            rows = self._db.execute(query + ' ORDER BY s.time',
+                                    args).fetchall()
+        return [(t, name, DeviceState(state)) for t, name, state in rows]
+
+    def close(self):
+        """
+        Close the underlying database
+        """
+        with self._lock:
+            self._db.close()
+
+    def _path(self, path, t):
+        try:
+            return self.at(t)[path]
+        except KeyError:
+            raise ValueError("No history recorded for path {}".format(path))
+
+    def _define_device(self, record):
+        self._db.execute('INSERT OR IGNORE INTO devices (name) VALUES (?)',
+                         (record.name,))
+        self._db.execute('UPDATE devices SET prefix = ?, z = ?, '
+                         'beamline = ?, transmission = ?, branches = ? '
+                         'WHERE name = ?',
+                         (record.prefix, record.z, record.beamline,
+                          record.transmission, json.dumps(record.branches),
+                          record.name))
+        return self._db.execute('SELECT id FROM devices WHERE name = ?',
+                                (record.name,)).fetchone()[0]
+
+    def _load(self):
+        """
+        Read the devices and paths stored in the database
+        """
+        with self._lock:
+            for (dev_id, name, prefix, z, beamline,
+                 transmission, branches) in self._db.execute(
+                                        'SELECT * FROM devices'):
+                self.devices[name] = DeviceRecord(dev_id, name, prefix, z,
+                                                  beamline, transmission,
+                                                  json.loads(branches))
+            for name, devices in self._db.execute('SELECT * FROM paths'):
+                self.paths[name] = json.loads(devices)
+
+    def __repr__(self):
+        return '<StateHistory {} devices={}>'.format(self.filename,
+                                                     len(self.devices))
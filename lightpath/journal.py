@@ -0,0 +1,605 @@
+"""
+The :class:`.JournalWriter` keeps an append-only binary record of everything
+that happens along a set of :class:`.BeamPath` objects. Each device and path
+is described once, after which every state transition, transmission, branch
+destination and impediment change is stored as a small fixed-size record
+stamped with the wall clock time. The journal is written from the subscription
+callbacks of the paths and of a :class:`.StateCache`, which hands over the new
+state of each device so that no read is made from the callbacks, only
+buffering a few bytes per event.
+
+The :class:`.JournalReplay` reads a journal back, recreating each device as a
+:class:`.ReplayDevice` and each path as a :class:`.BeamPath` of these
+stand-ins. Moving to any moment in time only requires a binary search through
+the history of each device, after which the regular :class:`.BeamPath`
+evaluation reproduces the impediment, blocking and incident devices exactly as
+they were, without access to the original hardware.
+
+The module can also be run as a script to print the state of a journal at a
+given time:
+
+.. code::
+
+    python -m lightpath.journal lightpath.journal --time 1520000000
+"""
+import sys
+import time
+import struct
+import bisect
+import logging
+import argparse
+import threading
+from types import SimpleNamespace
+from collections import namedtuple
+
+from .cache import StateCache
+from .state import DeviceState, find_device_state
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'LPJ1'
+
+# Record types
+DEVICE = b'D'
+PATH = b'P'
+STATE = b'S'
+DESTINATION = b'T'
+IMPEDIMENT = b'I'
+TRANSMISSION = b'X'
+
+# Fixed parts of each record
+_device = struct.Struct('<Hdd')
+_path = struct.Struct('<HH')
+_state = struct.Struct('<dHB')
+_destination = struct.Struct('<dHB')
+_impediment = struct.Struct('<dHi')
+_transmission = struct.Struct('<dHd')
+_length = struct.Struct('<H')
+_id = struct.Struct('<H')
+
+DeviceRecord = namedtuple('DeviceRecord', ('id', 'name', 'prefix', 'z',
+                                           'beamline', 'transmission',
+                                           'branches'))
+PathRecord = namedtuple('PathRecord', ('id', 'name', 'devices'))
+StateRecord = namedtuple('StateRecord', ('time', 'device', 'state'))
+DestinationRecord = namedtuple('DestinationRecord', ('time', 'device',
+                                                     'destination'))
+ImpedimentRecord = namedtuple('ImpedimentRecord', ('time', 'path', 'device'))
+TransmissionRecord = namedtuple('TransmissionRecord', ('time', 'device',
+                                                       'transmission'))
+
+
+def _pack_str(value):
+    data = str(value).encode('utf-8')
+    return _length.pack(len(data)) + data
+
+
+def _unpack_str(buf, offset):
+    (size,) = _length.unpack_from(buf, offset)
+    offset += _length.size
+    end = offset + size
+    if end > len(buf):
+        raise struct.error('Truncated string')
+    return bytes(buf[offset:end]).decode('utf-8'), end
+
+
+class JournalWriter:
+    """
+    Append-only journal of device and path state changes
+
+    Parameters
+    ----------
+    filename : str
+        File to append to. A new journal is started if the file is empty
+
+    flush_every : int, optional
+        Number of records buffered before they are flushed to disk
+
+    cache : :class:`.StateCache`, optional
+        Cache monitoring the devices of attached paths that do not have a
+        cache of their own. A new cache is created by default
+    """
+    def __init__(self, filename, flush_every=64, cache=None):
+        self.filename = filename
+        self.flush_every = flush_every
+        self.cache = cache if cache is not None else StateCache()
+        self._file = open(filename, 'ab')
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+        else:
+            # Drop any partial record left by an interrupted writer
+            length = _complete_length(filename)
+            if length < self._file.tell():
+                logger.warning("Removing truncated record from %s", filename)
+                self._file.truncate(length)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._devices = dict()
+        self._paths = dict()
+        self._states = dict()
+        self._destinations = dict()
+        self._transmissions = dict()
+        self._impediments = dict()
+        self._caches = dict()
+        self._attached = list()
+
+    def attach(self, path):
+        """
+        Record the changes along a path
+
+        The devices and path are described in the journal, their current
+        states and transmissions are recorded and subscriptions are made so
+        that subsequent changes are appended automatically. Devices are
+        monitored through the cache of the path, or :attr:`.cache` if the
+        path has none
+
+        Parameters
+        ----------
+        path : :class:`.BeamPath`
+        """
+        with self._lock:
+            ids = [self._define_device(device) for device in path.path]
+            path_id = len(self._paths)
+            # BeamPath objects are not hashable, key them by identity
+            self._paths[id(path)] = path_id
+            self._write(PATH + _path.pack(path_id, len(ids))
+                        + _pack_str(path.name)
+                        + b''.join(_id.pack(i) for i in ids))
+        # Initial state is recorded as a single snapshot
+        now = time.time()
+        for device in path.devices:
+            if device not in self._caches:
+                cache = path.cache if path.cache is not None else self.cache
+                self._caches[device] = cache
+                cache.subscribe(device, self._device_changed)
+            cache = self._caches[device]
+            self.record_state(device, find_device_state(device, cache=cache),
+                              timestamp=now)
+            self.record_transmission(device, timestamp=now)
+        self.record_impediment(path, path.impediment, timestamp=now)
+        path.subscribe(self._path_changed, event_type=path.SUB_PTH_CHNG,
+                       run=False)
+        self._attached.append(path)
+
+    def attach_controller(self, controller):
+        """
+        Record the changes along every path of a :class:`.LightController`
+        """
+        for path in controller.beamlines.values():
+            self.attach(path)
+
+    def record_state(self, device, state, timestamp=None):
+        """
+        Append a device state if it differs from the last recorded one
+        """
+        with self._lock:
+            if self._states.get(device) == state:
+                return
+            self._states[device] = state
+            if timestamp is None:
+                timestamp = time.time()
+            self._write(STATE + _state.pack(timestamp,
+                                            self._devices[device],
+                                            state.value))
+            # Branching devices also change the destination of the beam
+            if getattr(device, 'branches', False):
+                try:
+                    destination = list(device.destination)
+                except Exception:
+                    logger.debug("Unable to determine destination of %s",
+                                 device.name)
+                    return
+                if self._destinations.get(device) != destination:
+                    self._destinations[device] = destination
+                    self._write(DESTINATION
+                                + _destination.pack(timestamp,
+                                                    self._devices[device],
+                                                    len(destination))
+                                + b''.join(_pack_str(line)
+                                           for line in destination))
+
+    def record_transmission(self, device, transmission=None, timestamp=None):
+        """
+        Append the transmission of a device if it differs from the last
+        recorded one
+
+        This is checked each time the device changes state. Changes made
+        without a state change can be recorded by calling this directly
+
+        Parameters
+        ----------
+        device : ophyd.Device
+
+        transmission : float, optional
+            By default, the ``transmission`` attribute of the device
+        """
+        if transmission is None:
+            transmission = getattr(device, 'transmission', 1.0)
+        with self._lock:
+            if self._transmissions.get(device) == transmission:
+                return
+            self._transmissions[device] = transmission
+            if timestamp is None:
+                timestamp = time.time()
+            self._write(TRANSMISSION
+                        + _transmission.pack(timestamp,
+                                             self._devices[device],
+                                             transmission))
+
+    def record_impediment(self, path, device, timestamp=None):
+        """
+        Append the impediment of a path if it has changed
+        """
+        with self._lock:
+            dev_id = self._devices[device] if device is not None else -1
+            if self._impediments.get(id(path), -2) == dev_id:
+                return
+            self._impediments[id(path)] = dev_id
+            if timestamp is None:
+                timestamp = time.time()
+            self._write(IMPEDIMENT + _impediment.pack(timestamp,
+                                                      self._paths[id(path)],
+                                                      dev_id))
+
+    def flush(self):
+        """
+        Write all buffered records to disk
+        """
+        with self._lock:
+            self._file.flush()
+            self._pending = 0
+
+    def close(self):
+        """
+        Remove all subscriptions and close the journal
+        """
+        for device, cache in self._caches.items():
+            cache.clear_sub(self._device_changed, device=device)
+        for path in self._attached:
+            path.clear_sub(self._path_changed)
+        self._caches.clear()
+        self._attached.clear()
+        with self._lock:
+            self._file.close()
+
+    def _define_device(self, device):
+        if device in self._devices:
+            return self._devices[device]
+        dev_id = len(self._devices)
+        self._devices[device] = dev_id
+        branches = list(getattr(device, 'branches', None) or [])
+        self._write(DEVICE
+                    + _device.pack(dev_id, device.md.z,
+                                   getattr(device, 'transmission', 1.0))
+                    + _pack_str(device.name)
+                    + _pack_str(getattr(device, 'prefix', device.name))
+                    + _pack_str(device.md.beamline)
+                    + _length.pack(len(branches))
+                    + b''.join(_pack_str(line) for line in branches))
+        return dev_id
+
+    def _write(self, data):
+        self._file.write(data)
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self._file.flush()
+            self._pending = 0
+
+    def _device_changed(self, *args, obj=None, state=None, **kwargs):
+        # The cache hands over the state it has just read
+        if obj is not None and state is not None:
+            now = time.time()
+            self.record_state(obj, state, timestamp=now)
+            self.record_transmission(obj, timestamp=now)
+
+    def _path_changed(self, *args, obj=None, **kwargs):
+        if obj is not None:
+            self.record_impediment(obj, obj.impediment)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_journal(filename):
+    """
+    Iterate through the records of a journal
+
+    Device and path references are resolved to their :class:`.DeviceRecord`
+    and :class:`.PathRecord`. A truncated final record, as left by an
+    interrupted writer, is ignored
+
+    Parameters
+    ----------
+    filename : str
+
+    Yields
+    ------
+    record : namedtuple
+    """
+    with open(filename, 'rb') as f:
+        buf = memoryview(f.read())
+    if bytes(buf[:len(MAGIC)]) != MAGIC:
+        raise ValueError("{} is not a lightpath journal".format(filename))
+    try:
+        for record, offset in _parse(buf):
+            yield record
+    except struct.error:
+        logger.warning("Journal %s ends with a truncated record", filename)
+
+
+def _complete_length(filename):
+    """
+    Number of bytes at the start of a journal holding complete records
+    """
+    with open(filename, 'rb') as f:
+        buf = memoryview(f.read())
+    if bytes(buf[:len(MAGIC)]) != MAGIC:
+        raise ValueError("{} is not a lightpath journal".format(filename))
+    length = len(MAGIC)
+    try:
+        for record, length in _parse(buf):
+            pass
+    except struct.error:
+        pass
+    return length
+
+
+def _parse(buf):
+    """
+    Parse records from the buffer of a journal
+
+    Yields
+    ------
+    record, offset : tuple
+        Each record and the offset of the first byte after it. A
+        ``struct.error`` is raised if the buffer ends with a partial record
+    """
+    devices, paths = dict(), dict()
+    offset = len(MAGIC)
+    while offset < len(buf):
+        kind = bytes(buf[offset:offset + 1])
+        offset += 1
+        if kind == STATE:
+            t, dev_id, value = _state.unpack_from(buf, offset)
+            offset += _state.size
+            yield (StateRecord(t, devices[dev_id], DeviceState(value)),
+                   offset)
+        elif kind == IMPEDIMENT:
+            t, path_id, dev_id = _impediment.unpack_from(buf, offset)
+            offset += _impediment.size
+            yield (ImpedimentRecord(t, paths[path_id], devices.get(dev_id)),
+                   offset)
+        elif kind == DESTINATION:
+            t, dev_id, count = _destination.unpack_from(buf, offset)
+            offset += _destination.size
+            destination = list()
+            for i in range(count):
+                line, offset = _unpack_str(buf, offset)
+                destination.append(line)
+            yield DestinationRecord(t, devices[dev_id], destination), offset
+        elif kind == TRANSMISSION:
+            t, dev_id, trans = _transmission.unpack_from(buf, offset)
+            offset += _transmission.size
+            yield TransmissionRecord(t, devices[dev_id], trans), offset
+        elif kind == DEVICE:
+            dev_id, z, trans = _device.unpack_from(buf, offset)
+            offset += _device.size
+            name, offset = _unpack_str(buf, offset)
+            prefix, offset = _unpack_str(buf, offset)
+            beamline, offset = _unpack_str(buf, offset)
+            (count,) = _length.unpack_from(buf, offset)
+            offset += _length.size
+            branches = list()
+            for i in range(count):
+                line, offset = _unpack_str(buf, offset)
+                branches.append(line)
+            record = DeviceRecord(dev_id, name, prefix, z, beamline,
+                                  trans, branches)
+            devices[dev_id] = record
+            yield record, offset
+        elif kind == PATH:
+            path_id, count = _path.unpack_from(buf, offset)
+            offset += _path.size
+            name, offset = _unpack_str(buf, offset)
+            ids = struct.unpack_from('<{}H'.format(count), buf, offset)
+            offset += _id.size * count
+            record = PathRecord(path_id, name,
+                                [devices[i] for i in ids])
+            paths[path_id] = record
+            yield record, offset
+        else:
+            raise ValueError("Unknown record type {!r} at byte {}"
+                             "".format(kind, offset - 1))
+
+
+class ReplayDevice:
+    """
+    Offline stand-in for a device recorded in a journal
+
+    Reports ``inserted``, ``removed`` and ``transmission`` based on the
+    values assigned by the :class:`.JournalReplay`, raising a
+    ``TimeoutError`` for disconnected devices so that
+    :func:`.find_device_state` interprets them identically to the original
+    device
+    """
+    SUB_STATE = 'sub_state_changed'
+
+    def __init__(self, record):
+        self.name = record.name
+        self.prefix = record.prefix
+        self.transmission = record.transmission
+        self.md = SimpleNamespace(z=record.z, beamline=record.beamline)
+        self.state = DeviceState.Unknown
+        self._destination = None
+        self._transmission = record.transmission
+        if record.branches:
+            self.branches = record.branches
+
+    @property
+    def inserted(self):
+        self._check()
+        return self.state in (DeviceState.Inserted, DeviceState.Inconsistent)
+
+    @property
+    def removed(self):
+        self._check()
+        return self.state in (DeviceState.Removed, DeviceState.Inconsistent)
+
+    @property
+    def destination(self):
+        if self._destination is not None:
+            return self._destination
+        return self.branches
+
+    def _check(self):
+        if self.state == DeviceState.Disconnected:
+            raise TimeoutError("{} was disconnected".format(self.name))
+        if self.state == DeviceState.Error:
+            raise RuntimeError("{} reported an error".format(self.name))
+
+    def __repr__(self):
+        return '<ReplayDevice {} state={}>'.format(self.name, self.state.name)
+
+
+class JournalReplay:
+    """
+    Reconstruct the paths recorded in a journal at any moment in time
+
+    Parameters
+    ----------
+    filename : str
+
+    Attributes
+    ----------
+    devices : dict
+        :class:`.ReplayDevice` objects keyed by name
+
+    paths : dict
+        :class:`.BeamPath` objects of replay devices keyed by name
+
+    impediments : list
+        All recorded :class:`.ImpedimentRecord` in order
+    """
+    def __init__(self, filename):
+        from .path import BeamPath
+
+        self.devices = dict()
+        self.paths = dict()
+        self.impediments = list()
+        self._states = dict()
+        self._destinations = dict()
+        self._transmissions = dict()
+        # Histories are keyed by name as identifiers are reassigned each time
+        # a new writer appends to the journal
+        for record in read_journal(filename):
+            if isinstance(record, StateRecord):
+                self._append(self._states, record.device.name,
+                             record.time, record.state)
+            elif isinstance(record, DestinationRecord):
+                self._append(self._destinations, record.device.name,
+                             record.time, record.destination)
+            elif isinstance(record, TransmissionRecord):
+                self._append(self._transmissions, record.device.name,
+                             record.time, record.transmission)
+            elif isinstance(record, ImpedimentRecord):
+                self.impediments.append(record)
+            elif isinstance(record, DeviceRecord):
+                if record.name not in self.devices:
+                    self.devices[record.name] = ReplayDevice(record)
+            elif isinstance(record, PathRecord):
+                self.paths[record.name] = BeamPath(
+                                    *[self.devices[d.name]
+                                      for d in record.devices],
+                                    name=record.name)
+        times = [t for times, _ in self._states.values() for t in times]
+        self.start = min(times) if times else None
+        self.end = max(times) if times else None
+        self.time = None
+
+    @staticmethod
+    def _append(history, name, t, value):
+        times, values = history.setdefault(name, (list(), list()))
+        times.append(t)
+        values.append(value)
+
+    @staticmethod
+    def _lookup(history, name, t, default):
+        try:
+            times, values = history[name]
+        except KeyError:
+            return default
+        idx = bisect.bisect_right(times, t)
+        return values[idx - 1] if idx else default
+
+    def at(self, t):
+        """
+        Move every replay device to its state at a given time
+
+        Parameters
+        ----------
+        t : float
+            Wall clock time in seconds since the epoch
+
+        Returns
+        -------
+        paths : dict
+            :attr:`.paths` evaluated at the requested time
+        """
+        for name, device in self.devices.items():
+            device.state = self._lookup(self._states, name, t,
+                                        DeviceState.Unknown)
+            device._destination = self._lookup(self._destinations, name,
+                                               t, None)
+            device.transmission = self._lookup(self._transmissions, name, t,
+                                               device._transmission)
+        self.time = t
+        return self.paths
+
+    def impediment_at(self, path, t):
+        """
+        Re-evaluate the impediment of a path at a given time
+
+        Parameters
+        ----------
+        path : str
+            Name of the path
+
+        t : float
+
+        Returns
+        -------
+        device : :class:`.ReplayDevice` or None
+        """
+        return self.at(t)[path].impediment
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Replay a lightpath journal')
+    parser.add_argument('journal', type=str, help='Journal to replay')
+    parser.add_argument('--time', type=float,
+                        help='Time to reproduce, the end of the journal by '
+                             'default')
+    parser.add_argument('--path', type=str,
+                        help='Only show a single path')
+    args = parser.parse_args(args)
+    replay = JournalReplay(args.journal)
+    t = args.time if args.time is not None else replay.end
+    if t is None:
+        print('No state changes were recorded')
+        return
+    print('State at {}'.format(time.strftime('%Y-%m-%d %H:%M:%S',
+                                             time.localtime(t))))
+    for name, path in sorted(replay.at(t).items()):
+        if args.path and name != args.path:
+            continue
+        impediment = path.impediment
+        print('{}: impediment {}'.format(name, impediment.name
+                                         if impediment else None))
+        path.show_devices(file=sys.stdout)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,244 @@
+"""
+Optional instrumentation of the frequently run parts of the lightpath. When
+enabled, the :data:`.metrics` registry counts every call of the instrumented
+functions and records their latency into histograms labelled by the path or
+device involved. The registry is disabled by default, in which case the only
+cost of an instrumented call is a single attribute check.
+
+.. code:: python
+
+    from lightpath.metrics import metrics
+
+    metrics.enable()
+    ...
+    print(metrics.to_prometheus())
+"""
+import math
+import time
+import threading
+import functools
+
+# Upper bounds of the latency histogram buckets in seconds
+BUCKETS = (1e-5, 1e-4, 1e-3, 1e-2, 0.1, 1.0, 10.0, math.inf)
+
+
+class Histogram:
+    """
+    Latency histogram with fixed bucket bounds
+
+    Attributes
+    ----------
+    count : int
+        Number of observations
+
+    sum : float
+        Sum of all observations
+
+    counts : list
+        Number of observations falling in each bucket of :attr:`.bounds`
+    """
+    def __init__(self, bounds=BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * len(bounds)
+        self.count = 0
+        self.sum = 0.
+
+    def observe(self, value):
+        """
+        Add an observation to the histogram
+        """
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def cumulative(self):
+        """
+        Number of observations less than or equal to each bound
+        """
+        total, cumulative = 0, list()
+        for count in self.counts:
+            total += count
+            cumulative.append(total)
+        return cumulative
+
+    def as_dict(self):
+        return {'count': self.count, 'sum': self.sum,
+                'buckets': dict((_format_bound(bound), count)
+                                for bound, count in zip(self.bounds,
+                                                        self.cumulative()))}
+
+
+class Metrics:
+    """
+    Registry of call counts and latency histograms
+
+    Observations are keyed by the name of the metric and a label, usually
+    the name of the :class:`.BeamPath` or device involved
+
+    Attributes
+    ----------
+    enabled : bool
+        Whether instrumented calls are currently recorded
+    """
+    def __init__(self):
+        self.enabled = False
+        self._histograms = dict()
+        self._lock = threading.Lock()
+
+    def enable(self):
+        """
+        Start recording instrumented calls
+        """
+        self.enabled = True
+
+    def disable(self):
+        """
+        Stop recording instrumented calls, keeping past observations
+        """
+        self.enabled = False
+
+    def reset(self):
+        """
+        Forget all observations
+        """
+        with self._lock:
+            self._histograms.clear()
+
+    def observe(self, metric, label, duration):
+        """
+        Record a single call
+
+        Parameters
+        ----------
+        metric : str
+            Name of the instrumented operation
+
+        label : str
+            Path or device the operation was run for
+
+        duration : float
+            Latency of the call in seconds
+        """
+        with self._lock:
+            try:
+                hist = self._histograms[(metric, label)]
+            except KeyError:
+                hist = self._histograms[(metric, label)] = Histogram()
+            hist.observe(duration)
+
+    def histogram(self, metric, label):
+        """
+        Histogram for a metric and label, None if never observed
+        """
+        return self._histograms.get((metric, label))
+
+    def count(self, metric, label=None):
+        """
+        Number of recorded calls of a metric, for a single label or in total
+        """
+        with self._lock:
+            return sum(hist.count
+                       for (name, lbl), hist in self._histograms.items()
+                       if name == metric and label in (None, lbl))
+
+    def slowest(self, metric, count=10):
+        """
+        Labels of a metric with the highest mean latency
+
+        Returns
+        -------
+        slowest : list
+            Tuples of label and mean latency in seconds
+        """
+        with self._lock:
+            means = [(label, hist.sum / hist.count)
+                     for (name, label), hist in self._histograms.items()
+                     if name == metric and hist.count]
+        return sorted(means, key=lambda x: x[1], reverse=True)[:count]
+
+    def as_dict(self):
+        """
+        All observations as a nested dictionary
+
+        Returns
+        -------
+        metrics : dict
+            Keyed by metric name then label
+        """
+        report = dict()
+        with self._lock:
+            for (metric, label), hist in self._histograms.items():
+                report.setdefault(metric, dict())[label] = hist.as_dict()
+        return report
+
+    def to_prometheus(self, prefix='lightpath'):
+        """
+        All observations in the Prometheus text exposition format
+
+        Parameters
+        ----------
+        prefix : str, optional
+            Prefix for each metric name
+
+        Returns
+        -------
+        text : str
+        """
+        lines = list()
+        for metric, labels in sorted(self.as_dict().items()):
+            name = '{}_{}_seconds'.format(prefix, metric)
+            lines.append('# TYPE {} histogram'.format(name))
+            for label, hist in sorted(labels.items()):
+                label = _escape(label)
+                for bound, count in hist['buckets'].items():
+                    lines.append('{}_bucket{{name="{}",le="{}"}} {}'
+                                 ''.format(name, label, bound, count))
+                lines.append('{}_sum{{name="{}"}} {!r}'
+                             ''.format(name, label, hist['sum']))
+                lines.append('{}_count{{name="{}"}} {}'
+                             ''.format(name, label, hist['count']))
+        return '\n'.join(lines) + '\n'
+
+
+def _format_bound(bound):
+    return '+Inf' if bound == math.inf else repr(bound)
+
+
+def _escape(label):
+    return (str(label).replace('\\', r'\\').replace('"', r'\"')
+            .replace('\n', r'\n'))
+
+
+# Registry used by all instrumented functions
+metrics = Metrics()
+
+
+def timed(metric, label):
+    """
+    Instrument a function with the :data:`.metrics` registry
+
+    Parameters
+    ----------
+    metric : str
+        Name to record the calls under
+
+    label : callable
+        Called with the same arguments as the function to find the label of
+        the observation
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not metrics.enabled:
+                return func(*args, **kwargs)
+            t0 = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                metrics.observe(metric, label(*args, **kwargs),
+                                time.perf_counter() - t0)
+        return wrapper
+    return decorator
@@ -14,100 +14,26 @@ might not return an accurate representation of reality if an upstream device is
 affecting the beam.
 """
 import math
-import enum
 import logging
-from collections import Iterable
+from types import MappingProxyType
+from collections.abc import Iterable
 
-from prettytable import PrettyTable
 from ophyd.ophydobj import OphydObject
 from ophyd.status import wait as status_wait
-from ophyd.utils import DisconnectedError
 
 from .errors import CoordinateError
+from .metrics import timed
+from .state import DeviceState, find_device_state  # noqa
 
 
 logger = logging.getLogger(__name__)
 
 
-class DeviceState(enum.Enum):
+def _path_label(path, *args, **kwargs):
     """
-    Description of BeamStates
-
-    The standard Inserted, Removed or Unknown have been expanded within
-    this state to help operators diagnose exact reasons for uncertainty in the
-    state of the beamline
-
-    Attributes
-    ----------
-    Removed:
-        Device is removed from the beamline.
-
-    Inserted:
-        Device is inserted into the beamline. This may or may not prevent beam
-        from reaching downstream devices.
-
-    Unknown:
-        Device is reporting neither an inserted or removed state.
-
-    Inconsistent:
-        The device is reporting that is both inserted and removed.
-
-    Disconnected:
-        We were unable to determine the state of the device because one or more
-        of the relevant signals was not available.
-
-    Error:
-        Catch-all state for any errors the device reported when asked for its
-        state that were not simply a failure to communicate with signals
-    """
-    Removed = 0
-    Inserted = 1
-    Unknown = 2
-    Inconsistent = 3
-    Disconnected = 4
-    Error = 5
-
-
-def find_device_state(device):
+    Label instrumented BeamPath calls by the name of the path
     """
-    Report the state of a device
-
-    The device must implement ``.inserted`` and ``removed``.
-
-    Parameters
-    ----------
-    device : ophyd.Device
-
-    Returns
-    -------
-    state: DeviceState
-    """
-    # Gather device information
-    try:
-        _in, _out = device.inserted, device.removed
-        logger.debug("Device %s reporting; IN=%s, OUT=%s",
-                     device.name, _in, _out)
-    # Check if this was an error with an EPICS connection
-    except (TimeoutError, DisconnectedError) as exc:
-        logger.warning("Unable to connect to %r", device)
-        logger.debug(exc, exc_info=True)
-        return DeviceState.Disconnected
-    except Exception as exc:
-        logger.exception("Unable to determine device state for %r", device)
-        return DeviceState.Error
-    # Check state consistency and return proper Enum
-    # In
-    if _in and not _out:
-        return DeviceState.Inserted
-    # Out
-    elif _out and not _in:
-        return DeviceState.Removed
-    # Both In and Out
-    elif _out and _in:
-        return DeviceState.Inconsistent
-    # Neither In or Out
-    else:
-        return DeviceState.Unknown
+    return str(path.name)
 
 
 class BeamPath(OphydObject):
@@ -125,6 +51,14 @@ class BeamPath(OphydObject):
     name = str, optional
         Name of the BeamPath
 
+    cache : :class:`.StateCache`, optional
+        Cache of monitored device states used to evaluate the path. All of
+        the devices are watched by the cache when the path is created
+
+    minimum_transmission : float, optional
+        Minimum amount of transmission considered for beam presence by this
+        path. By default, :attr:`.BeamPath.minimum_transmission`
+
     Raises
     ------
     TypeError:
@@ -139,18 +73,30 @@ class BeamPath(OphydObject):
     Attributes
     ----------
     minimum_transmission : float
-        Minimum amount of transmission considered for beam presence
+        Minimum amount of transmission considered for beam presence. Changing
+        the threshold of one path does not affect any other. Evaluations for
+        other thresholds can be made without modifying the path through
+        :meth:`.snapshot`
     """
     # Subscription Information
     SUB_PTH_CHNG = 'beampath_changed'
     _default_sub = SUB_PTH_CHNG
-    # Transmission setting
+    # Default transmission setting
     minimum_transmission = 0.1
 
-    def __init__(self, *devices, name=None):
+    def __init__(self, *devices, name=None, cache=None,
+                 minimum_transmission=None):
         super().__init__(name=name)
         self.devices = devices
+        self.cache = cache
+        if minimum_transmission is not None:
+            self.minimum_transmission = minimum_transmission
+        else:
+            self.minimum_transmission = type(self).minimum_transmission
         self._has_subscribed = False
+        # Cached passive classifications and clear targets
+        self._passive = dict()
+        self._clear_plans = dict()
         logger.debug("Configuring path %s with %s devices",
                      name, len(self.devices))
         # Sort by position downstream to upstream
@@ -165,6 +111,9 @@ class BeamPath(OphydObject):
                                           'initialized', dev)
                 # Add as attribute
                 setattr(self, dev.name.replace(' ', '_'), dev)
+                # Monitor device state
+                if cache is not None:
+                    cache.watch(dev)
 
         except AttributeError as e:
             raise TypeError('One of the devices does not meet the '
@@ -178,6 +127,35 @@ class BeamPath(OphydObject):
         """
         return [d for d in self.devices if getattr(d, 'branches', False)]
 
+    @property
+    def passive_devices(self):
+        """
+        Devices that transmit more than :attr:`.minimum_transmission`
+
+        The transmission of each device is only read once for a given
+        threshold, afterwards the classification is cached on the path until
+        :meth:`.invalidate` is called. A :class:`.ClearPlan` calls it when it
+        finds that the transmission of a device has crossed the threshold
+        """
+        threshold = self.minimum_transmission
+        try:
+            return self._passive[threshold]
+        except KeyError:
+            passive = frozenset(d for d in self.devices
+                                if d.transmission > threshold)
+            self._passive[threshold] = passive
+            return passive
+
+    def invalidate(self):
+        """
+        Forget the cached passive devices and clear plans
+
+        Call after the transmission of a device along the path has changed
+        """
+        logger.debug("Invalidating cached classifications of %s", self.name)
+        self._passive.clear()
+        self._clear_plans.clear()
+
     @property
     def range(self):
         """
@@ -193,51 +171,14 @@ class BeamPath(OphydObject):
         return sorted(self.devices, key=lambda dev: dev.md.z)
 
     @property
+    @timed('blocking_devices', _path_label)
     def blocking_devices(self):
         """
         A list of devices that are currently inserted or are in unknown
         positions. This includes devices downstream of the first
         :attr:`.impediment`
         """
-        # Cache important prior devices
-        prior = None
-        last_branches = list()
-        block = list()
-        for device in self.path:
-            # If we have switched beamlines
-            if prior and device.md.beamline != prior.md.beamline:
-                # Find improperly configured optics
-                for optic in last_branches:
-                    if device.md.beamline not in optic.destination:
-                        block.append(optic)
-                # Clear optics that have been evaluated
-                last_branches.clear()
-
-            # If our last device was an optic, make sure it wasn't required
-            # to continue along this beampath
-            elif (prior in last_branches
-                    and device.md.beamline in prior.branches
-                    and device.md.beamline not in prior.destination):
-                block.append(last_branches.pop(-1))
-
-            # Find branching devices and store
-            # They will be marked as blocking by downstream devices
-            dev_state = find_device_state(device)
-            if device in self.branches:
-                last_branches.append(device)
-            # Find inserted devices
-            elif dev_state == DeviceState.Inserted:
-                # Ignore devices with low enough transmssion
-                trans = getattr(device, 'transmission', 1)
-                if trans < self.minimum_transmission:
-                    block.append(device)
-            # Find unknown and faulted devices
-            elif dev_state != DeviceState.Removed:
-                block.append(device)
-            # Stache our prior device
-            prior = device
-
-        return block
+        return self.snapshot().blocking_devices(self.minimum_transmission)
 
     @property
     def incident_devices(self):
@@ -246,15 +187,23 @@ class BeamPath(OphydObject):
         current :attr:`.impediment` and any upstream devices that may be
         inserted but have more transmission than :attr:`.minimum_transmission`
         """
-        # Find device information
-        inserted = [d for d in self.path
-                    if find_device_state(d) == DeviceState.Inserted]
-        impediment = self.impediment
-        # No blocking devices, all inserted devices incident
-        if not impediment:
-            return inserted
-        # Otherwise only return upstream of the impediment
-        return [d for d in inserted if d.md.z <= impediment.md.z]
+        return self.snapshot().incident_devices(self.minimum_transmission)
+
+    def snapshot(self, readings=None):
+        """
+        Capture the state of every device along the path
+
+        Parameters
+        ----------
+        readings : dict, optional
+            Readings shared with the snapshots of other paths, see
+            :class:`.PathSnapshot`
+
+        Returns
+        -------
+        snapshot : :class:`.PathSnapshot`
+        """
+        return PathSnapshot(self, readings=readings)
 
     def show_devices(self, file=None):
         """
@@ -265,6 +214,7 @@ class BeamPath(OphydObject):
         file : file-like object
             File to writable
         """
+        from prettytable import PrettyTable
         # Initialize Table
         pt = PrettyTable(['Name', 'Prefix', 'Position', 'Beamline', 'State'])
         # Adjust Table settings
@@ -274,8 +224,8 @@ class BeamPath(OphydObject):
         pt.float_format = '8.5'
         # Add info
         for d in self.path:
-            pt.add_row([d.name, d.prefix, d.md.z,
-                        d.md.beamline, find_device_state(d).name])
+            state = find_device_state(d, cache=self.cache)
+            pt.add_row([d.name, d.prefix, d.md.z, d.md.beamline, state.name])
         # Show table
         print(pt, file=file)
 
@@ -327,27 +277,8 @@ class BeamPath(OphydObject):
             :meth:`.LightInterface.remove`
         """
         logger.info('Clearing beampath %s ...', self)
-        # Assemble device list
-        target_devices, ignored = self._ignore(ignore, passive=passive)
-        # Remove devices
-        logger.info('Removing devices along the beampath ...')
-        status = [device.remove(timeout=timeout)
-                  for device in target_devices
-                  if find_device_state(device) in (DeviceState.Inserted,
-                                                   DeviceState.Unknown)
-                  and hasattr(device, 'remove')]
-        # Wait parameters
-        if wait:
-            logger.info('Waiting for all devices to be '
-                        'removed from the beampath %s ...', self)
-            # Wait consecutively for statuses, this can be done by combining
-            # statuses in the future
-            for s in status:
-                logger.debug('Waiting for %s to be done ...', s)
-                status_wait(s, timeout=timeout)
-                logger.info('Completed')
-
-        return status
+        plan = self.plan_clear(ignore=ignore, passive=passive)
+        return plan.execute(wait=wait, timeout=timeout)
 
     def join(self, *beampaths):
         """
@@ -369,7 +300,10 @@ class BeamPath(OphydObject):
         TypeError:
             Raised if a non-BeamPath object is supplied
         """
-        return BeamPath.from_join(self, *beampaths, name=self.name)
+        threshold = self.minimum_transmission
+        return BeamPath.from_join(self, *beampaths, name=self.name,
+                                  cache=self.cache,
+                                  minimum_transmission=threshold)
 
     def split(self, z=None, device=None):
         """
@@ -401,11 +335,16 @@ class BeamPath(OphydObject):
             raise ValueError("Split position {} is not within the range of "
                              "the path.".format(z))
         # Split the paths
-        return (BeamPath(*[d for d in self.devices if d.md.z <= z]),
-                BeamPath(*[d for d in self.devices if d.md.z > z]))
+        return (BeamPath(*[d for d in self.devices if d.md.z <= z],
+                         cache=self.cache,
+                         minimum_transmission=self.minimum_transmission),
+                BeamPath(*[d for d in self.devices if d.md.z > z],
+                         cache=self.cache,
+                         minimum_transmission=self.minimum_transmission))
 
     @classmethod
-    def from_join(cls, *beampaths, name=None):
+    def from_join(cls, *beampaths, name=None, cache=None,
+                  minimum_transmission=None):
         """
         Join other beampaths with the current one
 
@@ -418,6 +357,12 @@ class BeamPath(OphydObject):
         name : str, optional
             New name for created beampath
 
+        cache : :class:`.StateCache`, optional
+            Cache of monitored device states for the new beampath
+
+        minimum_transmission : float, optional
+            Transmission threshold of the new beampath
+
         Returns
         -------
         BeamPath : :class:`.BeamPath`
@@ -434,15 +379,58 @@ class BeamPath(OphydObject):
         # Flatten path lists
         devices = [device for path in beampaths for device in path.devices]
         # Create a new instance
-        return BeamPath(*set(devices), name=name)
+        return BeamPath(*set(devices), name=name, cache=cache,
+                        minimum_transmission=minimum_transmission)
+
+    def plan_clear(self, ignore=None, passive=False):
+        """
+        Precompute the devices that :meth:`.clear` will act upon
+
+        The :class:`.ClearPlan` is cached on the path for each combination of
+        ignored devices, ``passive`` and :attr:`.minimum_transmission` so
+        repeated calls to :meth:`.clear` with the same arguments do not have
+        to reassemble the device list
+
+        Parameters
+        ----------
+        ignore: device or iterable, optional
+            Leave devices in their current state without removing them
+
+        passive : bool, optional
+            If False, devices that are inserted but don't attenuate the beam
+            below :attr:`.minimum_threshold` are ignored
+
+        Returns
+        -------
+        plan : :class:`.ClearPlan`
+        """
+        exclusions = self._exclusions(ignore)
+        key = (exclusions, passive, self.minimum_transmission)
+        try:
+            return self._clear_plans[key]
+        except KeyError:
+            plan = ClearPlan(self, ignore=exclusions, passive=passive)
+            self._clear_plans[key] = plan
+            return plan
+
+    @staticmethod
+    def _exclusions(ignore_devices):
+        """
+        Normalize a device or iterable of devices into a frozenset
+        """
+        if isinstance(ignore_devices, Iterable):
+            return frozenset(ignore_devices)
+        elif ignore_devices:
+            return frozenset((ignore_devices,))
+        return frozenset()
 
     def _ignore(self, ignore_devices, passive=False):
         """
-        Assemble list of available devices with some exclusions
+        Assemble set of available devices with some exclusions
 
         Parameters
         ----------
-        ignore_devices : list
+        ignore_devices : device or iterable
             Devices to ignore
 
         passive : bool
@@ -451,31 +439,26 @@ class BeamPath(OphydObject):
         Returns
         -------
         (target, ignore) : tuple
-            Tuple of two lists of devices
+            Set of targeted devices and set of ignored devices
         """
-        ignore = list()
-
+        ignore = self._exclusions(ignore_devices)
         # Add passive devices to ignored
         if not passive:
             logger.debug("Passive devices will be ignored ...")
-            ignore.extend([d for d in self.devices
-                           if d.transmission > self.minimum_transmission])
-        # Add ignored devices
-        if isinstance(ignore_devices, Iterable):
-            ignore.extend(ignore_devices)
-        elif ignore_devices:
-            ignore.append(ignore_devices)
+            ignore = ignore | self.passive_devices
         # Grab target devices
-        target_devices = [device for device in self.devices
-                          if device not in ignore]
+        target_devices = set(self.devices) - ignore
         logger.debug("Targeting devices %s ...", target_devices)
         logger.debug('Ignoring devices %s ...', ignore)
         return target_devices, ignore
 
+    @timed('device_moved', _path_label)
     def _device_moved(self, *args, obj=None, **kwargs):
         """
         Run when a device changes state
         """
+        # With a cache this is run by the cache once it has stored the new
+        # state, so evaluating the path does not read the device again
         # Determine whether our path has been changed
         block = self.impediment
         if block:
@@ -504,7 +487,10 @@ class BeamPath(OphydObject):
         if not self._has_subscribed:
             # Subscribe to all child devices
             for dev in self.devices:
-                # Add callback here!
+                # The cache notifies the path after updating its state
+                if self.cache is not None:
+                    self.cache.subscribe(dev, self._device_moved)
+                    continue
                 try:
                     dev.subscribe(self._device_moved,
                                   event_type=dev.SUB_STATE,
@@ -526,3 +512,321 @@ class BeamPath(OphydObject):
             return self.devices == args[0].devices
         except AttributeError:
             return super().__eq__(*args, **kwargs)
+
+
+class PathSnapshot:
+    """
+    State of every device along a :class:`.BeamPath` captured at once
+
+    The states of the devices, the transmission of the inserted devices and
+    the destinations of the branching devices are read when the snapshot is
+    created. The path can then be evaluated for any transmission threshold
+    in memory, without communicating with the devices again. The result for
+    each threshold is only computed once, so consumers with different
+    thresholds can share a single snapshot
+
+    Parameters
+    ----------
+    path : :class:`.BeamPath`
+
+    readings : dict, optional
+        Readings of devices keyed by device. Devices already present are not
+        read again and new readings are added, so that the snapshots of
+        several paths sharing devices can be taken from a single set of
+        reads
+
+    Attributes
+    ----------
+    devices : tuple
+        Devices ordered by coordinates
+
+    minimum_transmission : float
+        Threshold of the path when the snapshot was taken, used when no
+        other threshold is requested
+
+    states : mapping
+        Read-only mapping of each device to its :class:`.DeviceState`
+
+    transmissions : mapping
+        Read-only mapping of each inserted device to its transmission
+
+    destinations : mapping
+        Read-only mapping of each branching device to its destinations
+    """
+    def __init__(self, path, readings=None):
+        self.path = path
+        self.devices = tuple(path.path)
+        self.minimum_transmission = path.minimum_transmission
+        self._branches = frozenset(path.branches)
+        self._blocking = dict()
+        if readings is None:
+            readings = dict()
+        states, transmissions, destinations = dict(), dict(), dict()
+        for device in self.devices:
+            if device not in readings:
+                readings[device] = self._read(device, path.cache)
+            state, transmission, destination = readings[device]
+            states[device] = state
+            if device in self._branches:
+                destinations[device] = destination
+            elif state == DeviceState.Inserted:
+                transmissions[device] = transmission
+        self.states = MappingProxyType(states)
+        self.transmissions = MappingProxyType(transmissions)
+        self.destinations = MappingProxyType(destinations)
+
+    @staticmethod
+    def _read(device, cache=None):
+        """
+        Read the state, transmission and destinations of a device
+
+        Transmissions are only read from inserted devices and destinations
+        only from branching devices
+        """
+        state = find_device_state(device, cache=cache)
+        transmission, destination = None, None
+        if getattr(device, 'branches', False):
+            try:
+                destination = list(device.destination)
+            except Exception as exc:
+                logger.error("Unable to determine destination of %s: %s",
+                             device.name, exc)
+                destination = list()
+        elif state == DeviceState.Inserted:
+            transmission = getattr(device, 'transmission', 1)
+        return state, transmission, destination
+
+    def blocking_devices(self, minimum_transmission=None):
+        """
+        Devices that were inserted or in unknown positions
+
+        Parameters
+        ----------
+        minimum_transmission : float, optional
+            Minimum amount of transmission considered for beam presence. By
+            default, the :attr:`.minimum_transmission` of the snapshot
+
+        Returns
+        -------
+        blocking : list
+        """
+        if minimum_transmission is None:
+            minimum_transmission = self.minimum_transmission
+        try:
+            block = self._blocking[minimum_transmission]
+        except KeyError:
+            block = self._find_blocking(minimum_transmission)
+            self._blocking[minimum_transmission] = block
+        return list(block)
+
+    def _find_blocking(self, minimum_transmission):
+        """
+        Evaluate the blocking devices for a single threshold
+        """
+        # Cache important prior devices
+        prior = None
+        last_branches = list()
+        block = list()
+        for device in self.devices:
+            # If we have switched beamlines
+            if prior and device.md.beamline != prior.md.beamline:
+                # Find improperly configured optics
+                for optic in last_branches:
+                    if device.md.beamline not in self.destinations[optic]:
+                        block.append(optic)
+                # Clear optics that have been evaluated
+                last_branches.clear()
+
+            # If our last device was an optic, make sure it wasn't required
+            # to continue along this beampath
+            elif (prior in last_branches
+                    and device.md.beamline in prior.branches
+                    and device.md.beamline not in self.destinations[prior]):
+                block.append(last_branches.pop(-1))
+
+            # Find branching devices and store
+            # They will be marked as blocking by downstream devices
+            dev_state = self.states[device]
+            if device in self._branches:
+                last_branches.append(device)
+            # Find inserted devices
+            elif dev_state == DeviceState.Inserted:
+                # Ignore devices with low enough transmssion
+                if self.transmissions[device] < minimum_transmission:
+                    block.append(device)
+            # Find unknown and faulted devices
+            elif dev_state != DeviceState.Removed:
+                block.append(device)
+            # Stache our prior device
+            prior = device
+
+        return tuple(block)
+
+    def impediment(self, minimum_transmission=None):
+        """
+        First blocking device along the path, None if the path was clear
+        """
+        blocks = self.blocking_devices(minimum_transmission)
+        return blocks[0] if blocks else None
+
+    def incident_devices(self, minimum_transmission=None):
+        """
+        Devices the beam was incident on
+
+        This includes the impediment and any upstream devices that were
+        inserted but transmit more than the ``minimum_transmission``
+        """
+        inserted = [d for d in self.devices
+                    if self.states[d] == DeviceState.Inserted]
+        impediment = self.impediment(minimum_transmission)
+        # No blocking devices, all inserted devices incident
+        if not impediment:
+            return inserted
+        # Otherwise only return upstream of the impediment
+        return [d for d in inserted if d.md.z <= impediment.md.z]
+
+    def __repr__(self):
+        return '<PathSnapshot {} devices={}>'.format(self.path.name,
+                                                     len(self.devices))
+
+
+class ClearPlan:
+    """
+    Precompiled removal of obstructions along a :class:`.BeamPath`
+
+    The ordered set of devices to act upon is assembled once when the plan is
+    created. Each call to :meth:`.execute` then only has to check the state of
+    these targets and only issues commands to devices that are actually in the
+    way. Plans are usually created through :meth:`.BeamPath.plan_clear`
+
+    Unless ``passive`` is set, the transmission of the removable devices is
+    checked again by each :meth:`.diff`. A device ignored for being passive
+    that has started to attenuate the beam is treated as a target, while a
+    target that now transmits enough beam is left in place. Either change
+    invalidates the cached classifications of the path
+
+    Parameters
+    ----------
+    path : :class:`.BeamPath`
+        Path to clear
+
+    ignore: device or iterable, optional
+        Leave devices in their current state without removing them
+
+    passive : bool, optional
+        If False, devices that are inserted but don't attenuate the beam below
+        :attr:`.BeamPath.minimum_transmission` are ignored
+
+    Attributes
+    ----------
+    targets : tuple
+        Removable devices ordered from upstream to downstream
+
+    ignored : frozenset
+        Devices that will never be touched by the plan
+    """
+    # States that require a device to be removed
+    obstructing = (DeviceState.Inserted, DeviceState.Unknown)
+
+    def __init__(self, path, ignore=None, passive=False):
+        self.path = path
+        self.passive = passive
+        exclusions = path._exclusions(ignore)
+        target, self.ignored = path._ignore(exclusions, passive=passive)
+        self.targets = tuple(d for d in path.path
+                             if d in target and hasattr(d, 'remove'))
+        # Passive devices are only ignored while they transmit enough beam
+        self._passive = tuple(d for d in path.path
+                              if d in self.ignored and d not in exclusions
+                              and hasattr(d, 'remove'))
+        logger.debug("Created plan to clear %s targeting %s devices",
+                     path.name, len(self.targets))
+
+    def diff(self):
+        """
+        Devices in the plan that are currently in the way
+
+        Returns
+        -------
+        obstructions : dict
+            Mapping of device to its current :class:`.DeviceState`, ordered
+            from upstream to downstream
+        """
+        targets = self.targets
+        if not self.passive:
+            targets = self._reclassify()
+        diff = dict()
+        for device in targets:
+            state = find_device_state(device, cache=self.path.cache)
+            if state in self.obstructing:
+                diff[device] = state
+        return diff
+
+    def _reclassify(self):
+        """
+        Targets of the plan given the current transmission of each device
+        """
+        threshold = self.path.minimum_transmission
+        attenuating = set(d for d in self._passive
+                          if d.transmission <= threshold)
+        transmitting = set(d for d in self.targets
+                           if d.transmission > threshold)
+        if not attenuating and not transmitting:
+            return self.targets
+        logger.debug("Transmission of %s crossed the threshold of %s",
+                     [d.name for d in attenuating | transmitting],
+                     self.path.name)
+        self.path.invalidate()
+        return tuple(d for d in self.path.path
+                     if d in attenuating
+                     or (d in self.targets and d not in transmitting))
+
+    def dry_run(self):
+        """
+        Report the devices :meth:`.execute` would remove without moving them
+
+        Returns
+        -------
+        devices : list
+        """
+        devices = list(self.diff())
+        for device in devices:
+            logger.info("Would remove %s from %s", device.name, self.path.name)
+        return devices
+
+    def execute(self, wait=False, timeout=None):
+        """
+        Remove all of the targeted devices that are in the way
+
+        Parameters
+        ----------
+        wait : bool
+            Wait for all devices to complete their motion
+
+        timeout : float, optional
+            Duration to wait for device movements
+
+        Returns
+        -------
+        statuses :
+            Returns list of status objects returned by
+            :meth:`.LightInterface.remove`
+        """
+        logger.info('Removing devices along the beampath ...')
+        status = [device.remove(timeout=timeout) for device in self.diff()]
+        # Wait parameters
+        if wait:
+            logger.info('Waiting for all devices to be '
+                        'removed from the beampath %s ...', self.path)
+            # Wait consecutively for statuses, this can be done by combining
+            # statuses in the future
+            for s in status:
+                logger.debug('Waiting for %s to be done ...', s)
+                status_wait(s, timeout=timeout)
+                logger.info('Completed')
+
+        return status
+
+    def __repr__(self):
+        return ('<ClearPlan path={} targets={}>'
+                ''.format(self.path.name, len(self.targets)))
@@ -0,0 +1,307 @@
+"""
+Clients of the lightpath daemon do not need to poll the complete state of the
+beamline. After subscribing, a client receives a snapshot followed by a stream
+of small sequence-numbered messages describing each change:
+
+``snapshot``
+    Every device, path and destination, as returned by
+    :meth:`.PathModel.snapshot`
+
+``state``
+    A device changed state
+
+``beamline``
+    The impediment or incident devices of a path changed
+
+``destinations``
+    The devices the beam ends on changed
+
+Each message is a single line of JSON carrying a ``seq`` number one higher
+than the previous message. The daemon keeps the most recent messages in a
+:class:`.DeltaLog`, so that a client that was disconnected resumes by sending
+the last number it has seen and only receives what it missed. If too much has
+happened in the meantime, a new snapshot is sent instead.
+
+Sequence numbers restart whenever the daemon does. Each log is therefore
+identified by an ``epoch`` sent with every snapshot, and a client resumes by
+sending both the epoch and the sequence number it has seen. A client that
+resumes with the epoch of a previous daemon receives a new snapshot.
+"""
+import json
+import uuid
+import socket
+import logging
+import threading
+from collections import deque
+
+from .errors import SequenceError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 45107
+
+
+class DeltaLog:
+    """
+    Bounded log of the most recent sequence-numbered messages
+
+    Parameters
+    ----------
+    size : int, optional
+        Number of messages kept for clients resuming a subscription
+
+    Attributes
+    ----------
+    seq : int
+        Sequence number of the most recent message
+
+    epoch : str
+        Unique identifier of the log. Sequence numbers issued by logs with
+        different epochs are unrelated
+    """
+    def __init__(self, size=4096):
+        self.seq = 0
+        self.epoch = uuid.uuid4().hex
+        self._messages = deque(maxlen=size)
+
+    def append(self, message):
+        """
+        Number a message and add it to the log
+
+        Returns
+        -------
+        message : dict
+            The message with its ``seq`` number
+        """
+        self.seq += 1
+        message['seq'] = self.seq
+        self._messages.append(message)
+        return message
+
+    def since(self, seq, epoch):
+        """
+        Messages following a sequence number
+
+        Parameters
+        ----------
+        seq : int
+            Last sequence number seen by a client
+
+        epoch : str
+            Epoch of the log that issued ``seq``
+
+        Returns
+        -------
+        messages : list or None
+            None if the messages have already been dropped from the log, or
+            if the sequence number was never issued by this log
+        """
+        if epoch != self.epoch or seq > self.seq:
+            return None
+        missed = self.seq - seq
+        if missed > len(self._messages):
+            return None
+        return list(self._messages)[len(self._messages) - missed:]
+
+    def __len__(self):
+        return len(self._messages)
+
+
+class LightState:
+    """
+    Client side copy of the state served by a :class:`.PathModel`
+
+    Attributes
+    ----------
+    seq : int
+        Sequence number of the last applied message, None before the first
+        snapshot
+
+    epoch : str
+        Epoch of the log the messages come from, None before the first
+        snapshot
+
+    devices : dict
+        Description and state of each device keyed by name
+
+    beamlines : dict
+        Device names, impediment and incident devices of each path
+
+    destinations : list
+        Names of the devices the beam ends on
+    """
+    def __init__(self):
+        self.seq = None
+        self.epoch = None
+        self.devices = dict()
+        self.beamlines = dict()
+        self.destinations = list()
+
+    def apply(self, message):
+        """
+        Update the state from a single message
+
+        Raises
+        ------
+        SequenceError
+            If the message does not directly follow the last one applied
+        """
+        kind = message['type']
+        if kind == 'snapshot':
+            self.devices = dict((info['name'], info)
+                                for info in message['devices'])
+            self.beamlines = message['beamlines']
+            self.destinations = message['destinations']
+            self.epoch = message.get('epoch')
+        elif self.seq is None or message['seq'] != self.seq + 1:
+            raise SequenceError("Expected message {} but received {}"
+                                "".format(None if self.seq is None
+                                          else self.seq + 1,
+                                          message['seq']))
+        elif kind == 'state':
+            self.devices[message['device']]['state'] = message['state']
+        elif kind == 'beamline':
+            info = self.beamlines[message['beamline']]
+            info['impediment'] = message['impediment']
+            info['incident_devices'] = message['incident_devices']
+        elif kind == 'destinations':
+            self.destinations = message['destinations']
+        else:
+            logger.debug("Ignoring unknown message type %r", kind)
+        self.seq = message['seq']
+        return message
+
+
+class Subscriber:
+    """
+    Follow the delta stream of a :class:`.LightServer`
+
+    Parameters
+    ----------
+    host : str, optional
+
+    port : int, optional
+
+    state : :class:`.LightState`, optional
+        State to keep up to date. A new one is created by default
+
+    timeout : float, optional
+        Seconds to wait when connecting
+    """
+    def __init__(self, host='localhost', port=DEFAULT_PORT, state=None,
+                 timeout=5.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.state = state or LightState()
+        self._sock = None
+        self._file = None
+
+    def connect(self):
+        """
+        Subscribe, resuming from the last applied message if there was one
+        """
+        self.close()
+        self._sock = socket.create_connection((self.host, self.port),
+                                              timeout=self.timeout)
+        # Messages may be arbitrarily far apart once subscribed
+        self._sock.settimeout(None)
+        self._sock.sendall(encode({'command': 'subscribe',
+                                   'seq': self.state.seq,
+                                   'epoch': self.state.epoch}))
+        self._file = self._sock.makefile('rb')
+
+    def receive(self):
+        """
+        Wait for the next message and apply it to :attr:`.state`
+
+        Raises
+        ------
+        ConnectionError
+            If the server closed the connection
+
+        ValueError
+            If the line received is not a valid message
+        """
+        f = self._file
+        if f is None:
+            self.connect()
+            f = self._file
+        line = f.readline()
+        if not line:
+            raise ConnectionError("Connection to {}:{} closed"
+                                  "".format(self.host, self.port))
+        message = json.loads(line.decode())
+        if 'error' in message:
+            raise ValueError(message['error'])
+        return self.state.apply(message)
+
+    def follow(self, callback=None, retry=1.0, stop=None):
+        """
+        Apply messages until stopped, reconnecting whenever the stream breaks
+
+        The stream is also resumed from the last applied message if a
+        malformed message is received. Exceptions raised by the callback are
+        logged without interrupting the stream
+
+        Parameters
+        ----------
+        callback : callable, optional
+            Called with each message after it has been applied, from the
+            thread running this method
+
+        retry : float, optional
+            Seconds to wait before reconnecting
+
+        stop : threading.Event, optional
+            Return once set. Checked between messages
+        """
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            try:
+                message = self.receive()
+            except (OSError, SequenceError) as exc:
+                logger.warning("Lost lightpath stream at %s, resuming: %s",
+                               self.state.seq, exc)
+                self.close()
+                stop.wait(retry)
+                continue
+            except (ValueError, KeyError) as exc:
+                logger.error("Discarding malformed lightpath message after "
+                             "%s, resuming: %r", self.state.seq, exc)
+                self.close()
+                stop.wait(retry)
+                continue
+            if callback:
+                try:
+                    callback(message)
+                except Exception:
+                    logger.exception("Error handling lightpath message %s",
+                                     message.get('seq'))
+        self.close()
+
+    def close(self):
+        """
+        Close the connection to the server
+
+        Safe to call from another thread while waiting for a message
+        """
+        sock, self._sock = self._sock, None
+        f, self._file = self._file, None
+        if sock is not None:
+            # Wake up any thread blocked reading from the socket
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if f is not None:
+            f.close()
+        if sock is not None:
+            sock.close()
+
+
+def encode(message):
+    """
+    Serialize a message as a single line of JSON
+    """
+    return json.dumps(message, separators=(',', ':')).encode() + b'\n'
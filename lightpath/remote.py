@@ -0,0 +1,369 @@
+"""
+Lightweight stand-ins for the :class:`.LightController`, :class:`.BeamPath`
+and devices, driven by the serialized state of a :class:`.PathModel` rather
+than live ophyd devices. The :class:`.LightApp` accepts a
+:class:`.RemoteController` in place of a :class:`.LightController`, so that a
+console can display the lightpath served by the daemon without loading happi,
+importing ophyd or connecting to a single PV.
+
+.. code:: python
+
+    controller = RemoteController.connect('localhost', port)
+    app = LightApp(controller)
+
+Paths are not evaluated locally, the impediment and incident devices of each
+path are those reported by the daemon. Remote devices can not be inserted or
+removed.
+
+Once connected, the subscriptions of the remote devices and paths are run
+from the thread following the daemon, in the same way that the subscriptions
+of ophyd devices are run from the threads of the control system. Callbacks
+must therefore be safe to call from any thread. The widgets of
+:mod:`lightpath.ui` only hand work off to the GUI thread from these
+callbacks; other Qt consumers should do the same through a queued signal.
+"""
+import logging
+import threading
+from types import SimpleNamespace, MappingProxyType
+
+from .state import DeviceState
+from .protocol import Subscriber, DEFAULT_PORT
+
+logger = logging.getLogger(__name__)
+
+
+class _Subscriptions:
+    """
+    Minimal subscription interface matching ``ophyd.OphydObject``
+    """
+    _default_sub = None
+
+    def __init__(self):
+        self._callbacks = dict()
+
+    def subscribe(self, cb, event_type=None, run=True):
+        event_type = event_type or self._default_sub
+        self._callbacks.setdefault(event_type, list()).append(cb)
+        if run:
+            cb(obj=self, sub_type=event_type)
+
+    def clear_sub(self, cb, event_type=None):
+        for sub_type, callbacks in self._callbacks.items():
+            if event_type in (None, sub_type) and cb in callbacks:
+                callbacks.remove(cb)
+
+    def _run_subs(self, *args, sub_type, **kwargs):
+        for cb in list(self._callbacks.get(sub_type, [])):
+            try:
+                cb(*args, obj=self, sub_type=sub_type, **kwargs)
+            except Exception:
+                logger.exception("Error running %s callback %r",
+                                 sub_type, cb)
+
+
+class RemoteDevice(_Subscriptions):
+    """
+    Device described by a :class:`.PathModel`
+
+    Reports ``inserted`` and ``removed`` from the last state served, raising
+    a ``TimeoutError`` for disconnected devices so that
+    :func:`.find_device_state` interprets them identically to the original
+    device
+
+    Parameters
+    ----------
+    info : dict
+        Description of the device as found in :attr:`.PathModel.devices`
+    """
+    SUB_STATE = 'sub_state_changed'
+    _default_sub = SUB_STATE
+
+    def __init__(self, info):
+        super().__init__()
+        self.name = info['name']
+        self.prefix = info['prefix']
+        self.transmission = info['transmission']
+        self.md = SimpleNamespace(z=info['z'], beamline=info['beamline'])
+        self.state = DeviceState[info['state']]
+        if info['branches']:
+            self.branches = info['branches']
+
+    @property
+    def inserted(self):
+        self._check()
+        return self.state in (DeviceState.Inserted, DeviceState.Inconsistent)
+
+    @property
+    def removed(self):
+        self._check()
+        return self.state in (DeviceState.Removed, DeviceState.Inconsistent)
+
+    def _check(self):
+        if self.state == DeviceState.Disconnected:
+            raise TimeoutError("{} is disconnected".format(self.name))
+        if self.state == DeviceState.Error:
+            raise RuntimeError("{} reported an error".format(self.name))
+
+    def _set_state(self, state):
+        """
+        Store a new state and run the ``SUB_STATE`` subscriptions
+        """
+        if state != self.state:
+            self.state = state
+            self._run_subs(sub_type=self.SUB_STATE)
+
+    def __repr__(self):
+        return '<RemoteDevice {} state={}>'.format(self.name,
+                                                   self.state.name)
+
+
+class RemotePath(_Subscriptions):
+    """
+    Path summarized by a :class:`.PathModel`
+
+    Parameters
+    ----------
+    name : str
+
+    devices : list
+        :class:`.RemoteDevice` objects along the path
+
+    Attributes
+    ----------
+    minimum_transmission : float
+        Kept for compatibility with the :class:`.BeamPath`. Remote paths are
+        evaluated by the daemon at its own threshold
+
+    cache : None
+        Kept for compatibility with the :class:`.BeamPath`. Remote device
+        states are always those last sent by the daemon
+    """
+    SUB_PTH_CHNG = 'beampath_changed'
+    _default_sub = SUB_PTH_CHNG
+
+    def __init__(self, name, devices):
+        super().__init__()
+        self.name = name
+        self.path = sorted(devices, key=lambda device: device.md.z)
+        self.minimum_transmission = 0.1
+        self.cache = None
+        self._impediment = None
+        self._incident = list()
+
+    @property
+    def devices(self):
+        return self.path
+
+    @property
+    def range(self):
+        """
+        Starting z position of the path and the position of the last device
+        """
+        if not self.path:
+            return (0., 0.)
+        return (self.path[0].md.z, self.path[-1].md.z)
+
+    @property
+    def branches(self):
+        """
+        Branching devices along the path
+        """
+        return [device for device in self.path
+                if getattr(device, 'branches', None)]
+
+    @property
+    def impediment(self):
+        """
+        First device blocking the beam, None if the path is clear
+        """
+        return self._impediment
+
+    @property
+    def incident_devices(self):
+        """
+        Devices the beam is incident on
+        """
+        return list(self._incident)
+
+    def snapshot(self, readings=None):
+        """
+        Capture the summary of the path
+
+        Parameters
+        ----------
+        readings : dict, optional
+            Ignored, remote device states are not read
+
+        Returns
+        -------
+        snapshot : :class:`.RemoteSnapshot`
+        """
+        return RemoteSnapshot(self)
+
+    def _update(self, impediment, incident):
+        """
+        Store a new summary and run the ``SUB_PTH_CHNG`` subscriptions
+        """
+        changed = (impediment is not self._impediment
+                   or incident != self._incident)
+        self._impediment = impediment
+        self._incident = incident
+        if changed:
+            self._run_subs(sub_type=self.SUB_PTH_CHNG, device=impediment)
+
+    def __repr__(self):
+        return '<RemotePath {} devices={}>'.format(self.name, len(self.path))
+
+
+class RemoteSnapshot:
+    """
+    Summary of a :class:`.RemotePath` captured at once
+
+    Provides the interface of a :class:`.PathSnapshot`. The daemon evaluates
+    the path at its own threshold, so the same result is returned whichever
+    ``minimum_transmission`` is requested
+
+    Parameters
+    ----------
+    path : :class:`.RemotePath`
+    """
+    def __init__(self, path):
+        self.path = path
+        self.devices = tuple(path.path)
+        self.minimum_transmission = path.minimum_transmission
+        self.states = MappingProxyType(dict((device, device.state)
+                                            for device in self.devices))
+        self._impediment = path.impediment
+        self._incident = path.incident_devices
+
+    def blocking_devices(self, minimum_transmission=None):
+        """
+        The impediment reported by the daemon, if any
+        """
+        return [self._impediment] if self._impediment else []
+
+    def impediment(self, minimum_transmission=None):
+        """
+        First device blocking the beam, None if the path was clear
+        """
+        return self._impediment
+
+    def incident_devices(self, minimum_transmission=None):
+        """
+        Devices the beam was incident on
+        """
+        return list(self._incident)
+
+    def __repr__(self):
+        return '<RemoteSnapshot {} devices={}>'.format(self.path.name,
+                                                       len(self.devices))
+
+
+class RemoteController:
+    """
+    Controller backed by the state served by the lightpath daemon
+
+    Parameters
+    ----------
+    snapshot : dict
+        Complete summary as returned by :meth:`.PathModel.snapshot`
+
+    Attributes
+    ----------
+    beamlines : dict
+        :class:`.RemotePath` objects keyed by name
+    """
+    def __init__(self, snapshot):
+        self._devices = dict((info['name'], RemoteDevice(info))
+                             for info in snapshot['devices'])
+        self.beamlines = dict()
+        self._destinations = list()
+        self._subscriber = None
+        self._stop = threading.Event()
+        for line, info in snapshot['beamlines'].items():
+            self.beamlines[line] = RemotePath(line, [self._devices[name]
+                                                     for name
+                                                     in info['devices']])
+        self.apply(dict(snapshot, type='snapshot'))
+
+    @classmethod
+    def connect(cls, host='localhost', port=DEFAULT_PORT, timeout=5.0):
+        """
+        Subscribe to a :class:`.LightServer` and follow its updates
+
+        Updates are applied from a background thread until :meth:`.close`
+        is called, and the subscriptions of the devices and paths are run
+        from that thread. A malformed message makes the subscriber reconnect
+        and resume from the last message applied
+        """
+        subscriber = Subscriber(host=host, port=port, timeout=timeout)
+        controller = cls(subscriber.receive())
+        controller._subscriber = subscriber
+        threading.Thread(target=subscriber.follow,
+                         kwargs={'callback': controller.apply,
+                                 'stop': controller._stop},
+                         daemon=True).start()
+        return controller
+
+    @property
+    def devices(self):
+        """
+        All of the devices described by the daemon
+        """
+        return list(self._devices.values())
+
+    @property
+    def destinations(self):
+        """
+        Current device destinations for the photon beam
+        """
+        return [self._devices[name] for name in self._destinations]
+
+    @property
+    def incident_devices(self):
+        """
+        List of all devices in contact with photons along the beamline
+        """
+        devices = list()
+
+        for line in self.beamlines.values():
+            devices.extend(line.incident_devices)
+
+        return list(set(devices))
+
+    def apply(self, message):
+        """
+        Update the devices and paths from a single :mod:`lightpath.protocol`
+        message
+        """
+        kind = message['type']
+        if kind == 'snapshot':
+            for info in message['devices']:
+                if info['name'] in self._devices:
+                    self._devices[info['name']]._set_state(
+                                            DeviceState[info['state']])
+            for line, info in message['beamlines'].items():
+                if line in self.beamlines:
+                    self._update_path(line, info)
+            self._destinations = message['destinations']
+        elif kind == 'state':
+            self._devices[message['device']]._set_state(
+                                            DeviceState[message['state']])
+        elif kind == 'beamline':
+            self._update_path(message['beamline'], message)
+        elif kind == 'destinations':
+            self._destinations = message['destinations']
+
+    def close(self):
+        """
+        Stop following the daemon
+        """
+        self._stop.set()
+        if self._subscriber:
+            self._subscriber.close()
+
+    def _update_path(self, line, info):
+        impediment = info['impediment']
+        self.beamlines[line]._update(
+                self._devices[impediment] if impediment else None,
+                [self._devices[name] for name in info['incident_devices']])
@@ -0,0 +1,476 @@
+"""
+Every operator console running the :class:`.LightApp` connects to each device
+of the lightpath and evaluates the paths on its own. The lightpath daemon
+instead maintains the live path model once, in a single process, and serves
+the current impediments, destinations and incident devices to any number of
+clients over a local socket.
+
+Requests and replies are single lines of JSON. A request names a command from
+:attr:`.LightServer.commands`:
+
+.. code:: python
+
+    >>> request('impediments', port=port)
+    {'MEC': 'mec_stopper', 'XCS': None}
+
+Clients that need to stay in sync send a ``subscribe`` request instead and
+receive the delta stream described in :mod:`lightpath.protocol`.
+
+The daemon is started with the ``lightpath-daemon`` script
+"""
+import json
+import queue
+import socket
+import logging
+import argparse
+import threading
+import socketserver
+
+from .state import find_device_state
+from .protocol import DeltaLog, DEFAULT_PORT, encode
+
+logger = logging.getLogger(__name__)
+
+
+class PathModel:
+    """
+    Continuously evaluated summary of every path of a controller
+
+    The model subscribes to each device once. When a device changes state,
+    only the paths that contain it are evaluated again, so that requests are
+    answered from the stored summary without touching any device
+
+    Every change is also published as a message of the
+    :mod:`lightpath.protocol` to the registered listeners
+
+    Parameters
+    ----------
+    controller : :class:`.LightController`
+
+    history : int, optional
+        Number of messages kept for listeners resuming a subscription
+
+    Attributes
+    ----------
+    deltas : :class:`.DeltaLog`
+        Most recent messages
+    """
+    def __init__(self, controller, history=4096):
+        self.controller = controller
+        self.deltas = DeltaLog(size=history)
+        self._listeners = list()
+        self._lock = threading.RLock()
+        self._devices = dict()
+        self._beamlines = dict()
+        self._branches = dict()
+        self._lines = dict()
+        self._watched = set()
+        readings = dict()
+        for path in controller.beamlines.values():
+            self._branches[path.name] = set(d.name for d in path.branches)
+            for device in path.path:
+                if device.name not in self._devices:
+                    self._devices[device.name] = self._describe(device,
+                                                                path.cache)
+                self._lines.setdefault(device, list()).append(path)
+            self._evaluate(path, readings)
+        for device in self._lines:
+            try:
+                device.subscribe(self._device_changed,
+                                 event_type=device.SUB_STATE, run=False)
+            except Exception:
+                logger.error("PathModel is unable to subscribe "
+                             "to device %s", device.name)
+            else:
+                self._watched.add(device)
+
+    @property
+    def impediments(self):
+        """
+        Name of the impediment of each path, None if the path is clear
+        """
+        with self._lock:
+            return dict((line, info['impediment'])
+                        for line, info in self._beamlines.items())
+
+    @property
+    def destinations(self):
+        """
+        Names of the devices the beam currently ends on
+        """
+        with self._lock:
+            return sorted(set(info['impediment']
+                              for line, info in self._beamlines.items()
+                              if info['impediment']
+                              and info['impediment']
+                              not in self._branches[line]))
+
+    @property
+    def incident_devices(self):
+        """
+        Names of the devices the beam is incident on along each path
+        """
+        with self._lock:
+            return dict((line, list(info['incident_devices']))
+                        for line, info in self._beamlines.items())
+
+    @property
+    def devices(self):
+        """
+        Description and current state of every device, ordered by z
+        """
+        with self._lock:
+            return sorted((dict(info) for info in self._devices.values()),
+                          key=lambda info: info['z'])
+
+    def snapshot(self):
+        """
+        Complete summary of the lightpath
+
+        Returns
+        -------
+        snapshot : dict
+            Contains the :attr:`.devices`, the device names and current
+            impediment and incident devices of each path, the
+            :attr:`.destinations` and the epoch of the :attr:`.deltas`
+        """
+        # Path summaries are replaced rather than modified on evaluation
+        with self._lock:
+            return {'epoch': self.deltas.epoch,
+                    'devices': self.devices,
+                    'beamlines': dict((line, dict(info)) for line, info
+                                      in self._beamlines.items()),
+                    'destinations': self.destinations}
+
+    def listen(self, callback, seq=None, epoch=None):
+        """
+        Register a callback for every subsequent message
+
+        Parameters
+        ----------
+        callback : callable
+            Called with each message. Runs while the model is locked, so it
+            should only hand the message off
+
+        seq : int, optional
+            Last sequence number already seen by the listener
+
+        epoch : str, optional
+            Epoch of the :attr:`.deltas` that issued ``seq``. A snapshot is
+            sent if it is not the current one
+
+        Returns
+        -------
+        backlog : list
+            Messages the listener has missed since ``seq``, or a single
+            snapshot if these are no longer available
+        """
+        with self._lock:
+            backlog = None
+            if seq is not None:
+                backlog = self.deltas.since(seq, epoch)
+            if backlog is None:
+                backlog = [dict(self.snapshot(), type='snapshot',
+                                seq=self.deltas.seq)]
+            self._listeners.append(callback)
+        return backlog
+
+    def unlisten(self, callback):
+        """
+        Stop sending messages to a callback
+        """
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def close(self):
+        """
+        Remove all device subscriptions
+        """
+        for device in self._watched:
+            device.clear_sub(self._device_changed)
+        self._watched.clear()
+
+    @staticmethod
+    def _describe(device, cache):
+        return {'name': device.name,
+                'prefix': getattr(device, 'prefix', device.name),
+                'z': device.md.z,
+                'beamline': device.md.beamline,
+                'transmission': getattr(device, 'transmission', 1.0),
+                'branches': list(getattr(device, 'branches', None) or []),
+                'state': find_device_state(device, cache=cache).name}
+
+    def _evaluate(self, path, readings=None):
+        """
+        Store the summary of a path, returning whether it has changed
+
+        The impediment and incident devices are found from a single
+        :class:`.PathSnapshot`, sharing ``readings`` with other paths
+        """
+        snapshot = path.snapshot(readings=readings)
+        impediment = snapshot.impediment()
+        info = {'devices': [d.name for d in snapshot.devices],
+                'impediment': impediment.name if impediment else None,
+                'incident_devices': [d.name for d
+                                     in snapshot.incident_devices()]}
+        changed = self._beamlines.get(path.name) != info
+        self._beamlines[path.name] = info
+        return changed
+
+    def _publish(self, message):
+        message = self.deltas.append(message)
+        for callback in list(self._listeners):
+            try:
+                callback(message)
+            except Exception:
+                logger.exception("Error sending lightpath message")
+
+    def _device_changed(self, *args, obj=None, **kwargs):
+        """
+        Run when a device changes state
+        """
+        if obj is None:
+            return
+        paths = self._lines.get(obj, [])
+        state = find_device_state(obj, cache=paths[0].cache
+                                  if paths else None)
+        with self._lock:
+            info = self._devices[obj.name]
+            if info['state'] != state.name:
+                info['state'] = state.name
+                self._publish({'type': 'state', 'device': obj.name,
+                               'state': state.name})
+            destinations = self.destinations
+            readings = dict()
+            for path in paths:
+                if self._evaluate(path, readings):
+                    info = self._beamlines[path.name]
+                    self._publish({'type': 'beamline',
+                                   'beamline': path.name,
+                                   'impediment': info['impediment'],
+                                   'incident_devices':
+                                       list(info['incident_devices'])})
+            if self.destinations != destinations:
+                self._publish({'type': 'destinations',
+                               'destinations': self.destinations})
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """
+    Answer each line sent by a client
+    """
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line.decode())
+                if request.get('command') == 'subscribe':
+                    return self.stream(request.get('seq'),
+                                       request.get('epoch'))
+                reply = self.server.respond(request)
+            except Exception as exc:
+                logger.debug("Invalid request %r", line)
+                reply = {'error': str(exc)}
+            self.wfile.write(json.dumps(reply).encode() + b'\n')
+
+    def stream(self, seq=None, epoch=None):
+        """
+        Push every message of the model until the client disconnects
+
+        At most ``max_queued`` messages of the :class:`.LightServer` are
+        held for a client. If it falls further behind, the queued messages
+        are dropped and a new snapshot is sent in their place
+        """
+        model = self.server.model
+        messages = queue.Queue(maxsize=self.server.max_queued)
+        overflow = threading.Event()
+
+        def put(message):
+            # Runs while the model is locked, never wait for the client
+            try:
+                messages.put_nowait(message)
+            except queue.Full:
+                overflow.set()
+
+        backlog = model.listen(put, seq=seq, epoch=epoch)
+        try:
+            for message in backlog:
+                self.wfile.write(encode(message))
+            while not self.server.stopped.is_set():
+                if overflow.is_set():
+                    logger.warning("Subscriber %s fell behind, sending a "
+                                   "new snapshot", self.client_address)
+                    model.unlisten(put)
+                    while not messages.empty():
+                        messages.get_nowait()
+                    overflow.clear()
+                    for message in model.listen(put):
+                        self.wfile.write(encode(message))
+                try:
+                    message = messages.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                self.wfile.write(encode(message))
+        except OSError:
+            logger.debug("Subscriber %s disconnected", self.client_address)
+        finally:
+            model.unlisten(put)
+
+
+class LightServer(socketserver.ThreadingTCPServer):
+    """
+    Serve a :class:`.PathModel` over a local socket
+
+    Parameters
+    ----------
+    model : :class:`.PathModel`
+
+    host : str, optional
+        Interface to listen on, only the local machine by default
+
+    port : int, optional
+        Port to listen on. Zero picks any free port
+
+    max_queued : int, optional
+        Number of messages held for a subscriber that is slow to read them,
+        before they are replaced by a new snapshot
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+    # Requests understood by the server
+    commands = ('snapshot', 'devices', 'impediments', 'destinations',
+                'incident_devices')
+
+    def __init__(self, model, host='localhost', port=DEFAULT_PORT,
+                 max_queued=1024):
+        self.model = model
+        self.max_queued = max_queued
+        self.stopped = threading.Event()
+        self._thread = None
+        super().__init__((host, port), _Handler)
+
+    @property
+    def port(self):
+        """
+        Port the server is listening on
+        """
+        return self.server_address[1]
+
+    def respond(self, request):
+        """
+        Reply to a single request
+
+        Parameters
+        ----------
+        request : dict
+            Must contain a ``command`` from :attr:`.commands`
+
+        Returns
+        -------
+        reply : dict
+        """
+        command = request.get('command')
+        if command not in self.commands:
+            raise ValueError("Unknown command {!r}".format(command))
+        if command == 'snapshot':
+            return self.model.snapshot()
+        return {command: getattr(self.model, command)}
+
+    def start(self):
+        """
+        Serve requests from a background thread
+        """
+        self._thread = threading.Thread(target=self.serve_forever,
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop serving requests and close the socket
+        """
+        self.stopped.set()
+        self.shutdown()
+        self.server_close()
+        if self._thread:
+            self._thread.join()
+
+
+def request(command, host='localhost', port=DEFAULT_PORT, timeout=5.0):
+    """
+    Send a single request to a :class:`.LightServer`
+
+    Parameters
+    ----------
+    command : str
+        One of :attr:`.LightServer.commands`
+
+    host : str, optional
+
+    port : int, optional
+
+    timeout : float, optional
+        Seconds to wait for the reply
+
+    Returns
+    -------
+    reply : dict
+    """
+    with socket.create_connection((host, port), timeout=timeout) as sock:
+        sock.sendall(json.dumps({'command': command}).encode() + b'\n')
+        with sock.makefile('rb') as f:
+            reply = json.loads(f.readline().decode())
+    if 'error' in reply:
+        raise ValueError(reply['error'])
+    return reply
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Serve the lightpath state '
+                                                 'to remote clients')
+    parser.add_argument('--db', type=str, required=True,
+                        help='Path to happi JSON database')
+    parser.add_argument('--host', type=str, default='localhost',
+                        help='Interface to listen on')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT,
+                        help='Port to listen on, {} by default'
+                             ''.format(DEFAULT_PORT))
+    parser.add_argument('--endstations', type=str, nargs='*',
+                        help='Only load the paths to these endstations')
+    parser.add_argument('--export', type=str, metavar='DIRECTORY',
+                        help='Publish SVG and HTML pages of the paths to '
+                             'this directory')
+    parser.add_argument('--export-interval', type=float, default=1.,
+                        metavar='SECONDS',
+                        help='Time between exports, one second by default')
+    args = parser.parse_args(args)
+    import happi
+    from .cache import StateCache
+    from .controller import LightController
+    # States are monitored, evaluation never waits on a device
+    controller = LightController(happi.Client(path=args.db),
+                                 endstations=args.endstations,
+                                 cache=StateCache())
+    model = PathModel(controller)
+    server = LightServer(model, host=args.host, port=args.port)
+    logger.info("Serving %s paths on %s:%s", len(controller.beamlines),
+                args.host, server.port)
+    stop = threading.Event()
+    if args.export:
+        from .export import SVGExporter
+        threading.Thread(target=SVGExporter(controller).follow,
+                         args=(args.export, args.export_interval, stop),
+                         daemon=True, name='lightpath-export').start()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        server.server_close()
+        model.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+"""
+Launching the lightpath involves importing large libraries, searching the
+happi database, instantiating every device, connecting to their signals and
+finally creating a row of widgets for each one. The :class:`.StartupProfile`
+records how long each of these phases take along with the time spent on each
+individual device so that slow stages or devices can be identified from a
+single structured report.
+"""
+import sys
+import json
+import time
+import logging
+import platform
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class StartupProfile:
+    """
+    Phase and per-device timings of an application startup
+
+    Attributes
+    ----------
+    phases : list
+        Tuples of phase name and duration in seconds, in the order they were
+        recorded
+
+    devices : dict
+        Mapping of device name to a dictionary of durations for each stage of
+        loading that device
+    """
+    def __init__(self):
+        self.phases = list()
+        self.devices = dict()
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Time the enclosed block as a named phase
+        """
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_phase(name, time.perf_counter() - t0)
+
+    def add_phase(self, name, duration):
+        """
+        Record a phase that was timed elsewhere
+        """
+        logger.debug("Startup phase %s took %.3f s", name, duration)
+        self.phases.append((name, duration))
+
+    def record_device(self, name, stage, duration):
+        """
+        Record the time spent on a single device
+
+        Parameters
+        ----------
+        name : str
+            Name of the device
+
+        stage : str
+            Stage of loading, e.g ``'load'`` or ``'connect'``
+
+        duration : float
+            Seconds spent
+        """
+        self.devices.setdefault(name, dict())[stage] = duration
+
+    def time_devices(self, stage, devices, func):
+        """
+        Call a function for each device and record how long each call took
+
+        Exceptions raised by the function are logged and the device is still
+        recorded
+
+        Parameters
+        ----------
+        stage : str
+            Name of the stage to record the timings under
+
+        devices : iterable
+
+        func : callable
+            Called with each device
+        """
+        for device in devices:
+            t0 = time.perf_counter()
+            try:
+                func(device)
+            except Exception:
+                logger.exception("Failed %s for %s", stage, device.name)
+            finally:
+                self.record_device(device.name, stage,
+                                   time.perf_counter() - t0)
+
+    def slowest_devices(self, count=10):
+        """
+        Devices with the largest total time across all stages
+
+        Returns
+        -------
+        devices : list
+            Tuples of device name and total duration
+        """
+        totals = [(name, sum(stages.values()))
+                  for name, stages in self.devices.items()]
+        return sorted(totals, key=lambda x: x[1], reverse=True)[:count]
+
+    def report(self):
+        """
+        Structured summary of the recorded startup
+
+        Returns
+        -------
+        report : dict
+        """
+        return {'python': platform.python_version(),
+                'argv': sys.argv,
+                'total': time.perf_counter() - self._start,
+                'phases': [{'name': name, 'duration': duration}
+                           for name, duration in self.phases],
+                'devices': self.devices,
+                'slowest': [{'name': name, 'duration': duration}
+                            for name, duration in self.slowest_devices()]}
+
+    def write(self, filename):
+        """
+        Write the :meth:`.report` as JSON
+        """
+        with open(filename, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+        logger.info("Startup profile written to %s", filename)
+
+    def summary(self):
+        """
+        Human-readable summary of the phases and the slowest devices
+        """
+        lines = ['Startup phases:']
+        lines.extend('  {:<24} {:8.3f} s'.format(name, duration)
+                     for name, duration in self.phases)
+        slowest = self.slowest_devices()
+        if slowest:
+            lines.append('Slowest devices:')
+            lines.extend('  {:<24} {:8.3f} s'.format(name, duration)
+                         for name, duration in slowest)
+        return '\n'.join(lines)
@@ -0,0 +1,119 @@
+"""
+The :class:`.DeviceState` summarizes the ``inserted`` and ``removed``
+properties of a device into a single value. This module purposely avoids
+importing ``ophyd`` or any other large dependency so that scripts which only
+need to interpret device states can import it cheaply.
+"""
+import sys
+import enum
+import logging
+
+from .metrics import timed
+
+logger = logging.getLogger(__name__)
+
+
+class DeviceState(enum.Enum):
+    """
+    Description of BeamStates
+
+    The standard Inserted, Removed or Unknown have been expanded within
+    this state to help operators diagnose exact reasons for uncertainty in the
+    state of the beamline
+
+    Attributes
+    ----------
+    Removed:
+        Device is removed from the beamline.
+
+    Inserted:
+        Device is inserted into the beamline. This may or may not prevent beam
+        from reaching downstream devices.
+
+    Unknown:
+        Device is reporting neither an inserted or removed state.
+
+    Inconsistent:
+        The device is reporting that is both inserted and removed.
+
+    Disconnected:
+        We were unable to determine the state of the device because one or more
+        of the relevant signals was not available.
+
+    Error:
+        Catch-all state for any errors the device reported when asked for its
+        state that were not simply a failure to communicate with signals
+    """
+    Removed = 0
+    Inserted = 1
+    Unknown = 2
+    Inconsistent = 3
+    Disconnected = 4
+    Error = 5
+
+
+def find_device_state(device, cache=None):
+    """
+    Report the state of a device
+
+    The device must implement ``.inserted`` and ``removed``.
+
+    Parameters
+    ----------
+    device : ophyd.Device
+
+    cache : :class:`.StateCache`, optional
+        Answer from the last monitored state of the device instead of reading
+        it synchronously
+
+    Returns
+    -------
+    state: DeviceState
+    """
+    if cache is not None:
+        return cache.state(device)
+    return _read_device_state(device)
+
+
+@timed('find_device_state', lambda device: device.name)
+def _read_device_state(device):
+    """
+    Synchronously read the state of a device
+    """
+    # Gather device information
+    try:
+        _in, _out = device.inserted, device.removed
+        logger.debug("Device %s reporting; IN=%s, OUT=%s",
+                     device.name, _in, _out)
+    except Exception as exc:
+        # Check if this was an error with an EPICS connection
+        if _is_disconnection(exc):
+            logger.warning("Unable to connect to %r", device)
+            logger.debug(exc, exc_info=True)
+            return DeviceState.Disconnected
+        logger.exception("Unable to determine device state for %r", device)
+        return DeviceState.Error
+    # Check state consistency and return proper Enum
+    # In
+    if _in and not _out:
+        return DeviceState.Inserted
+    # Out
+    elif _out and not _in:
+        return DeviceState.Removed
+    # Both In and Out
+    elif _out and _in:
+        return DeviceState.Inconsistent
+    # Neither In or Out
+    else:
+        return DeviceState.Unknown
+
+
+def _is_disconnection(exc):
+    """
+    Whether an exception signals a failure to communicate with a device
+    """
+    if isinstance(exc, TimeoutError):
+        return True
+    # A DisconnectedError can only have been raised if ophyd was imported
+    utils = sys.modules.get('ophyd.utils')
+    return bool(utils) and isinstance(exc, utils.DisconnectedError)
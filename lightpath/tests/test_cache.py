@@ -0,0 +1,138 @@
+import time
+from unittest.mock import Mock
+
+from lightpath import BeamPath
+from lightpath.cache import StateCache, QuarantinePolicy
+from lightpath.path import find_device_state, DeviceState
+from .conftest import Status, Valve
+
+
+def test_cache_monitors_state(device):
+    cache = StateCache()
+    cache.watch(device)
+    device.remove()
+    assert device in cache
+    assert find_device_state(device, cache=cache) == DeviceState.Removed
+    # Monitored changes are reflected without a read
+    device.insert()
+    assert cache.state(device) == DeviceState.Inserted
+    assert cache.misses == 0
+    # Changes that were not reported are not seen
+    device.status = Status.removed
+    assert cache.state(device) == DeviceState.Inserted
+    cache.unwatch(device)
+    assert device not in cache
+
+
+def test_cache_staleness(device):
+    cache = StateCache(max_age=10.)
+    device.remove()
+    # Unknown devices are read synchronously
+    assert cache.state(device) == DeviceState.Removed
+    assert cache.misses == 1
+    assert cache.age(device) < 10.
+    # Fresh values are returned from the cache
+    device.status = Status.inserted
+    assert cache.state(device) == DeviceState.Removed
+    assert cache.hits == 1
+    # Old values are refreshed
+    cache.set(device, DeviceState.Removed, timestamp=-100.)
+    assert cache.is_stale(device)
+    assert cache.state(device) == DeviceState.Inserted
+    assert cache.misses == 2
+    device.remove()
+
+
+def test_cached_path(path):
+    cache = StateCache()
+    bp = BeamPath(*path.devices, cache=cache)
+    assert len(cache) == 0
+    assert bp.impediment is None
+    assert len(cache) == len(path.devices)
+    # Path callbacks see the new state
+    cb = Mock()
+    bp.subscribe(cb, run=False)
+    bp.path[2].insert()
+    assert cb.called
+    assert bp.impediment == bp.path[2]
+    # Each state change is only read once
+    assert cache.health(bp.path[2]).reads == 2
+    # Derived paths share the cache
+    assert bp.split(device=bp.path[3])[0].cache is cache
+    assert bp.join(path).cache is cache
+
+
+def test_cached_path_subscribed_first(path):
+    cache = StateCache()
+    bp = BeamPath(*path.devices, cache=cache)
+    device = bp.path[2]
+    # Subscribe the path before the cache watches the device
+    cache.unwatch(device)
+    cb = Mock()
+    bp.subscribe(cb, run=False)
+    device.insert()
+    assert cb.called
+    assert cache.state(device) == DeviceState.Inserted
+    assert cache.health(device).reads == 1
+    # Removed callbacks are no longer run
+    cache.clear_sub(bp._device_moved)
+    cb.reset_mock()
+    device.remove()
+    assert not cb.called
+
+
+class SlowValve(Valve):
+    """
+    Valve that takes a while to report its state
+    """
+    delay = 0.0
+
+    @property
+    def inserted(self):
+        time.sleep(self.delay)
+        return super().inserted
+
+
+def test_quarantine_failing_device(device):
+    cache = StateCache(policy=QuarantinePolicy(strikes=2, duration=100.))
+    cache.watch(device)
+    device.status = Status.disconnected
+    # Failed reads are retried until the device is quarantined
+    assert cache.state(device) == DeviceState.Disconnected
+    assert cache.state(device) == DeviceState.Disconnected
+    health = cache.health(device)
+    assert health.reads == 2
+    assert health.failure_rate == 1.0
+    assert cache.quarantined == {device}
+    # Quarantined devices are not read
+    assert cache.state(device) == DeviceState.Disconnected
+    assert health.reads == 2
+    # Reintegrated when the device reports again
+    device.remove()
+    assert cache.quarantined == set()
+    assert cache.state(device) == DeviceState.Removed
+    assert health.strikes == 0
+    cache.unwatch(device)
+
+
+def test_quarantine_slow_device():
+    device = SlowValve('slow', z=0., beamline='TST')
+    device.delay = 0.02
+    cache = StateCache(max_age=0.,
+                       policy=QuarantinePolicy(slow=0.01, strikes=1,
+                                               duration=100.))
+    # Slow, but successful, read
+    assert cache.state(device) == DeviceState.Removed
+    health = cache.health(device)
+    assert health.slow == 1
+    assert health.mean_latency >= 0.02
+    assert device in cache.quarantined
+    # Evaluation does not wait on the device
+    assert cache.state(device) == DeviceState.Disconnected
+    assert health.reads == 1
+    # A healthy probe after the quarantine reintegrates the device
+    device.delay = 0.
+    health.quarantined_until = time.monotonic() - 1.
+    assert cache.state(device) == DeviceState.Removed
+    assert health.quarantined_until is None
+    assert health.as_dict()['quarantined'] is False
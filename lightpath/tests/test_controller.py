@@ -1,3 +1,5 @@
+import math
+
 from lightpath import LightController
 
 
@@ -21,6 +23,15 @@ def test_controller_paths(lcls_client):
     assert controller.hxr.path[-1].name == 'XRT M2H'
     assert controller.mec.path[-1].name == 'S6 Stopper'
     assert controller.cxi.path[-1].name == 'S5 Stopper'
+    # Loading was timed
+    assert 'FEE Valve 1' in controller.load_times
+    assert ('MEC', 0.0, math.inf) in controller.search_times
+    # Paths share a cache by default
+    assert controller.cache is not None
+    assert all(path.cache is controller.cache
+               for path in controller.beamlines.values())
+    assert LightController(lcls_client, endstations=['MEC'],
+                           cache=False).mec.cache is None
 
 
 def test_controller_device_summaries(lcls_client):
@@ -0,0 +1,63 @@
+import time
+from unittest.mock import patch
+
+import pytest
+from pydm.PyQt.QtCore import Qt
+
+from lightpath.path import BeamPath, DeviceState, PathSnapshot
+from lightpath.ui.evaluation import (PathEvaluator, evaluate, evaluate_all,
+                                     reevaluate)
+
+
+def test_evaluate(path):
+    path.path[2].insert()
+    evaluation = evaluate(path)
+    path.path[2].remove()
+    # Results are unaffected by later changes
+    assert evaluation.impediment is path.path[2]
+    assert evaluation.states[path.path[2]] == DeviceState.Inserted
+    with pytest.raises(TypeError):
+        evaluation.states[path.path[2]] = DeviceState.Removed
+
+
+def test_reevaluate(path):
+    path.path[2].insert()
+    evaluation = evaluate(path)
+    path.path[2].remove()
+    # Threshold changes use the original readings
+    clear = reevaluate(evaluation, 0.0)
+    assert clear.impediment is None
+    assert clear.minimum_transmission == 0.0
+    assert clear.states is evaluation.states
+    assert reevaluate(clear, 0.5).impediment is path.path[2]
+
+
+def test_evaluate_all(path):
+    upstream = BeamPath(*path.path[:4], name='upstream')
+    downstream = BeamPath(*path.path[3:], name='downstream')
+    with patch.object(PathSnapshot, '_read',
+                      side_effect=PathSnapshot._read) as read:
+        evaluations = evaluate_all([path, upstream, downstream])
+    # Each device is read once, however many paths share it
+    assert read.call_count == len(path.devices)
+    assert set(evaluations) == set((path.name, upstream.name,
+                                    downstream.name))
+    assert evaluations[path.name].impediment == path.impediment
+
+
+def test_path_evaluator(path):
+    evaluator = PathEvaluator()
+    results = list()
+    evaluator.evaluated.connect(results.append, Qt.DirectConnection)
+    # Bursts of requests are collapsed
+    for i in range(100):
+        evaluator.request(path)
+    t0 = time.time()
+    while evaluator._pending is not None or not results:
+        assert time.time() - t0 < 5
+        time.sleep(0.01)
+    evaluator.stop()
+    assert evaluator.requests == 100
+    assert evaluator.evaluations == len(results) <= 100
+    assert results[-1].path is path
+    assert results[-1].impediment is None
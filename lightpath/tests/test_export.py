@@ -0,0 +1,37 @@
+import os
+
+from lightpath.export import SVGExporter
+
+
+def test_export_render(path):
+    exporter = SVGExporter(path)
+    images = exporter.render()
+    assert list(images) == [path.name]
+    svg = images[path.name]
+    assert svg.startswith('<svg')
+    assert all(device.name in svg for device in path.devices)
+    assert exporter.rendered == len(path.devices)
+    # Unchanged paths are not redrawn
+    assert exporter.render()[path.name] is svg
+    assert exporter.rendered == len(path.devices)
+    # Only devices whose drawing changed are rendered again
+    path.path[6].insert()
+    assert exporter.render()[path.name] != svg
+    assert exporter.rendered == len(path.devices) + 1
+    path.path[6].remove()
+    assert exporter.render()[path.name] == svg
+    assert exporter.rendered == len(path.devices) + 1
+
+
+def test_export_write(path, tmpdir):
+    directory = str(tmpdir)
+    exporter = SVGExporter(path)
+    written = exporter.write(directory)
+    assert sorted(os.path.basename(f)
+                  for f in written) == ['TST.svg', 'index.html']
+    with open(os.path.join(directory, 'index.html')) as f:
+        assert path.name in f.read()
+    # Files are only written when they change
+    assert exporter.write(directory) == []
+    path.path[2].insert()
+    assert len(exporter.write(directory)) == 2
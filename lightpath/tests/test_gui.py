@@ -2,6 +2,7 @@ from distutils.spawn import find_executable
 
 from lightpath.ui import LightApp
 from lightpath.controller import LightController
+from lightpath.path import BeamPath
 
 
 def test_app_buttons(lcls_client):
@@ -24,9 +25,46 @@ def test_beampath_controls(lcls_client):
     lightapp.insert(True, device=lightapp.rows[0].device)
     assert lightapp.rows[0].device.inserted
     lightapp.transmission_adjusted(50)
-    assert lightapp.path.minimum_transmission == 0.5
+    assert lightapp.minimum_transmission == 0.5
+    # The shared path keeps its own threshold
+    assert lightapp.path.minimum_transmission == BeamPath.minimum_transmission
 
 
 def test_lightpath_launch_script():
     # Check that the executable was installed
     assert find_executable('lightpath')
+
+
+def test_row_pool(lcls_client):
+    lightapp = LightApp(LightController(lcls_client))
+    lightapp.destination_combo.setCurrentIndex(
+                            lightapp.destination_combo.findText('MEC'))
+    rows = dict((row.device, row) for row in lightapp.rows)
+    # Switching paths reuses the rows of shared devices
+    lightapp.destination_combo.setCurrentIndex(
+                            lightapp.destination_combo.findText('CXI'))
+    shared = [row for row in lightapp.rows if row.device in rows]
+    assert shared
+    assert all(rows[row.device] is row for row in shared)
+    assert len(lightapp.rows) == len(lightapp.path.path)
+    # Rows follow the order of the path
+    assert [row.device for row in lightapp.rows] == lightapp.path.path
+
+
+def test_virtualized_app(lcls_client):
+    lightapp = LightApp(LightController(lcls_client), virtualized=True)
+    # No rows are created, the model holds the devices instead
+    assert lightapp.rows == []
+    model = lightapp.model
+    assert model.rowCount() == len(lightapp.path.path)
+    device = model.devices[0]
+    device.insert()
+    assert model.data(model.index(0, model.State)) == 'Inserted'
+    device.remove()
+    assert model.data(model.index(0, model.State)) == 'Removed'
+    # Switching paths resets the model
+    lightapp.upstream_check.setChecked(False)
+    lightapp.change_path_display()
+    assert model.rowCount() == len(model.devices)
+    assert all(device.md.beamline == lightapp.selected_beamline()
+               for device in model.devices)
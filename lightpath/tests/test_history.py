@@ -0,0 +1,126 @@
+import time
+
+from lightpath.history import StateHistory
+from lightpath.journal import JournalWriter
+from lightpath.path import DeviceState
+
+
+def wait():
+    # Separate the timestamps of consecutive records
+    time.sleep(0.01)
+    t = time.time()
+    time.sleep(0.01)
+    return t
+
+
+def record(path, filename):
+    with JournalWriter(filename) as journal:
+        journal.attach(path)
+        path.path[2].insert()
+        t1 = wait()
+        path.path[2].remove()
+        path.path[4].insert()
+        t2 = wait()
+    path.path[4].remove()
+    return t1, t2
+
+
+def test_history_queries(path, tmpdir):
+    journal = str(tmpdir.join('lightpath.journal'))
+    t0 = time.time()
+    t1, t2 = record(path, journal)
+    history = StateHistory(str(tmpdir.join('lightpath.db')))
+    assert history.ingest(journal) == len(path.devices) + 3
+    start, end = history.range
+    assert t0 <= start <= end <= time.time()
+    # Point in time queries
+    assert history.impediment_at(path.name, t1).name == path.path[2].name
+    assert history.impediment_at(path.name, t2).name == path.path[4].name
+    assert history.impediment_at(path.name, start) is None
+    assert history.states_at(t1)[path.path[2].name] == DeviceState.Inserted
+    assert history.states_at(t0 - 100) == {}
+    incident = [d.name for d in history.incident_devices_at(path.name, t1)]
+    assert incident == [path.path[2].name]
+    # Interval queries
+    changes = history.impediments_between(path.name, start, t2)
+    assert [name for t, name in changes] == [None, path.path[2].name, None,
+                                             path.path[4].name]
+    assert len(history.transitions_between(t1, t2)) == 2
+    assert history.transitions_between(t1, t2,
+                                       device=path.path[4].name)[0][2] \
+        == DeviceState.Inserted
+    history.close()
+    # History persists on disk
+    history = StateHistory(str(tmpdir.join('lightpath.db')))
+    assert history.impediment_at(path.name, t2).name == path.path[4].name
+    assert history.at(t2)[path.name].impediment.destination == ['SIM']
+
+
+def test_history_reingest(path, tmpdir):
+    journal = str(tmpdir.join('lightpath.journal'))
+    t0 = time.time()
+    record(path, journal)
+    history = StateHistory(':memory:')
+    count = history.ingest(journal)
+    # Ingesting the same journal again adds nothing
+    assert history.ingest(journal) == 0
+    t1 = time.time()
+    assert len(history.transitions_between(t0, t1)) == count
+    changes = history.impediments_between(path.name, t0, t1)
+    assert len(changes) == 4
+    # Only the new transitions of a grown journal are added
+    with JournalWriter(journal) as writer:
+        writer.attach(path)
+        path.path[2].insert()
+    path.path[2].remove()
+    t2 = time.time()
+    assert history.ingest(journal) == len(path.devices) + 1
+    assert (len(history.transitions_between(t0, t2))
+            == count + len(path.devices) + 1)
+    assert history.impediments_between(path.name, t0, t1) == changes
+
+
+def test_history_independent_queries(path, tmpdir):
+    journal = str(tmpdir.join('lightpath.journal'))
+    t1, t2 = record(path, journal)
+    history = StateHistory(':memory:')
+    history.ingest(journal)
+    # Each query is made of its own devices
+    first, second = history.at(t1), history.at(t2)
+    assert first[path.name].impediment.name == path.path[2].name
+    assert second[path.name].impediment.name == path.path[4].name
+
+
+def test_history_transmission(path, tmpdir):
+    journal = str(tmpdir.join('lightpath.journal'))
+    device = path.path[5]
+    with JournalWriter(journal) as writer:
+        writer.attach(path)
+        device.insert()
+        t1 = wait()
+        device._transmission = 0.0
+        device.remove()
+        device.insert()
+        t2 = wait()
+    device.remove()
+    history = StateHistory(':memory:')
+    history.ingest(journal)
+    assert history.impediment_at(path.name, t1) is None
+    assert history.impediment_at(path.name, t2).name == device.name
+
+
+def test_history_controller(lcls_client, tmpdir):
+    from lightpath.controller import LightController
+    journal = str(tmpdir.join('lightpath.journal'))
+    history = StateHistory(':memory:')
+    lc = LightController(lcls_client, history=history)
+    with JournalWriter(journal) as writer:
+        writer.attach_controller(lc)
+        t = wait()
+    history.ingest(journal)
+    assert (set(d.name for d in lc.destinations_at(t))
+            == set(d.name for d in lc.destinations))
+    assert (set(d.name for d in lc.incident_devices_at(t))
+            == set(d.name for d in lc.incident_devices))
+    line = next(iter(lc.beamlines))
+    assert len(lc.impediments_between(line, t, t)) == 1
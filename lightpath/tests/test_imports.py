@@ -0,0 +1,46 @@
+import sys
+import json
+import subprocess
+
+import pytest
+
+# Seconds allowed for importing the lightweight parts of the package
+IMPORT_BUDGET = 0.5
+HEAVY = ('ophyd', 'happi', 'prettytable', 'pydm')
+
+script = """
+import sys, json, time
+t0 = time.perf_counter()
+import {module}
+duration = time.perf_counter() - t0
+print(json.dumps({{'duration': duration,
+                   'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def run_import(module):
+    out = subprocess.check_output([sys.executable, '-c',
+                                   script.format(module=module, heavy=HEAVY)])
+    return json.loads(out.decode().splitlines()[-1])
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7),
+                    reason='Lazy imports require module level __getattr__')
+@pytest.mark.parametrize('module', ['lightpath', 'lightpath.state',
+                                    'lightpath.cache', 'lightpath.startup',
+                                    'lightpath.remote', 'lightpath.export',
+                                    'lightpath.ui'])
+def test_lightweight_imports(module):
+    result = run_import(module)
+    assert result['loaded'] == []
+    assert result['duration'] < IMPORT_BUDGET
+
+
+def test_lazy_attributes():
+    import lightpath
+    from lightpath.path import BeamPath
+    assert lightpath.BeamPath is BeamPath
+    assert lightpath.path.find_device_state is lightpath.state.find_device_state
+    assert 'LightController' in dir(lightpath)
+    with pytest.raises(AttributeError):
+        lightpath.not_an_attribute
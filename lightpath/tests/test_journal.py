@@ -0,0 +1,112 @@
+import time
+
+from lightpath.cache import StateCache
+from lightpath.journal import (JournalWriter, JournalReplay, read_journal,
+                               StateRecord, ImpedimentRecord,
+                               TransmissionRecord, main)
+from lightpath.path import DeviceState
+
+from .conftest import IPIMB
+
+
+def wait():
+    # Separate the timestamps of consecutive records
+    time.sleep(0.01)
+    t = time.time()
+    time.sleep(0.01)
+    return t
+
+
+def test_journal_roundtrip(path, tmpdir):
+    filename = str(tmpdir.join('lightpath.journal'))
+    t0 = time.time()
+    with JournalWriter(filename) as journal:
+        journal.attach(path)
+        # Device transitions
+        path.path[2].insert()
+        t1 = wait()
+        path.path[2].remove()
+        path.path[4].insert()
+        t2 = wait()
+        # Repeated states are not recorded twice
+        journal.record_state(path.path[4], DeviceState.Inserted)
+        # Subscriptions are removed on close
+    path.path[4].remove()
+    records = list(read_journal(filename))
+    states = [r for r in records if isinstance(r, StateRecord)]
+    assert len(states) == len(path.devices) + 3
+    assert states[-1].device.name == path.path[4].name
+    assert states[-1].state == DeviceState.Inserted
+    impediments = [r for r in records if isinstance(r, ImpedimentRecord)]
+    assert [r.device.name if r.device else None
+            for r in impediments] == [None, path.path[2].name, None,
+                                      path.path[4].name]
+    # Replay each moment in time
+    replay = JournalReplay(filename)
+    assert replay.start >= t0
+    assert replay.impediment_at(path.name, t1).name == path.path[2].name
+    assert replay.impediment_at(path.name, t2).name == path.path[4].name
+    assert replay.impediment_at(path.name, replay.start) is None
+    # Branch destination is reproduced
+    replay.at(t2)
+    assert replay.devices[path.path[4].name].destination == ['SIM']
+    # Before anything was recorded the state is unknown
+    assert replay.at(t0 - 100)[path.name].impediment is not None
+
+
+def test_journal_transmission(path, tmpdir):
+    filename = str(tmpdir.join('lightpath.journal'))
+    cache = StateCache()
+    device = path.path[5]
+    with JournalWriter(filename, cache=cache) as journal:
+        journal.attach(path)
+        device.insert()
+        t1 = wait()
+        # Transmission changes are recorded with the next state change
+        device._transmission = 0.0
+        device.remove()
+        device.insert()
+        t2 = wait()
+        # The journal is handed the states read by the cache
+        assert cache.health(device).reads == 4
+    device.remove()
+    records = [r for r in read_journal(filename)
+               if isinstance(r, TransmissionRecord)
+               and r.device.name == device.name]
+    assert [r.transmission for r in records] == [IPIMB._transmission, 0.0]
+    # Replay follows the transmission of the live device
+    replay = JournalReplay(filename)
+    assert replay.impediment_at(path.name, t1) is None
+    assert replay.impediment_at(path.name, t2).name == device.name
+    assert replay.devices[device.name].transmission == 0.0
+
+
+def test_journal_truncated(path, tmpdir):
+    filename = str(tmpdir.join('lightpath.journal'))
+    journal = JournalWriter(filename)
+    journal.attach(path)
+    path.path[0].insert()
+    journal.close()
+    path.path[0].remove()
+    with open(filename, 'rb') as f:
+        data = f.read()
+    with open(filename, 'wb') as f:
+        f.write(data[:-3])
+    # Last record is dropped
+    records = list(read_journal(filename))
+    assert not isinstance(records[-1], ImpedimentRecord)
+    # Appending starts a new session in the same file
+    with JournalWriter(filename) as journal:
+        journal.attach(path)
+    replay = JournalReplay(filename)
+    assert replay.at(replay.end)[path.name].impediment is None
+
+
+def test_journal_script(path, tmpdir, capsys):
+    filename = str(tmpdir.join('lightpath.journal'))
+    with JournalWriter(filename) as journal:
+        journal.attach(path)
+    main([filename])
+    out = capsys.readouterr().out
+    assert 'TST: impediment None' in out
+    assert 'Removed' in out
@@ -0,0 +1,56 @@
+import pytest
+
+from lightpath.metrics import metrics, Histogram
+from lightpath.path import find_device_state
+
+
+@pytest.fixture(scope='function')
+def enabled():
+    metrics.reset()
+    metrics.enable()
+    yield metrics
+    metrics.disable()
+    metrics.reset()
+
+
+def test_histogram():
+    hist = Histogram(bounds=(1., 10., float('inf')))
+    for value in (0.5, 2., 3., 100.):
+        hist.observe(value)
+    assert hist.count == 4
+    assert hist.sum == 105.5
+    assert hist.cumulative() == [1, 3, 4]
+    assert hist.as_dict()['buckets'] == {'1.0': 1, '10.0': 3, '+Inf': 4}
+
+
+def test_disabled_metrics(path):
+    metrics.reset()
+    path.impediment
+    assert metrics.as_dict() == {}
+
+
+def test_path_metrics(enabled, path):
+    path.impediment
+    assert enabled.count('blocking_devices', 'TST') == 1
+    assert enabled.count('find_device_state') == len(path.devices)
+    assert enabled.histogram('find_device_state', 'zero').count == 1
+    # Device callbacks
+    path.subscribe(lambda *args, **kwargs: None, run=False)
+    path.path[0].insert()
+    assert enabled.count('device_moved', 'TST') == 1
+    # Exports
+    report = enabled.as_dict()
+    assert set(report) == {'blocking_devices', 'find_device_state',
+                           'device_moved'}
+    assert report['blocking_devices']['TST']['count'] == 2
+    assert len(enabled.slowest('find_device_state', count=3)) == 3
+    text = enabled.to_prometheus()
+    assert '# TYPE lightpath_blocking_devices_seconds histogram' in text
+    assert 'lightpath_blocking_devices_seconds_count{name="TST"} 2' in text
+    assert ('lightpath_find_device_state_seconds_bucket'
+            '{name="zero",le="+Inf"} 2') in text
+
+
+def test_device_state_metrics(enabled, device):
+    find_device_state(device)
+    assert enabled.count('find_device_state', 'valve') == 1
@@ -0,0 +1,22 @@
+from lightpath.controller import LightController
+from lightpath.ui import OverviewPanel
+from lightpath.ui.evaluation import evaluate_all
+
+
+def test_overview_lanes(lcls_client):
+    controller = LightController(lcls_client)
+    panel = OverviewPanel(controller)
+    assert set(panel.lanes) == set(controller.beamlines)
+    # Apply an evaluation synchronously
+    path = controller.beamlines['MEC']
+    path.path[0].insert()
+    panel.apply_evaluations(evaluate_all(controller.beamlines.values()))
+    panel.scheduler.flush()
+    lane = panel.lanes['MEC']
+    assert lane.impediment_label.text() == path.path[0].name
+    assert path.path[0] in panel.destinations(panel.evaluations)
+    assert lane.cells[path.path[0]].property('beam') == 'blocked'
+    assert lane.cells[path.path[-1]].property('beam') == 'unlit'
+    path.path[0].remove()
+    panel.clear_subs()
+    panel.evaluator.stop()
@@ -1,8 +1,11 @@
 import io
 
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
+
+import pytest
+
 from lightpath import BeamPath
-from lightpath.path import find_device_state, DeviceState
+from lightpath.path import find_device_state, DeviceState, PathSnapshot
 from .conftest import Crystal, Status
 
 
@@ -124,18 +127,76 @@ def test_show_device(path):
 def test_ignore(path):
     # Ignore only one device
     target, ignore = path._ignore(path.path[4], passive=True)
-    assert ignore == [path.path[4]]
+    assert ignore == {path.path[4]}
     assert path.path[4] not in target
     # Assert we are not ignoring passive devices
     assert path.path[5] in target
 
     # Ignore passive devices in addition
     target, ignore = path._ignore(path.path[3], passive=False)
-    assert ignore == [path.path[5], path.path[3]]
+    assert ignore == {path.path[5], path.path[3]}
     assert path.path[3] not in target
     assert path.path[5] not in target
 
 
+def test_passive_devices(path):
+    assert path.passive_devices == {path.path[5]}
+    # Classification is cached per threshold
+    assert path.passive_devices is path.passive_devices
+    path.minimum_transmission = 0.7
+    assert path.passive_devices == set()
+
+
+def test_plan_clear(path):
+    plan = path.plan_clear(ignore=[path.path[0]])
+    # Ordered upstream to downstream without ignored or passive devices
+    assert plan.targets == tuple(d for d in path.path
+                                 if d not in (path.path[0], path.path[5]))
+    # Plans are reused for identical arguments
+    assert path.plan_clear(ignore=[path.path[0]]) is plan
+    assert path.path[5] in path.plan_clear(passive=True).targets
+
+
+def test_plan_clear_transmission(path):
+    plan = path.plan_clear()
+    passive = path.path[5]
+    passive.insert()
+    assert passive not in plan.diff()
+    # Devices that start to attenuate are no longer ignored
+    passive._transmission = 0.0
+    assert passive in plan.diff()
+    assert path.passive_devices == set()
+    assert path.plan_clear() is not plan
+    assert passive in path.plan_clear().targets
+    # Devices that transmit enough beam again are left alone
+    passive._transmission = 1.0
+    plan = path.plan_clear()
+    assert passive in plan.targets
+    assert passive not in plan.diff()
+    assert passive in path.passive_devices
+    path.clear()
+    assert passive.inserted
+
+
+def test_clear_plan_execution(path):
+    plan = path.plan_clear(ignore=path.path[0])
+    # Nothing is in the way
+    assert plan.diff() == {}
+    # Only obstructing targets are reported
+    path.path[0].insert()
+    path.path[1].insert()
+    path.path[5].insert()
+    assert plan.diff() == {path.path[1]: DeviceState.Inserted}
+    assert plan.dry_run() == [path.path[1]]
+    assert path.path[1].inserted
+    # Only the devices in the way are moved
+    path.path[2].remove = Mock(wraps=path.path[2].remove)
+    assert len(plan.execute()) == 1
+    assert path.path[1].removed
+    assert path.path[0].inserted
+    assert not path.path[2].remove.called
+
+
 def test_clear(path):
     # Insert a variety of devices
     path.path[0].insert()
@@ -176,6 +237,30 @@ def test_split(path):
     assert path.split(z=path.path[4].md.z)[1].path == second.path
 
 
+def test_snapshot_readings(path):
+    readings = dict()
+    path.snapshot(readings=readings)
+    assert set(readings) == set(path.devices)
+    # Devices shared with another path are not read again
+    upstream = path.split(device=path.path[3])[0]
+    with patch.object(PathSnapshot, '_read') as read:
+        snapshot = upstream.snapshot(readings=readings)
+        assert not read.called
+    assert snapshot.states[path.path[0]] == DeviceState.Removed
+
+
+def test_path_threshold(path):
+    other = BeamPath(*path.devices, minimum_transmission=0.7)
+    path.path[5].insert()
+    # Thresholds are held by each path
+    assert path.minimum_transmission == BeamPath.minimum_transmission
+    assert path.impediment is None
+    assert other.impediment == path.path[5]
+    # and passed on to derived paths
+    assert other.split(device=path.path[4])[1].minimum_transmission == 0.7
+    assert other.join(path).minimum_transmission == 0.7
+
+
 def test_callback(path):
     # Create mock callback
     cb = Mock()
@@ -219,6 +304,30 @@ def test_complex_branching(lcls):
     assert bp.blocking_devices == []
 
 
+def test_snapshot(path):
+    path.path[2].insert()
+    path.path[5].insert()
+    snapshot = path.snapshot()
+    path.path[2].remove()
+    # Snapshot is unaffected by later changes
+    assert snapshot.states[path.path[2]] == DeviceState.Inserted
+    assert snapshot.impediment() == path.path[2]
+    with pytest.raises(TypeError):
+        snapshot.states[path.path[2]] = DeviceState.Removed
+    # Thresholds are evaluated without reading the devices again
+    with patch('lightpath.path.find_device_state') as find:
+        assert snapshot.blocking_devices(0.0) == []
+        assert snapshot.impediment(0.5) == path.path[2]
+        assert not find.called
+    # Results are computed once per threshold
+    with patch.object(snapshot, '_find_blocking') as find_blocking:
+        snapshot.blocking_devices(0.0)
+        snapshot.blocking_devices(0.5)
+        assert not find_blocking.called
+        snapshot.blocking_devices(0.7)
+        assert find_blocking.call_count == 1
+
+
 known_table = """\
 +-------+--------+----------+----------+---------+
 | Name  | Prefix | Position | Beamline |   State |
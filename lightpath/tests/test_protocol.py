@@ -0,0 +1,101 @@
+import json
+import socket
+import threading
+
+import pytest
+
+from lightpath.errors import SequenceError
+from lightpath.protocol import DeltaLog, LightState, Subscriber, encode
+
+
+def snapshot(seq):
+    return {'type': 'snapshot', 'seq': seq,
+            'devices': [{'name': 'one', 'state': 'Removed'}],
+            'beamlines': {'TST': {'devices': ['one'], 'impediment': None,
+                                  'incident_devices': []}},
+            'destinations': []}
+
+
+def test_delta_log():
+    log = DeltaLog(size=2)
+    for i in range(3):
+        log.append({'type': 'state'})
+    assert log.seq == 3
+    assert [m['seq'] for m in log.since(1, log.epoch)] == [2, 3]
+    assert log.since(3, log.epoch) == []
+    # Dropped and unknown messages require a snapshot
+    assert log.since(0, log.epoch) is None
+    assert log.since(4, log.epoch) is None
+    # as do messages of another log
+    assert log.since(1, DeltaLog().epoch) is None
+
+
+def test_light_state():
+    state = LightState()
+    with pytest.raises(SequenceError):
+        state.apply({'type': 'state', 'seq': 1, 'device': 'one',
+                     'state': 'Inserted'})
+    state.apply(snapshot(5))
+    state.apply({'type': 'state', 'seq': 6, 'device': 'one',
+                 'state': 'Inserted'})
+    state.apply({'type': 'beamline', 'seq': 7, 'beamline': 'TST',
+                 'impediment': 'one', 'incident_devices': ['one']})
+    state.apply({'type': 'destinations', 'seq': 8, 'destinations': ['one']})
+    assert state.devices['one']['state'] == 'Inserted'
+    assert state.beamlines['TST']['impediment'] == 'one'
+    assert state.destinations == ['one']
+    # Gaps are detected
+    with pytest.raises(SequenceError):
+        state.apply({'type': 'destinations', 'seq': 10,
+                     'destinations': []})
+    assert state.seq == 8
+
+
+def test_subscriber_malformed_message():
+    listener = socket.socket()
+    listener.bind(('localhost', 0))
+    listener.listen()
+    requests = list()
+    replies = [[dict(snapshot(5), epoch='first'), b'{"type": "sta\n'],
+               [{'type': 'state', 'seq': 6, 'device': 'one',
+                 'state': 'Inserted'}]]
+
+    def serve():
+        connections = list()
+        for messages in replies:
+            conn, addr = listener.accept()
+            connections.append(conn)
+            requests.append(json.loads(conn.makefile('rb').readline()))
+            for message in messages:
+                if isinstance(message, dict):
+                    message = encode(message)
+                conn.sendall(message)
+        for conn in connections:
+            conn.close()
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    subscriber = Subscriber(port=listener.getsockname()[1])
+    stop = threading.Event()
+    applied = list()
+
+    def callback(message):
+        applied.append(message['seq'])
+        if message['seq'] == 6:
+            stop.set()
+        # Errors in the callback do not interrupt the stream
+        raise RuntimeError("Callback failure")
+
+    follower = threading.Thread(target=subscriber.follow,
+                                kwargs={'callback': callback, 'retry': 0.01,
+                                        'stop': stop})
+    follower.start()
+    follower.join(timeout=5)
+    thread.join(timeout=5)
+    listener.close()
+    assert not follower.is_alive()
+    assert applied == [5, 6]
+    # The stream resumed from the last applied message
+    assert requests[1]['seq'] == 5
+    assert requests[1]['epoch'] == 'first'
+    assert subscriber.state.devices['one']['state'] == 'Inserted'
@@ -0,0 +1,70 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from lightpath.path import find_device_state, DeviceState
+from lightpath.remote import RemoteController
+from lightpath.server import PathModel, LightServer
+
+
+@pytest.fixture(scope='function')
+def model(path):
+    model = PathModel(SimpleNamespace(beamlines={path.name: path}))
+    yield model
+    model.close()
+
+
+def wait_for(condition, timeout=2.0):
+    t0 = time.time()
+    while not condition():
+        if time.time() - t0 > timeout:
+            raise TimeoutError("Condition not met")
+        time.sleep(0.01)
+
+
+def test_remote_controller(model, path):
+    remote = RemoteController(model.snapshot())
+    rpath = remote.beamlines[path.name]
+    assert [d.name for d in rpath.path] == [d.name for d in path.path]
+    assert rpath.range == path.range
+    assert [d.name for d in rpath.branches] == [d.name for d in path.branches]
+    assert rpath.impediment is None
+    # Messages drive the subscriptions of devices and paths
+    states, changes = list(), list()
+    rpath.path[2].subscribe(lambda *args, obj, **kwargs:
+                            states.append(find_device_state(obj)),
+                            run=False)
+    rpath.subscribe(lambda *args, **kwargs: changes.append(kwargs['device']),
+                    run=False)
+    model.listen(remote.apply)
+    path.path[2].insert()
+    assert rpath.impediment is rpath.path[2]
+    assert changes == [rpath.path[2]]
+    assert states == [find_device_state(path.path[2])]
+    assert [d.name for d in remote.destinations] == [path.path[2].name]
+    assert remote.incident_devices == [rpath.path[2]]
+    # Remote devices are read-only
+    assert not hasattr(rpath.path[2], 'insert')
+    # Snapshots report the impediment of the daemon for any threshold
+    snapshot = rpath.snapshot()
+    assert snapshot.impediment(0.0) is rpath.path[2]
+    assert snapshot.states[rpath.path[2]] == DeviceState.Inserted
+    path.path[2].remove()
+    assert rpath.impediment is None
+    assert snapshot.impediment() is rpath.path[2]
+
+
+def test_remote_connect(model, path):
+    server = LightServer(model, port=0)
+    server.start()
+    remote = RemoteController.connect(port=server.port)
+    try:
+        rpath = remote.beamlines[path.name]
+        path.path[2].insert()
+        wait_for(lambda: rpath.impediment is rpath.path[2])
+        path.path[2].remove()
+        wait_for(lambda: rpath.impediment is None)
+    finally:
+        remote.close()
+        server.stop()
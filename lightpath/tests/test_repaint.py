@@ -0,0 +1,33 @@
+from unittest.mock import Mock
+
+import lightpath.ui
+from lightpath.ui.repaint import RepaintScheduler
+
+
+def test_repaint_batching():
+    scheduler = RepaintScheduler(interval=10.)
+    calls = list()
+    for i in range(100):
+        scheduler.schedule('row', lambda i=i: calls.append(i))
+    scheduler.schedule('other', lambda: calls.append('other'))
+    assert len(scheduler) == 2
+    assert calls == []
+    # Only the latest change of each key is applied
+    scheduler.flush()
+    assert sorted(calls, key=str) == [99, 'other']
+    assert scheduler.frames == 1
+    # Empty frames are not counted
+    scheduler.flush()
+    assert scheduler.frames == 1
+
+
+def test_row_scheduling(path):
+    scheduler = RepaintScheduler(interval=10.)
+    row = lightpath.ui.LightRow(path.path[3], scheduler=scheduler)
+    setattr(row.state_label, 'setText', Mock())
+    for i in range(10):
+        row.device.insert()
+        row.device.remove()
+    assert not row.state_label.setText.called
+    scheduler.flush()
+    row.state_label.setText.assert_called_once_with('Removed')
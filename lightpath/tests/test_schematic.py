@@ -0,0 +1,30 @@
+from lightpath.controller import LightController
+from lightpath.ui import SchematicView
+from lightpath.ui.evaluation import evaluate_all
+
+
+def test_schematic(lcls_client):
+    controller = LightController(lcls_client)
+    view = SchematicView(controller)
+    schematic = view.schematic
+    # Devices shared by beamlines are only drawn once
+    assert set(schematic.markers) == set(controller.devices)
+    assert set(schematic.lanes) == set(device.md.beamline
+                                       for device in controller.devices)
+    # Initial evaluation styles every item
+    evaluations = evaluate_all(controller.beamlines.values())
+    schematic.apply_evaluations(evaluations)
+    lit = schematic.lit_segments(evaluations)
+    # Only changed items are restyled
+    assert schematic.apply_evaluations(evaluations) == 0
+    path = controller.beamlines['MEC']
+    path.path[0].insert()
+    evaluations = evaluate_all(controller.beamlines.values())
+    # Segments downstream of the first device go dark
+    dark = lit - schematic.lit_segments(evaluations)
+    assert (path.path[0], path.path[1]) in dark
+    # along with the marker of the inserted device
+    assert schematic.apply_evaluations(evaluations) == len(dark) + 1
+    path.path[0].remove()
+    view.clear_subs()
+    view.evaluator.stop()
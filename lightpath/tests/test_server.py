@@ -0,0 +1,173 @@
+import json
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from lightpath.protocol import Subscriber
+from lightpath.server import PathModel, LightServer, request, _Handler
+
+
+@pytest.fixture(scope='function')
+def server(path):
+    model = PathModel(SimpleNamespace(beamlines={path.name: path}))
+    server = LightServer(model, port=0)
+    server.start()
+    yield server
+    server.stop()
+    model.close()
+
+
+def test_path_model(path):
+    model = PathModel(SimpleNamespace(beamlines={path.name: path}))
+    assert model.impediments == {path.name: None}
+    assert model.destinations == []
+    assert [d['name'] for d in model.devices] == [d.name for d in path.path]
+    # Model follows device changes
+    path.path[2].insert()
+    assert model.impediments == {path.name: path.path[2].name}
+    assert model.destinations == [path.path[2].name]
+    assert model.incident_devices == {path.name: [path.path[2].name]}
+    assert model.devices[2]['state'] == 'Inserted'
+    path.path[2].remove()
+    assert model.impediments == {path.name: None}
+    # Subscriptions are removed on close
+    model.close()
+    path.path[2].insert()
+    assert model.impediments == {path.name: None}
+    path.path[2].remove()
+
+
+def test_server_requests(server, path):
+    snapshot = request('snapshot', port=server.port)
+    assert snapshot['beamlines'][path.name]['impediment'] is None
+    assert snapshot['beamlines'][path.name]['devices'] == [d.name for d
+                                                           in path.path]
+    path.path[4].insert()
+    assert request('impediments', port=server.port) == {
+        'impediments': {path.name: path.path[4].name}}
+    # Branching devices are not destinations
+    assert request('destinations', port=server.port) == {'destinations': []}
+    path.path[4].remove()
+    with pytest.raises(ValueError):
+        request('nonsense', port=server.port)
+
+
+def test_model_deltas(path):
+    model = PathModel(SimpleNamespace(beamlines={path.name: path}))
+    messages = list()
+    backlog = model.listen(messages.append)
+    assert backlog[0]['type'] == 'snapshot'
+    assert backlog[0]['seq'] == 0
+    path.path[2].insert()
+    assert [m['type'] for m in messages] == ['state', 'beamline',
+                                             'destinations']
+    assert [m['seq'] for m in messages] == [1, 2, 3]
+    # Resuming only replays missed messages
+    assert model.listen(list().append, seq=1,
+                        epoch=backlog[0]['epoch']) == messages[1:]
+    # Sequence numbers of another model are not resumed
+    other = model.listen(list().append, seq=1, epoch='other')
+    assert [m['type'] for m in other] == ['snapshot']
+    model.unlisten(messages.append)
+    path.path[2].remove()
+    assert len(messages) == 3
+    model.close()
+
+
+def test_server_subscription(server, path):
+    subscriber = Subscriber(port=server.port)
+    assert subscriber.receive()['type'] == 'snapshot'
+    path.path[2].insert()
+    assert subscriber.receive()['type'] == 'state'
+    subscriber.receive()
+    subscriber.receive()
+    assert subscriber.state.devices[path.path[2].name]['state'] == 'Inserted'
+    assert subscriber.state.beamlines[path.name]['impediment'] \
+        == path.path[2].name
+    assert subscriber.state.destinations == [path.path[2].name]
+    # Changes while disconnected are replayed on resume
+    subscriber.close()
+    path.path[2].remove()
+    assert subscriber.receive()['seq'] == 4
+    for i in range(2):
+        subscriber.receive()
+    assert subscriber.state.beamlines[path.name]['impediment'] is None
+    assert subscriber.state.destinations == []
+    subscriber.close()
+
+
+def test_server_restart(path):
+    model = PathModel(SimpleNamespace(beamlines={path.name: path}))
+    server = LightServer(model, port=0)
+    server.start()
+    port = server.port
+    subscriber = Subscriber(port=port)
+    subscriber.receive()
+    path.path[2].insert()
+    for i in range(3):
+        subscriber.receive()
+    subscriber.close()
+    server.stop()
+    model.close()
+    # A restarted daemon issues the same sequence numbers again
+    model = PathModel(SimpleNamespace(beamlines={path.name: path}))
+    path.path[2].remove()
+    path.path[4].insert()
+    server = LightServer(model, port=port)
+    server.start()
+    try:
+        assert model.deltas.seq > subscriber.state.seq
+        # The subscriber is sent a new snapshot instead of the deltas
+        assert subscriber.receive()['type'] == 'snapshot'
+        assert subscriber.state.epoch == model.deltas.epoch
+        assert subscriber.state.beamlines[path.name]['impediment'] \
+            == path.path[4].name
+    finally:
+        subscriber.close()
+        server.stop()
+        model.close()
+        path.path[4].remove()
+
+
+class SlowClient:
+    """
+    Stand-in for the socket of a client that stalls on its first message
+    """
+    def __init__(self, stopped):
+        self.stopped = stopped
+        self.writing = threading.Event()
+        self.release = threading.Event()
+        self.messages = list()
+
+    def write(self, data):
+        self.writing.set()
+        self.release.wait(5)
+        self.messages.append(json.loads(data.decode()))
+        if len(self.messages) > 1 and self.messages[-1]['type'] == 'snapshot':
+            self.stopped.set()
+
+
+def test_server_slow_subscriber(path):
+    model = PathModel(SimpleNamespace(beamlines={path.name: path}))
+    handler = _Handler.__new__(_Handler)
+    handler.client_address = ('localhost', 0)
+    handler.server = SimpleNamespace(model=model, max_queued=2,
+                                     stopped=threading.Event())
+    handler.wfile = SlowClient(handler.server.stopped)
+    thread = threading.Thread(target=handler.stream)
+    thread.start()
+    # Fill the queue while the client is stuck on the first snapshot
+    assert handler.wfile.writing.wait(5)
+    for i in range(3):
+        path.path[2].insert()
+        path.path[2].remove()
+    handler.wfile.release.set()
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+    # The missed messages are replaced by a new snapshot
+    first, second = handler.wfile.messages
+    assert first['type'] == second['type'] == 'snapshot'
+    assert second['seq'] == model.deltas.seq
+    assert model._listeners == []
+    model.close()
@@ -0,0 +1,29 @@
+import json
+
+from lightpath.startup import StartupProfile
+
+
+def test_startup_profile(path, tmpdir):
+    profile = StartupProfile()
+    with profile.phase('evaluate'):
+        path.impediment
+    profile.add_phase('imports', 1.5)
+    assert [name for name, _ in profile.phases] == ['evaluate', 'imports']
+    # Device timings
+    profile.time_devices('connect', path.path, lambda d: d.inserted)
+    profile.record_device('zero', 'load', 10.)
+    assert set(profile.devices) == set(d.name for d in path.devices)
+    assert profile.slowest_devices(count=1) == [('zero', 10. + profile.devices
+                                                 ['zero']['connect'])]
+    # Failures are still recorded
+    del path.path[1].status
+    profile.time_devices('read', path.path[1:2], lambda d: d.status)
+    assert 'read' in profile.devices['one']
+    # Report
+    filename = str(tmpdir.join('startup.json'))
+    profile.write(filename)
+    with open(filename, 'r') as f:
+        report = json.load(f)
+    assert report['phases'][1] == {'name': 'imports', 'duration': 1.5}
+    assert report['slowest'][0]['name'] == 'zero'
+    assert 'imports' in profile.summary()
@@ -3,6 +3,8 @@ from unittest.mock import Mock
 import pytest
 
 import lightpath.ui
+from lightpath.cache import StateCache
+from lightpath.path import DeviceState
 
 
 @pytest.fixture(scope='function')
@@ -20,3 +22,33 @@ def test_widget_updates(lightrow):
     lightrow.device.insert()
     # Check that callbacks have been called
     assert lightrow.state_label.setText.called
+
+
+def test_widget_shared_state(path):
+    cache = StateCache()
+    row = lightpath.ui.LightRow(path.path[3], cache=cache)
+    setattr(row.state_label, 'setText', Mock())
+    cache.set(row.device, DeviceState.Inserted)
+    # State is taken from the cache rather than the device
+    row.update_state()
+    row.state_label.setText.assert_called_once_with('Inserted')
+    assert row.state_label.property('state_style') == 'Inserted'
+    assert not row.insert_button.isEnabled()
+    # Unchanged states do not touch the widgets
+    row.update_state()
+    assert row.state_label.setText.call_count == 1
+
+
+def test_widget_cache_notification(path):
+    cache = StateCache()
+    device = path.path[3]
+    row = lightpath.ui.LightRow(device, cache=cache)
+    # The row is given the state read by the cache
+    device.insert()
+    assert row.state == DeviceState.Inserted
+    assert cache.health(device).reads == 1
+    # No stylesheet is parsed for the row itself
+    assert row.state_label.styleSheet() == ''
+    row.clear_sub()
+    device.remove()
+    assert row.state == DeviceState.Inserted
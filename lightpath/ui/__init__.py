@@ -1,2 +1,25 @@
-from .widgets import LightRow  # noqa
-from .gui import LightApp  # noqa
+import sys
+
+# PyDM and Qt are only imported once the widgets are requested
+_lazy = {'LightRow': '.widgets', 'LightApp': '.gui',
+         'DeviceTableModel': '.model', 'PathView': '.model',
+         'OverviewPanel': '.overview', 'SchematicView': '.schematic'}
+
+
+def __getattr__(name):
+    if name not in _lazy:
+        raise AttributeError("module {!r} has no attribute {!r}"
+                             "".format(__name__, name))
+    import importlib
+    value = getattr(importlib.import_module(_lazy[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+# Module level __getattr__ is only available from Python 3.7
+if sys.version_info < (3, 7):
+    from .widgets import LightRow  # noqa
+    from .model import DeviceTableModel, PathView  # noqa
+    from .gui import LightApp  # noqa
+    from .overview import OverviewPanel  # noqa
+    from .schematic import SchematicView  # noqa
@@ -0,0 +1,193 @@
+"""
+Evaluating a :class:`.BeamPath` may require a synchronous read of every
+device along it. The :class:`.PathEvaluator` performs these evaluations in a
+worker thread and posts each immutable :class:`.PathEvaluation` back to the
+GUI thread through a queued signal, so that the interface never waits on
+EPICS. Requests that arrive while an evaluation is running are collapsed into
+a single follow-up evaluation.
+"""
+import logging
+import threading
+from collections import namedtuple
+
+from pydm.PyQt.QtCore import QObject, pyqtSignal
+
+logger = logging.getLogger(__name__)
+
+
+PathEvaluation = namedtuple('PathEvaluation', ('path', 'impediment',
+                                               'states', 'snapshot',
+                                               'minimum_transmission'))
+PathEvaluation.__doc__ = """
+Result of evaluating a path at a single moment
+
+Attributes
+----------
+path : :class:`.BeamPath`
+    Path that was evaluated
+
+impediment : device or None
+    First device blocking the beam
+
+states : mapping
+    Read-only mapping of each device of the path to its
+    :class:`.DeviceState`
+
+snapshot : :class:`.PathSnapshot`
+    Captured device information, used to evaluate other thresholds
+
+minimum_transmission : float
+    Threshold the impediment was found for
+"""
+
+
+def evaluate(path, minimum_transmission=None):
+    """
+    Evaluate a path synchronously
+
+    Parameters
+    ----------
+    path : :class:`.BeamPath`
+
+    minimum_transmission : float, optional
+        By default, the :attr:`.BeamPath.minimum_transmission` of the path
+
+    Returns
+    -------
+    evaluation : :class:`.PathEvaluation`
+    """
+    if minimum_transmission is None:
+        minimum_transmission = path.minimum_transmission
+    snapshot = path.snapshot()
+    return PathEvaluation(path, snapshot.impediment(minimum_transmission),
+                          snapshot.states, snapshot, minimum_transmission)
+
+
+def evaluate_all(paths, minimum_transmission=None):
+    """
+    Evaluate several paths from a single set of device reads
+
+    Devices shared by several paths, such as the common upstream section of
+    the beamlines, are only read once
+
+    Parameters
+    ----------
+    paths : iterable
+        :class:`.BeamPath` objects to evaluate
+
+    minimum_transmission : float, optional
+        By default, the :attr:`.BeamPath.minimum_transmission` of each path
+
+    Returns
+    -------
+    evaluations : dict
+        :class:`.PathEvaluation` of each path keyed by the name of the path
+    """
+    readings = dict()
+    evaluations = dict()
+    for path in paths:
+        threshold = minimum_transmission
+        if threshold is None:
+            threshold = path.minimum_transmission
+        snapshot = path.snapshot(readings=readings)
+        evaluations[path.name] = PathEvaluation(path,
+                                                snapshot.impediment(threshold),
+                                                snapshot.states, snapshot,
+                                                threshold)
+    return evaluations
+
+
+def reevaluate(evaluation, minimum_transmission):
+    """
+    Evaluate a previous result for a new threshold without reading devices
+
+    Parameters
+    ----------
+    evaluation : :class:`.PathEvaluation`
+
+    minimum_transmission : float
+
+    Returns
+    -------
+    evaluation : :class:`.PathEvaluation`
+    """
+    snapshot = evaluation.snapshot
+    return evaluation._replace(
+                impediment=snapshot.impediment(minimum_transmission),
+                minimum_transmission=minimum_transmission)
+
+
+class PathEvaluator(QObject):
+    """
+    Evaluate paths in a worker thread
+
+    Attributes
+    ----------
+    requests : int
+        Number of evaluations requested
+
+    evaluations : int
+        Number of evaluations performed
+
+    evaluated : pyqtSignal
+        Emitted with each :class:`.PathEvaluation`. Connected slots of
+        objects living in the GUI thread are run there
+    """
+    evaluated = pyqtSignal(object)
+    # Function run by the worker thread for each request
+    evaluate = staticmethod(evaluate)
+
+    def __init__(self, parent=None):
+        super().__init__(parent=parent)
+        self.requests = 0
+        self.evaluations = 0
+        self._pending = None
+        self._stopped = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True,
+                                        name='lightpath-evaluator')
+        self._thread.start()
+
+    def request(self, path, minimum_transmission=None):
+        """
+        Schedule the evaluation of a path
+
+        Returns immediately. If an evaluation is already pending, it is
+        replaced so that only the most recent request is evaluated
+
+        Parameters
+        ----------
+        path : :class:`.BeamPath`
+
+        minimum_transmission : float, optional
+            By default, the :attr:`.BeamPath.minimum_transmission` of the path
+        """
+        with self._condition:
+            self.requests += 1
+            self._pending = (path, minimum_transmission)
+            self._condition.notify()
+
+    def stop(self):
+        """
+        Stop the worker thread once the current evaluation is finished
+        """
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None and not self._stopped:
+                    self._condition.wait()
+                if self._stopped:
+                    return
+                (path, threshold), self._pending = self._pending, None
+            try:
+                result = self.evaluate(path, minimum_transmission=threshold)
+            except Exception:
+                logger.exception("Unable to evaluate %r", path)
+                continue
+            self.evaluations += 1
+            self.evaluated.emit(result)
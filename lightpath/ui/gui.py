@@ -7,11 +7,15 @@ import os.path
 from functools import partial
 
 from pydm import Display
-from pydm.PyQt.QtCore import pyqtSlot, Qt
+from pydm.PyQt.QtCore import pyqtSlot, Qt, QTimer
 from pydm.PyQt.QtGui import QSpacerItem, QGridLayout
 
 
+from .model import DeviceTableModel, PathView
+from .evaluation import PathEvaluator, reevaluate
+from .repaint import RepaintScheduler
 from .widgets import LightRow
+from ..remote import RemoteController
 
 logger = logging.getLogger(__name__)
 
@@ -26,7 +30,8 @@ class LightApp(Display):
     Parameters
     ----------
     controller: LightController
-        LightController object
+        LightController object, or a :class:`.RemoteController` to display
+        the state served by the lightpath daemon
 
     beamline : str, optional
         Beamline to initialize the application with, otherwise the most
@@ -35,21 +40,64 @@ class LightApp(Display):
     dark : bool, optional
         Load the UI with the `qdarkstyle` interface
 
+    virtualized : bool, optional
+        Show the devices in a :class:`.PathView` that only renders the
+        visible rows, instead of a :class:`.LightRow` for every device.
+        Recommended for paths of hundreds of devices
+
+    repaint_interval : float, optional
+        Minimum number of seconds between repaints of the display. Changes
+        that arrive in between are applied together
+
     parent : optional
+
+    Attributes
+    ----------
+    minimum_transmission : float
+        Transmission threshold the displayed path is evaluated with
     """
+    # Seconds between re-evaluations while the transmission slider is dragged
+    slider_interval = 0.05
 
     def __init__(self, controller, beamline=None,
-                 parent=None, dark=True):
+                 parent=None, dark=True, virtualized=False,
+                 repaint_interval=1/30.):
         super().__init__(parent=parent)
         # Store Lightpath information
         self.light = controller
         self.path = None
         self._lock = threading.Lock()
+        self.scheduler = RepaintScheduler(interval=repaint_interval,
+                                          parent=self)
         # Create empty layout
         self.lightLayout = QGridLayout()
         self.lightLayout.setVerticalSpacing(1)
         self.lightLayout.setHorizontalSpacing(10)
         self.widget_rows.setLayout(self.lightLayout)
+        # Colors of the state labels of every row, parsed once
+        self.widget_rows.setStyleSheet(LightRow.stylesheet)
+        # The table view scrolls itself, replacing the scroll area of rows
+        if virtualized:
+            self.model = DeviceTableModel(parent=self)
+            self.view = PathView(self.model, parent=self)
+            self.scroll.hide()
+            self.app_layout.addWidget(self.view)
+        else:
+            self.model = None
+            self.view = None
+
+        # Paths are evaluated off of the GUI thread
+        self.evaluator = PathEvaluator(parent=self)
+        self.evaluator.evaluated.connect(self.apply_evaluation,
+                                         Qt.QueuedConnection)
+        self._evaluation = None
+        # Threshold of this display, the shared paths are left untouched
+        self.minimum_transmission = self.transmission_slider.value()/100.
+        # Slider movements are applied at most once per interval
+        self._threshold_timer = QTimer(self)
+        self._threshold_timer.setSingleShot(True)
+        self._threshold_timer.setInterval(int(self.slider_interval * 1000))
+        self._threshold_timer.timeout.connect(self.apply_threshold)
 
         # Add destinations
         for line in self.destinations():
@@ -61,8 +109,14 @@ class LightApp(Display):
         self.upstream_check.clicked.connect(self.change_path_display)
         self.transmission_slider.valueChanged.connect(
                                           self.transmission_adjusted)
+        # Remote paths are evaluated by the daemon at its own threshold
+        if isinstance(controller, RemoteController):
+            self.transmission_slider.setEnabled(False)
         # Store LightRow objects to manage subscriptions
         self.rows = list()
+        # Displayed rows keyed by device and their position in the grid
+        self._pool = dict()
+        self._positions = dict()
         # Select the beamline to begin with
         beamline = beamline or self.destinations()[0]
         try:
@@ -96,7 +150,8 @@ class LightApp(Display):
         """
         Create LightRow for device
         """
-        return LightRow(device, parent=self.widget_rows)
+        return LightRow(device, parent=self.widget_rows,
+                        scheduler=self.scheduler, cache=self.path.cache)
 
     def select_devices(self, beamline, upstream=True):
         """
@@ -165,60 +220,114 @@ class LightApp(Display):
     @pyqtSlot(int)
     def transmission_adjusted(self, value):
         """
-        Adjust the :attr:`.BeamPath.minimum_transmission`
+        Adjust the :attr:`.minimum_transmission` of the display
+
+        The displayed path itself is not modified, so other consumers of the
+        path keep their own threshold. The display is updated by
+        :meth:`.apply_threshold` once per :attr:`.slider_interval`, however
+        quickly the slider is moved
         """
         logger.debug("Adjusted minimum transmission to %s percent", value)
-        self.path.minimum_transmission = value/100.
-        self.update_path()
+        self.minimum_transmission = value/100.
+        if not self._threshold_timer.isActive():
+            self._threshold_timer.start()
+
+    @pyqtSlot()
+    def apply_threshold(self):
+        """
+        Show the path for the current transmission threshold
+
+        The last evaluation of the displayed path is evaluated again in
+        memory, without reading any device. A full evaluation is only
+        requested if the displayed path has not been evaluated yet
+        """
+        evaluation = self._evaluation
+        if evaluation is not None and evaluation.path is self.path:
+            self.apply_evaluation(
+                    reevaluate(evaluation, self.minimum_transmission))
+        else:
+            self.update_path()
 
     @pyqtSlot()
     @pyqtSlot(bool)
     def change_path_display(self, value=None):
         """
         Change the display devices based on the state of the control buttons
+
+        Rows are kept in a pool keyed by device. Devices that remain in the
+        display keep their existing :class:`.LightRow` and subscriptions, only
+        rows that are new, no longer needed or have moved position are touched
         """
         with self._lock:
             logger.debug("Resorting beampath display ...")
-            # Grab all the light rows
-            rows = [self.load_device_row(d)
-                    for d in self.select_devices(self.selected_beamline(),
-                                                 upstream=self.upstream())]
-            # Clear layout if previously loaded rows exist
-            if self.rows:
-                # Clear our subscribtions
-                for row in self.rows:
-                    row.clear_sub()
-                # Clear the widgets
-                for i in reversed(range(self.lightLayout.count())):
-                    old = self.lightLayout.takeAt(i).widget()
-                    if old:
-                        old.deleteLater()
-                # Clear subscribed row cache
-                self.rows.clear()
-
-            # Add all the widgets to the display
-            for i, row in enumerate(rows):
-                # Cache row to later clear subscriptions
-                self.rows.append(row)
-                # Connect up remove button
-                if hasattr(row, 'remove_button'):
-                    row.remove_button.clicked.connect(
+            devices = self.select_devices(self.selected_beamline(),
+                                          upstream=self.upstream())
+            if self.model is not None:
+                self.model.set_devices(devices, cache=self.path.cache)
+                devices = list()
+            wanted = set(devices)
+            # Tear down rows that are no longer displayed
+            for device in [d for d in self._pool if d not in wanted]:
+                row = self._pool.pop(device)
+                row.clear_sub()
+                self._take_row(row)
+                for widget in row.widgets:
+                    if not isinstance(widget, QSpacerItem):
+                        widget.deleteLater()
+                self._positions.pop(device, None)
+            # Create rows for devices that were not already displayed
+            added = list()
+            for device in devices:
+                if device not in self._pool:
+                    row = self.load_device_row(device)
+                    # Connect up remove button
+                    if hasattr(row, 'remove_button'):
+                        row.remove_button.clicked.connect(
                                     partial(self.remove, device=row.device))
-                # Connect up insert button
-                if hasattr(row, 'insert_button'):
-                    row.insert_button.clicked.connect(
+                    # Connect up insert button
+                    if hasattr(row, 'insert_button'):
+                        row.insert_button.clicked.connect(
                                     partial(self.insert, device=row.device))
-                # Add widgets to layout
-                for j, widget in enumerate(row.widgets):
-                    if isinstance(widget, QSpacerItem):
-                        self.lightLayout.addItem(widget, i, j)
-                    else:
-                        self.lightLayout.addWidget(widget, i, j)
-        # Initialize interface
-        for row in self.rows:
+                    self._pool[device] = row
+                    added.append(row)
+            # Only move rows whose position has changed
+            moved = [(i, self._pool[device])
+                     for i, device in enumerate(devices)
+                     if self._positions.get(device) != i]
+            for i, row in moved:
+                if row.device in self._positions:
+                    self._take_row(row)
+            for i, row in moved:
+                self._place_row(row, i)
+                self._positions[row.device] = i
+            self.rows = [self._pool[device] for device in devices]
+            logger.debug("Added %s rows and moved %s rows",
+                         len(added), len(moved) - len(added))
+        # Initialize new rows
+        for row in added:
             row.update_state()
         # Update display
-        self.transmission_adjusted(self.transmission_slider.value())
+        self.update_path()
+
+    def _place_row(self, row, i):
+        """
+        Add the widgets of a row to the grid at a given row index
+        """
+        for j, widget in enumerate(row.widgets):
+            if isinstance(widget, QSpacerItem):
+                self.lightLayout.addItem(widget, i, j)
+            else:
+                self.lightLayout.addWidget(widget, i, j)
+
+    def _take_row(self, row):
+        """
+        Remove the widgets of a row from the grid without deleting them
+        """
+        for widget in row.widgets:
+            if isinstance(widget, QSpacerItem):
+                self.lightLayout.removeItem(widget)
+            else:
+                self.lightLayout.removeWidget(widget)
 
     def ui_filename(self):
         """
@@ -234,20 +343,62 @@ class LightApp(Display):
                             self.ui_filename())
 
     def update_path(self, *args,  **kwargs):
+        """
+        Request a new evaluation of the displayed path
+
+        Safe to call from any thread, returns immediately. The display is
+        updated by :meth:`.apply_evaluation` once the evaluation is complete
+        """
+        path = self.path
+        if path is not None:
+            self.evaluator.request(
+                    path, minimum_transmission=self.minimum_transmission)
+
+    @pyqtSlot(object)
+    def apply_evaluation(self, evaluation):
         """
         Update the PyDMRectangles to show devices as in the beam or not
+
+        Parameters
+        ----------
+        evaluation : :class:`.PathEvaluation`
         """
         with self._lock:
-            block = self.path.impediment
-            for row in self.rows:
-                # If our device is before or at the impediment, it is lit
-                if not block or (row.device.md.z <= block.md.z):
-                    row.indicator._default_color = Qt.cyan
-                # Otherwise, it is off
-                else:
-                    row.indicator._default_color = Qt.gray
-                # Update widget display
-                row.indicator.update()
+            # Discard results for paths no longer displayed
+            if evaluation.path is not self.path:
+                return
+            self._evaluation = evaluation
+            block = evaluation.impediment
+            if self.model is not None:
+                self.model.set_impediment(block)
+            self.scheduler.schedule('indicators',
+                                    partial(self.paint_indicators, block))
+
+    def paint_indicators(self, block):
+        """
+        Light the indicators of every row up to the impediment
+
+        Parameters
+        ----------
+        block : device or None
+            Impediment of the path
+        """
+        for row in self.rows:
+            # If our device is before or at the impediment, it is lit
+            if not block or (row.device.md.z <= block.md.z):
+                row.indicator._default_color = Qt.cyan
+            # Otherwise, it is off
+            else:
+                row.indicator._default_color = Qt.gray
+            # Update widget display
+            row.indicator.update()
+
+    def closeEvent(self, event):
+        """
+        Stop the evaluation thread with the window
+        """
+        self.evaluator.stop()
+        super().closeEvent(event)
 
     def clear_subs(self):
         """
@@ -0,0 +1,256 @@
+"""
+Model/view display of a :class:`.BeamPath`
+
+The :class:`.LightRow` display creates a full set of widgets for every device,
+which becomes expensive when showing hundreds of devices. The
+:class:`.DeviceTableModel` instead presents the ordered devices of a path as a
+Qt item model that the :class:`.PathView` renders on demand, so that only the
+rows currently visible are ever painted. The insert and remove buttons are
+drawn by the :class:`.ButtonDelegate` rather than created as widgets.
+"""
+import math
+import logging
+
+from pydm.PyQt.QtCore import (Qt, QAbstractTableModel, QModelIndex, QEvent,
+                              QRect, pyqtSignal, pyqtSlot)
+from pydm.PyQt.QtGui import (QColor, QTableView, QHeaderView, QStyle,
+                             QStyledItemDelegate, QStyleOptionButton,
+                             QAbstractItemView, QApplication)
+
+from ..state import DeviceState, find_device_state
+
+logger = logging.getLogger(__name__)
+
+
+class DeviceTableModel(QAbstractTableModel):
+    """
+    Item model over the ordered devices of a path
+
+    Each device is a row, with a column for the beam indicator, name, prefix,
+    state and buttons. The model subscribes to the state of each device once,
+    and only signals the views that the affected row has changed
+
+    Parameters
+    ----------
+    parent : QObject, optional
+    """
+    Indicator, Name, Prefix, State, Buttons = range(5)
+    headers = ('', 'Name', 'Prefix', 'State', '')
+    # Colors used for the state of each device and the beam
+    colors = {DeviceState.Removed: QColor(124, 252, 0),
+              DeviceState.Unknown: QColor(255, 215, 0)}
+    error_color = QColor(Qt.red)
+    lit_color = QColor(Qt.cyan)
+    unlit_color = QColor(Qt.gray)
+    # Emitted from any thread, handled in the thread of the model
+    state_received = pyqtSignal(object)
+    impediment_received = pyqtSignal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent=parent)
+        self.devices = list()
+        self.states = dict()
+        self.cache = None
+        self._rows = dict()
+        self._block = math.inf
+        self.state_received.connect(self._state_received)
+        self.impediment_received.connect(self._impediment_received)
+
+    def set_devices(self, devices, cache=None):
+        """
+        Display a new set of devices
+
+        Parameters
+        ----------
+        devices : list
+            Devices ordered as they should appear
+
+        cache : :class:`.StateCache`, optional
+            Cache to read device states from. The model is then notified of
+            state changes by the cache, once the new state has been stored
+        """
+        self.beginResetModel()
+        self.clear_subs()
+        self.devices = list(devices)
+        self.cache = cache
+        self._rows = dict((device, i) for i, device in enumerate(devices))
+        for device in self.devices:
+            self.states[device] = find_device_state(device, cache=cache)
+            if cache is not None:
+                cache.subscribe(device, self._device_changed)
+                continue
+            try:
+                device.subscribe(self._device_changed,
+                                 event_type=device.SUB_STATE, run=False)
+            except Exception:
+                logger.error("Model is unable to subscribe to device %s",
+                             device.name)
+        self.endResetModel()
+
+    def set_impediment(self, impediment):
+        """
+        Light every device up to and including the impediment
+
+        May be called from any thread
+
+        Parameters
+        ----------
+        impediment : device or None
+        """
+        self.impediment_received.emit(impediment)
+
+    def is_lit(self, device):
+        """
+        Whether the beam reaches a device
+        """
+        return device.md.z <= self._block
+
+    def clear_subs(self):
+        """
+        Remove the subscriptions to all displayed devices
+        """
+        for device in self.devices:
+            if self.cache is not None:
+                self.cache.clear_sub(self._device_changed, device=device)
+            else:
+                device.clear_sub(self._device_changed)
+        self.states.clear()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.devices)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.headers[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        device = self.devices[index.row()]
+        column = index.column()
+        state = self.states.get(device, DeviceState.Unknown)
+        if role == Qt.DisplayRole:
+            if column == self.Name:
+                return device.name
+            elif column == self.Prefix:
+                return '({})'.format(getattr(device, 'prefix', device.name))
+            elif column == self.State:
+                return state.name
+        elif role == Qt.BackgroundRole and column == self.Indicator:
+            return self.lit_color if self.is_lit(device) else self.unlit_color
+        elif role == Qt.ForegroundRole and column == self.State:
+            return self.colors.get(state, self.error_color)
+        elif role == Qt.UserRole:
+            return device
+        return None
+
+    def _device_changed(self, *args, obj=None, state=None, **kwargs):
+        """
+        Run when a displayed device changes state
+        """
+        if obj is not None:
+            if state is None:
+                state = find_device_state(obj, cache=self.cache)
+            self.states[obj] = state
+            self.state_received.emit(obj)
+
+    @pyqtSlot(object)
+    def _state_received(self, device):
+        row = self._rows.get(device)
+        if row is not None:
+            self.dataChanged.emit(self.index(row, self.State),
+                                  self.index(row, self.Buttons))
+
+    @pyqtSlot(object)
+    def _impediment_received(self, impediment):
+        self._block = impediment.md.z if impediment else math.inf
+        if self.devices:
+            self.dataChanged.emit(self.index(0, self.Indicator),
+                                  self.index(len(self.devices) - 1,
+                                             self.Indicator))
+
+
+class ButtonDelegate(QStyledItemDelegate):
+    """
+    Paint insert and remove buttons without creating widgets
+
+    Buttons are only drawn for devices that implement the corresponding
+    method, and are disabled when the device is already in that state
+    """
+    actions = ('insert', 'remove')
+    disabled = {'insert': DeviceState.Inserted,
+                'remove': DeviceState.Removed}
+
+    def paint(self, painter, option, index):
+        device = index.data(Qt.UserRole)
+        state = index.model().states.get(device)
+        for action, rect in self._buttons(option.rect):
+            if not hasattr(device, action):
+                continue
+            button = QStyleOptionButton()
+            button.rect = rect
+            button.text = action.capitalize()
+            if state != self.disabled[action]:
+                button.state = QStyle.State_Enabled
+            QApplication.style().drawControl(QStyle.CE_PushButton, button,
+                                             painter)
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() != QEvent.MouseButtonRelease:
+            return False
+        device = index.data(Qt.UserRole)
+        for action, rect in self._buttons(option.rect):
+            if (rect.contains(event.pos()) and hasattr(device, action)
+                    and model.states.get(device) != self.disabled[action]):
+                logger.info("Calling %s of device %s ...", action,
+                            device.name)
+                try:
+                    getattr(device, action)()
+                except Exception as exc:
+                    logger.error(exc)
+                return True
+        return False
+
+    def _buttons(self, rect):
+        width = rect.width() // len(self.actions)
+        return [(action, QRect(rect.x() + i * width, rect.y(), width,
+                               rect.height()).adjusted(2, 2, -2, -2))
+                for i, action in enumerate(self.actions)]
+
+
+class PathView(QTableView):
+    """
+    Table view of a :class:`.DeviceTableModel`
+
+    Rows have a fixed height so that the view never needs to measure rows
+    outside of the visible area
+
+    Parameters
+    ----------
+    model : :class:`.DeviceTableModel`
+
+    parent : QWidget, optional
+    """
+    row_height = 30
+
+    def __init__(self, model, parent=None):
+        super().__init__(parent=parent)
+        self.setModel(model)
+        self.setItemDelegateForColumn(model.Buttons, ButtonDelegate(self))
+        self.setSelectionMode(QAbstractItemView.NoSelection)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setShowGrid(False)
+        self.verticalHeader().hide()
+        self.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.verticalHeader().setDefaultSectionSize(self.row_height)
+        header = self.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.Interactive)
+        header.setStretchLastSection(True)
+        self.setColumnWidth(model.Indicator, 45)
+        self.setColumnWidth(model.Name, 200)
+        self.setColumnWidth(model.Prefix, 200)
+        self.setColumnWidth(model.State, 120)
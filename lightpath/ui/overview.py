@@ -0,0 +1,279 @@
+"""
+Overview of every beamline of a :class:`.LightController`
+
+The :class:`.LightApp` displays a single path at a time. The
+:class:`.OverviewPanel` instead shows each beamline as a compact
+:class:`.BeamlineLane`, with a cell for each device lit up to the impediment,
+the name of the impediment and where the beam is delivered. All of the lanes
+are evaluated together by an :class:`.OverviewEvaluator`, so that a device
+shared by several beamlines is only read once per update, and a single state
+subscription is made for each device of the facility.
+"""
+import math
+import logging
+from functools import partial
+
+from pydm.PyQt.QtCore import Qt, pyqtSlot
+from pydm.PyQt.QtGui import (QWidget, QLabel, QFrame, QFont, QHBoxLayout,
+                             QVBoxLayout, QSizePolicy)
+
+from .evaluation import PathEvaluator, evaluate_all
+from .repaint import RepaintScheduler
+
+logger = logging.getLogger(__name__)
+
+
+class OverviewEvaluator(PathEvaluator):
+    """
+    Evaluate a set of paths in a worker thread
+
+    Requests are made with an iterable of paths rather than a single path,
+    and :attr:`.evaluated` is emitted with the dictionary of evaluations
+    returned by :func:`.evaluate_all`
+    """
+    evaluate = staticmethod(evaluate_all)
+
+
+class BeamlineLane(QWidget):
+    """
+    Compact display of a single beamline
+
+    Parameters
+    ----------
+    path : :class:`.BeamPath`
+
+    parent : QWidget, optional
+    """
+    # Color of each cell selected by its ``beam`` property
+    cell_style = ('QFrame {background-color: gray} '
+                  'QFrame[beam="lit"] {background-color: cyan} '
+                  'QFrame[beam="blocked"] {background-color: red}')
+    bold = QFont()
+    bold.setBold(True)
+
+    def __init__(self, path, parent=None):
+        super().__init__(parent=parent)
+        self.path = path
+        self.evaluation = None
+        self.name_label = QLabel(path.name, parent=self)
+        self.name_label.setFont(self.bold)
+        self.name_label.setMinimumWidth(80)
+        self.impediment_label = QLabel(parent=self)
+        self.impediment_label.setMinimumWidth(160)
+        self.destination_label = QLabel(parent=self)
+        # One small cell per device, ordered upstream to downstream
+        self.cells = dict()
+        self._beam = dict()
+        cells = QHBoxLayout()
+        cells.setSpacing(1)
+        for device in path.path:
+            cell = QFrame(parent=self)
+            cell.setFixedSize(8, 20)
+            cell.setStyleSheet(self.cell_style)
+            cell.setToolTip(device.name)
+            cells.addWidget(cell)
+            self.cells[device] = cell
+        cells.addStretch()
+        layout = QHBoxLayout()
+        layout.setContentsMargins(2, 1, 2, 1)
+        layout.addWidget(self.name_label)
+        layout.addLayout(cells)
+        layout.addWidget(self.impediment_label)
+        layout.addWidget(self.destination_label)
+        self.setLayout(layout)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+
+    def apply_evaluation(self, evaluation):
+        """
+        Show the result of an evaluation of the beamline
+
+        Only the cells whose beam status has changed are restyled
+
+        Parameters
+        ----------
+        evaluation : :class:`.PathEvaluation`
+        """
+        self.evaluation = evaluation
+        block = evaluation.impediment
+        z = block.md.z if block else math.inf
+        for device, cell in self.cells.items():
+            if device is block:
+                beam = 'blocked'
+            elif device.md.z < z:
+                beam = 'lit'
+            else:
+                beam = 'unlit'
+            state = evaluation.states.get(device)
+            if state is not None:
+                cell.setToolTip('{} ({})'.format(device.name, state.name))
+            if self._beam.get(device) == beam:
+                continue
+            self._beam[device] = beam
+            cell.setProperty('beam', beam)
+            style = cell.style()
+            style.unpolish(cell)
+            style.polish(cell)
+        self.impediment_label.setText(block.name if block else 'Clear')
+        self.destination_label.setText(self.destination(evaluation))
+
+    @staticmethod
+    def destination(evaluation):
+        """
+        Describe where the beam of an evaluated path ends
+
+        Parameters
+        ----------
+        evaluation : :class:`.PathEvaluation`
+
+        Returns
+        -------
+        description : str
+        """
+        block = evaluation.impediment
+        if block is None:
+            return 'Beam reaches the end of {}'.format(evaluation.path.name)
+        elif block in evaluation.path.branches:
+            return 'Beam diverted by {}'.format(block.name)
+        return 'Beam delivered to {}'.format(block.name)
+
+
+class OverviewPanel(QWidget):
+    """
+    Display all of the beamlines of a controller side by side
+
+    Parameters
+    ----------
+    controller : :class:`.LightController`
+        LightController object, or a :class:`.RemoteController`
+
+    minimum_transmission : float, optional
+        Threshold used to evaluate every beamline. By default, each path is
+        evaluated with its own :attr:`.BeamPath.minimum_transmission`
+
+    repaint_interval : float, optional
+        Minimum number of seconds between repaints of the display
+
+    parent : QWidget, optional
+
+    Attributes
+    ----------
+    lanes : dict
+        :class:`.BeamlineLane` of each beamline keyed by name
+
+    evaluations : dict
+        Last :class:`.PathEvaluation` of each beamline keyed by name
+    """
+    def __init__(self, controller, minimum_transmission=None,
+                 repaint_interval=1/30., parent=None):
+        super().__init__(parent=parent)
+        self.light = controller
+        self.minimum_transmission = minimum_transmission
+        self.evaluations = dict()
+        self.scheduler = RepaintScheduler(interval=repaint_interval,
+                                          parent=self)
+        # All beamlines are evaluated together off of the GUI thread
+        self.evaluator = OverviewEvaluator(parent=self)
+        self.evaluator.evaluated.connect(self.apply_evaluations,
+                                         Qt.QueuedConnection)
+        # Create a lane for each beamline
+        layout = QVBoxLayout()
+        layout.setSpacing(1)
+        self.destinations_label = QLabel(parent=self)
+        self.destinations_label.setFont(BeamlineLane.bold)
+        layout.addWidget(self.destinations_label)
+        self.lanes = dict()
+        for name, path in sorted(controller.beamlines.items()):
+            lane = BeamlineLane(path, parent=self)
+            layout.addWidget(lane)
+            self.lanes[name] = lane
+        layout.addStretch()
+        self.setLayout(layout)
+        # Subscribe once to each device, whichever beamlines it belongs to.
+        # A shared cache notifies the display once it holds the new state
+        self.devices = controller.devices
+        self.cache = getattr(controller, 'cache', None)
+        for device in self.devices:
+            if self.cache is not None:
+                self.cache.subscribe(device, self.update_paths)
+                continue
+            try:
+                device.subscribe(self.update_paths,
+                                 event_type=device.SUB_STATE, run=False)
+            except Exception:
+                logger.error("Overview is unable to subscribe to device %s",
+                             device.name)
+        self.update_paths()
+
+    def update_paths(self, *args, **kwargs):
+        """
+        Request a new evaluation of every beamline
+
+        Safe to call from any thread, returns immediately. The display is
+        updated by :meth:`.apply_evaluations` once the evaluation is complete
+        """
+        self.evaluator.request(list(self.light.beamlines.values()),
+                               minimum_transmission=self.minimum_transmission)
+
+    @pyqtSlot(object)
+    def apply_evaluations(self, evaluations):
+        """
+        Show the evaluations of the beamlines with the next frame
+
+        Parameters
+        ----------
+        evaluations : dict
+            :class:`.PathEvaluation` of each beamline keyed by name
+        """
+        self.evaluations = evaluations
+        for name, evaluation in evaluations.items():
+            lane = self.lanes.get(name)
+            if lane is not None:
+                self.scheduler.schedule(lane, partial(lane.apply_evaluation,
+                                                      evaluation))
+        destinations = ', '.join(device.name for device
+                                 in self.destinations(evaluations))
+        self.scheduler.schedule(self.destinations_label,
+                                partial(self.destinations_label.setText,
+                                        'Destinations: {}'.format(
+                                            destinations or 'None')))
+
+    @staticmethod
+    def destinations(evaluations):
+        """
+        Devices receiving beam, as reported by :attr:`.destinations` of the
+        :class:`.LightController`
+
+        Parameters
+        ----------
+        evaluations : dict
+            :class:`.PathEvaluation` of each beamline keyed by name
+
+        Returns
+        -------
+        destinations : list
+            Devices ordered by position
+        """
+        destinations = set(evaluation.impediment
+                           for evaluation in evaluations.values()
+                           if evaluation.impediment
+                           and evaluation.impediment
+                           not in evaluation.path.branches)
+        return sorted(destinations, key=lambda device: device.md.z)
+
+    def clear_subs(self):
+        """
+        Remove the subscriptions to all devices
+        """
+        if self.cache is not None:
+            self.cache.clear_sub(self.update_paths)
+            return
+        for device in self.devices:
+            device.clear_sub(self.update_paths)
+
+    def closeEvent(self, event):
+        """
+        Stop monitoring the devices when the panel is closed
+        """
+        self.clear_subs()
+        self.evaluator.stop()
+        super().closeEvent(event)
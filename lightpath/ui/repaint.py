@@ -0,0 +1,90 @@
+"""
+A burst of motion can produce hundreds of device callbacks per second, each of
+which would otherwise restyle a widget immediately. The
+:class:`.RepaintScheduler` instead collects the pending display changes and
+applies them together at most once per frame interval. Only the latest change
+for each widget is kept, so a row that changes state several times within a
+single frame is only redrawn once.
+"""
+import logging
+import threading
+
+from pydm.PyQt.QtCore import QObject, QTimer, Qt, pyqtSignal, pyqtSlot
+
+logger = logging.getLogger(__name__)
+
+
+class RepaintScheduler(QObject):
+    """
+    Batch display changes into frames
+
+    Parameters
+    ----------
+    interval : float, optional
+        Minimum number of seconds between frames
+
+    parent : QObject, optional
+
+    Attributes
+    ----------
+    frames : int
+        Number of frames applied
+    """
+    _requested = pyqtSignal()
+
+    def __init__(self, interval=1/30., parent=None):
+        super().__init__(parent=parent)
+        self.interval = interval
+        self.frames = 0
+        self._pending = dict()
+        self._lock = threading.Lock()
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.flush)
+        # Timers can only be started from the thread of the scheduler
+        self._requested.connect(self._start, Qt.QueuedConnection)
+
+    def schedule(self, key, callback):
+        """
+        Apply a change with the next frame
+
+        May be called from any thread
+
+        Parameters
+        ----------
+        key : hashable
+            Identifies the widget being changed. A change scheduled for the
+            same key before the next frame replaces the previous one
+
+        callback : callable
+            Applies the change, run from the thread of the scheduler
+        """
+        with self._lock:
+            first = not self._pending
+            self._pending[key] = callback
+        if first:
+            self._requested.emit()
+
+    @pyqtSlot()
+    def flush(self):
+        """
+        Apply all pending changes immediately
+        """
+        with self._lock:
+            pending, self._pending = self._pending, dict()
+        if not pending:
+            return
+        for callback in pending.values():
+            try:
+                callback()
+            except Exception:
+                logger.exception("Unable to apply display change")
+        self.frames += 1
+
+    @pyqtSlot()
+    def _start(self):
+        if not self._timer.isActive():
+            self._timer.start(int(self.interval * 1000))
+
+    def __len__(self):
+        return len(self._pending)
@@ -0,0 +1,314 @@
+"""
+Graphical schematic of every beamline of a :class:`.LightController`
+
+The :class:`.BeamSchematic` places each device on a single
+``QGraphicsScene`` by its ``md.z`` coordinate, with a horizontal lane for
+each beamline it sits on. Consecutive devices of each path are joined by a
+beam segment, and segments shared by several paths are only drawn once.
+Branching devices are drawn as diamonds, so that the segments leaving them
+towards another lane show where the beam can be diverted.
+
+The items are created once when the scene is built. Each evaluation only
+restyles the segments whose lit state changed and the devices whose state
+changed, so that Qt only repaints those regions of the
+:class:`.SchematicView`, however many beamlines are shown.
+"""
+import math
+import logging
+from functools import partial
+
+from pydm.PyQt.QtCore import Qt, QPointF, pyqtSlot
+from pydm.PyQt.QtGui import (QBrush, QColor, QPen, QPolygonF, QPainter,
+                             QGraphicsItem, QGraphicsScene, QGraphicsView)
+
+from ..state import DeviceState
+from .overview import OverviewEvaluator
+from .repaint import RepaintScheduler
+
+logger = logging.getLogger(__name__)
+
+
+class BeamSchematic(QGraphicsScene):
+    """
+    Scene of the devices and beam of every beamline
+
+    Parameters
+    ----------
+    controller : :class:`.LightController`
+        LightController object, or a :class:`.RemoteController`
+
+    width : float, optional
+        Width of the scene. The devices are placed proportionally to their
+        position between the most upstream and downstream device
+
+    parent : QObject, optional
+
+    Attributes
+    ----------
+    scene_width : float
+        Width given to the scene
+
+    lanes : dict
+        Vertical position of each beamline keyed by name
+
+    markers : dict
+        Graphics item of each device
+
+    segments : dict
+        Graphics item of each beam segment keyed by the upstream and
+        downstream device it joins
+
+    repaints : int
+        Number of items restyled since the scene was created
+    """
+    lane_spacing = 40
+    marker_size = 10
+    # Colors of the beam and of each device state
+    lit_pen = QPen(QColor(Qt.cyan), 3)
+    dark_pen = QPen(QColor(Qt.darkGray), 1)
+    colors = {DeviceState.Removed: QColor(124, 252, 0),
+              DeviceState.Inserted: QColor(Qt.red),
+              DeviceState.Unknown: QColor(255, 215, 0)}
+    error_color = QColor(255, 0, 255)
+
+    def __init__(self, controller, width=1000., parent=None):
+        super().__init__(parent=parent)
+        self.light = controller
+        self.scene_width = width
+        self.lanes = dict()
+        self.markers = dict()
+        self.segments = dict()
+        self.repaints = 0
+        self._lit = dict()
+        self._states = dict()
+        devices = controller.devices
+        if devices:
+            self._start = min(device.md.z for device in devices)
+            self._length = max(device.md.z for device in devices)
+            self._length -= self._start
+        else:
+            self._start, self._length = 0., 0.
+        # Upstream beamlines are drawn above those they branch into
+        lines = dict()
+        for device in devices:
+            lines[device.md.beamline] = min(device.md.z,
+                                            lines.get(device.md.beamline,
+                                                      math.inf))
+        for i, line in enumerate(sorted(lines, key=lambda line:
+                                        (lines[line], line))):
+            self.lanes[line] = i * self.lane_spacing
+            label = self.addSimpleText(line)
+            label.setBrush(QBrush(QColor(Qt.lightGray)))
+            label.setPos(-label.boundingRect().width() - 2 * self.marker_size,
+                         self.lanes[line] - label.boundingRect().height()/2)
+        # Join the consecutive devices of each path
+        for path in controller.beamlines.values():
+            for upstream, downstream in zip(path.path, path.path[1:]):
+                if (upstream, downstream) in self.segments:
+                    continue
+                segment = self.addLine(*self.position(upstream),
+                                       *self.position(downstream),
+                                       self.dark_pen)
+                segment.setZValue(0)
+                self.segments[(upstream, downstream)] = segment
+                self._lit[(upstream, downstream)] = False
+        # Draw the devices above the beam
+        for device in devices:
+            marker = self._marker(device)
+            marker.setBrush(QBrush(self.error_color))
+            marker.setToolTip(device.name)
+            marker.setZValue(1)
+            marker.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
+            self.markers[device] = marker
+
+    def position(self, device):
+        """
+        Position of a device in the scene
+
+        Returns
+        -------
+        x, y : float
+        """
+        x = 0.
+        if self._length:
+            x = (device.md.z - self._start) / self._length * self.scene_width
+        return x, self.lanes[device.md.beamline]
+
+    def apply_evaluations(self, evaluations):
+        """
+        Restyle the items affected by new evaluations of the beamlines
+
+        Parameters
+        ----------
+        evaluations : dict
+            :class:`.PathEvaluation` of each beamline keyed by name
+
+        Returns
+        -------
+        changed : int
+            Number of items restyled
+        """
+        changed = 0
+        lit = self.lit_segments(evaluations)
+        for key, segment in self.segments.items():
+            if (key in lit) == self._lit[key]:
+                continue
+            self._lit[key] = key in lit
+            segment.setPen(self.lit_pen if key in lit else self.dark_pen)
+            changed += 1
+        for evaluation in evaluations.values():
+            for device, state in evaluation.states.items():
+                marker = self.markers.get(device)
+                if marker is None or self._states.get(device) == state:
+                    continue
+                self._states[device] = state
+                marker.setBrush(QBrush(self.colors.get(state,
+                                                       self.error_color)))
+                marker.setToolTip('{} ({})'.format(device.name, state.name))
+                changed += 1
+        self.repaints += changed
+        return changed
+
+    @staticmethod
+    def lit_segments(evaluations):
+        """
+        Segments the beam travels along
+
+        A segment is lit if the beam leaves its upstream device in any of the
+        evaluated beamlines
+
+        Parameters
+        ----------
+        evaluations : dict
+            :class:`.PathEvaluation` of each beamline keyed by name
+
+        Returns
+        -------
+        segments : set
+            Upstream and downstream device of each lit segment
+        """
+        lit = set()
+        for evaluation in evaluations.values():
+            block = evaluation.impediment
+            z = block.md.z if block else math.inf
+            devices = evaluation.path.path
+            lit.update((upstream, downstream)
+                       for upstream, downstream in zip(devices, devices[1:])
+                       if upstream.md.z < z)
+        return lit
+
+    def _marker(self, device):
+        """
+        Create the item of a device, a diamond for branching devices
+        """
+        (x, y), size = self.position(device), self.marker_size
+        if getattr(device, 'branches', False):
+            diamond = QPolygonF([QPointF(x, y - size), QPointF(x + size, y),
+                                 QPointF(x, y + size), QPointF(x - size, y)])
+            return self.addPolygon(diamond, QPen(Qt.NoPen))
+        return self.addRect(x - size/2, y - size/2, size, size,
+                            QPen(Qt.NoPen))
+
+
+class SchematicView(QGraphicsView):
+    """
+    Live view of a :class:`.BeamSchematic`
+
+    Every beamline is evaluated together by an :class:`.OverviewEvaluator`
+    whenever a device changes state, and the results are applied to the
+    scene at most once per frame of a :class:`.RepaintScheduler`
+
+    Parameters
+    ----------
+    controller : :class:`.LightController`
+        LightController object, or a :class:`.RemoteController`
+
+    minimum_transmission : float, optional
+        Threshold used to evaluate every beamline. By default, each path is
+        evaluated with its own :attr:`.BeamPath.minimum_transmission`
+
+    repaint_interval : float, optional
+        Minimum number of seconds between repaints of the display
+
+    parent : QWidget, optional
+    """
+    def __init__(self, controller, minimum_transmission=None,
+                 repaint_interval=1/30., parent=None):
+        super().__init__(parent=parent)
+        self.light = controller
+        self.minimum_transmission = minimum_transmission
+        self.schematic = BeamSchematic(controller, parent=self)
+        self.setScene(self.schematic)
+        self.setRenderHint(QPainter.Antialiasing)
+        # Only the regions of restyled items are repainted
+        self.setCacheMode(QGraphicsView.CacheBackground)
+        self.setViewportUpdateMode(QGraphicsView.SmartViewportUpdate)
+        self.setBackgroundBrush(QBrush(QColor(Qt.black)))
+        self.scheduler = RepaintScheduler(interval=repaint_interval,
+                                          parent=self)
+        self.evaluator = OverviewEvaluator(parent=self)
+        self.evaluator.evaluated.connect(self.apply_evaluations,
+                                         Qt.QueuedConnection)
+        # Subscribe once to each device, whichever beamlines it belongs to.
+        # A shared cache notifies the display once it holds the new state
+        self.devices = controller.devices
+        self.cache = getattr(controller, 'cache', None)
+        for device in self.devices:
+            if self.cache is not None:
+                self.cache.subscribe(device, self.update_paths)
+                continue
+            try:
+                device.subscribe(self.update_paths,
+                                 event_type=device.SUB_STATE, run=False)
+            except Exception:
+                logger.error("Schematic is unable to subscribe to device %s",
+                             device.name)
+        self.update_paths()
+
+    def update_paths(self, *args, **kwargs):
+        """
+        Request a new evaluation of every beamline
+
+        Safe to call from any thread, returns immediately
+        """
+        self.evaluator.request(list(self.light.beamlines.values()),
+                               minimum_transmission=self.minimum_transmission)
+
+    @pyqtSlot(object)
+    def apply_evaluations(self, evaluations):
+        """
+        Apply the evaluations of the beamlines with the next frame
+
+        Parameters
+        ----------
+        evaluations : dict
+            :class:`.PathEvaluation` of each beamline keyed by name
+        """
+        self.scheduler.schedule(self.schematic,
+                                partial(self.schematic.apply_evaluations,
+                                        evaluations))
+
+    def resizeEvent(self, event):
+        """
+        Keep the whole schematic visible
+        """
+        super().resizeEvent(event)
+        self.fitInView(self.schematic.itemsBoundingRect(), Qt.KeepAspectRatio)
+
+    def clear_subs(self):
+        """
+        Remove the subscriptions to all devices
+        """
+        if self.cache is not None:
+            self.cache.clear_sub(self.update_paths)
+            return
+        for device in self.devices:
+            device.clear_sub(self.update_paths)
+
+    def closeEvent(self, event):
+        """
+        Stop monitoring the devices when the view is closed
+        """
+        self.clear_subs()
+        self.evaluator.stop()
+        super().closeEvent(event)
@@ -2,13 +2,15 @@
 Definitions for Lightpath Widgets
 """
 import logging
-from enum import Enum
+from functools import partial
 
 from pydm.PyQt.QtCore import Qt
 from pydm.PyQt.QtGui import QPen, QSizePolicy, QHBoxLayout, QWidget, QLabel
 from pydm.PyQt.QtGui import QFont, QSpacerItem, QPushButton
 from pydm.widgets.drawing import PyDMDrawingRectangle
 
+from ..state import DeviceState, find_device_state
+
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +28,8 @@ class InactiveRow:
     # Bold
     bold = QFont()
     bold.setBold(True)
+    # Style of the state label, None to inherit it from the parent
+    state_label_style = "QLabel {color : rgb(255,0,255)}"
 
     def __init__(self, device, parent=None):
         self.device = device
@@ -39,7 +43,8 @@ class InactiveRow:
         self.prefix_label.setFont(self.italic)
         self.state_label = QLabel('Disconnected', parent=parent)
         self.state_label.setFont(self.bold)
-        self.state_label.setStyleSheet("QLabel {color : rgb(255,0,255)}")
+        if self.state_label_style:
+            self.state_label.setStyleSheet(self.state_label_style)
         # Create Beam Indicator
         self.indicator = PyDMDrawingRectangle(parent=parent)
         self.indicator.setMinimumSize(45, 55)
@@ -86,9 +91,38 @@ class LightRow(InactiveRow):
     path : BeamPath
 
     parent : QObject, optional
+
+    scheduler : :class:`.RepaintScheduler`, optional
+        Apply state changes with the next frame of the scheduler rather than
+        immediately
+
+    cache : :class:`.StateCache`, optional
+        Cache shared with the :class:`.BeamPath`. The row is notified by the
+        cache with the state it has just read, rather than reading the device
+        itself
+
+    Attributes
+    ----------
+    stylesheet : str
+        Colors of the state label of every row, selected by its
+        ``state_style`` property. Set once on a parent widget of the rows,
+        as the :class:`.LightApp` does, so that it is only parsed once
     """
-    def __init__(self, device, parent=None):
+    stylesheet = ('QLabel#state_label {color: red} '
+                  'QLabel#state_label[state_style="Removed"] '
+                  '{color: rgb(124,252,0)} '
+                  'QLabel#state_label[state_style="Unknown"] '
+                  '{color: rgb(255,215,0)} '
+                  'QLabel#state_label[state_style="Disconnected"] '
+                  '{color: rgb(255,0,255)}')
+    state_label_style = None
+
+    def __init__(self, device, parent=None, scheduler=None, cache=None):
         super().__init__(device, parent=parent)
+        self.scheduler = scheduler
+        self.cache = cache
+        self.state = None
+        self.state_label.setObjectName('state_label')
         # Create button widget
         self.buttons = QWidget(parent=parent)
         self.button_layout = QHBoxLayout()
@@ -104,9 +138,11 @@ class LightRow(InactiveRow):
             self.remove_button = QPushButton('Remove', parent=parent)
             self.remove_button.setFont(self.font)
             self.button_layout.addWidget(self.remove_button)
-        # Subscribe device to state changes
+        # Subscribe device to state changes, waiting for later to update
+        if cache is not None:
+            cache.subscribe(device, self.update_state)
+            return
         try:
-            # Wait for later to update widget
             self.device.subscribe(self.update_state,
                                   event_type=self.device.SUB_STATE,
                                   run=False)
@@ -114,37 +150,50 @@ class LightRow(InactiveRow):
             logger.error("Widget is unable to subscribe to device %s",
                          device.name)
 
-    def update_state(self, *args, **kwargs):
+    def update_state(self, *args, state=None, **kwargs):
         """
         Update the state label
 
-        The displayed state can be one of ``Unknown`` , ``Inserted``,
-        ``Removed`` or ``Error``, with ``Unknown`` being if the device is not
-        inserted or removed, and error being if the device is reporting as both
-        inserted and removed. The color of the label is also adjusted to either
-        green or red to quickly
+        The displayed state is the :class:`.DeviceState` given by the
+        :attr:`.cache` notification, otherwise it is read from the
+        :attr:`.cache` if one was given, or from the device. The color of the
+        label is also adjusted to either green or red to quickly
+
+        If the row was given a :attr:`.scheduler`, the widgets are only
+        changed with its next frame
         """
-        states = Enum('states', ('Unknown', 'Inserted', 'Removed', 'Error'))
-        # Interpret state
-        try:
-            state = 1 + int(self.device.inserted) + 2*int(self.device.removed)
-        except Exception as exc:
-            logger.error(exc)
-            state = states.Error.value
-        # Set label to state description
-        self.state_label.setText(states(state).name)
-        # Set the color of the label
-        if state == states.Removed.value:
-            self.state_label.setStyleSheet("QLabel {color : rgb(124,252,0)}")
-        elif state == states.Unknown.value:
-            self.state_label.setStyleSheet("QLabel {color : rgb(255, 215, 0)}")
+        if state is None:
+            state = find_device_state(self.device, cache=self.cache)
+        if self.scheduler is None:
+            self.apply_state(state)
         else:
-            self.state_label.setStyleSheet("QLabel {color : red}")
+            self.scheduler.schedule(self, partial(self.apply_state, state))
+
+    def apply_state(self, state):
+        """
+        Show a state in the label and buttons
+
+        Widgets are left untouched if the state has not changed
+
+        Parameters
+        ----------
+        state : :class:`.DeviceState`
+        """
+        if state == self.state:
+            return
+        self.state = state
+        # Set label to state description
+        self.state_label.setText(state.name)
+        # Select the color of the label from the stylesheet of the parent.
+        # Polishing drops the rules cached for this label alone, nothing is
+        # parsed again
+        self.state_label.setProperty('state_style', state.name)
+        self.state_label.style().polish(self.state_label)
         # Disable buttons if necessary
         if hasattr(self, 'insert_button'):
-            self.insert_button.setEnabled(state != states.Inserted.value)
+            self.insert_button.setEnabled(state != DeviceState.Inserted)
         if hasattr(self, 'remove_button'):
-            self.remove_button.setEnabled(state != states.Removed.value)
+            self.remove_button.setEnabled(state != DeviceState.Removed)
 
     @property
     def widgets(self):
@@ -162,4 +211,7 @@ class LightRow(InactiveRow):
         """
         Clear the subscription event
         """
-        self.device.clear_sub(self.update_state)
+        if self.cache is not None:
+            self.cache.clear_sub(self.update_state, device=self.device)
+        else:
+            self.device.clear_sub(self.update_state)
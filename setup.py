@@ -17,5 +17,5 @@ setup(name     = 'lightpath',
 
       packages    = find_packages(),
       include_package_data=True,
-      scripts=['bin/lightpath']
+      scripts=['bin/lightpath', 'bin/lightpath-daemon']
     )